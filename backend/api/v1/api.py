@@ -1,6 +1,5 @@
 from fastapi import APIRouter
-from .endpoints import annotations, health
+from .endpoints import health
 
 api_router = APIRouter()
-api_router.include_router(annotations.router)
-api_router.include_router(health.router) 
\ No newline at end of file
+api_router.include_router(health.router)
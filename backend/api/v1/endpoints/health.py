@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
-from db.session import get_db
-from services.cache import CacheService
+import redis.asyncio as redis
+from database import get_db, pool_status
+from services.cache import CacheService, get_redis
 
 router = APIRouter()
 
 @router.get("/health")
-async def health_check(db: AsyncSession = Depends(get_db)):
+async def health_check(request: Request, db: AsyncSession = Depends(get_db)):
     """Check system health"""
     checks = {
+        # false while warming up and draining, load balancers should wait
+        "ready": getattr(request.app.state, "ready", True),
         "database": True,
         "cache": True,
         "ai_service": True
@@ -16,18 +20,19 @@ async def health_check(db: AsyncSession = Depends(get_db)):
     
     try:
         # check database
-        await db.execute("SELECT 1")
+        await db.execute(text("SELECT 1"))
     except Exception:
         checks["database"] = False
     
     try:
-        # check cache
-        cache = CacheService()
-        await cache.set("health_check", "ok")
-    except Exception:
+        # check cache, CacheService.set swallows Redis errors so ask Redis itself
+        await get_redis().ping()
+    except redis.RedisError:
         checks["cache"] = False
         
     return {
         "status": "healthy" if all(checks.values()) else "unhealthy",
-        "checks": checks
+        "checks": checks,
+        "db_pools": pool_status(),
+        "cache_hit_ratio": CacheService.hit_ratio()
     } 
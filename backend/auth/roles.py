@@ -0,0 +1,24 @@
+from fastapi import Depends, HTTPException, status
+from core.deps import get_current_user
+from models import User, UserRole
+
+def role_of(user: User) -> str:
+    """Role as a plain string, users may come from the ORM or the user cache"""
+    return user.role.value if isinstance(user.role, UserRole) else user.role
+
+def require_role(*roles: UserRole):
+    """Dependency that lets only users with one of ``roles`` through"""
+    allowed = {role.value for role in roles}
+
+    async def dependency(current_user: User = Depends(get_current_user)) -> User:
+        if role_of(current_user) not in allowed:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
+        return current_user
+    return dependency
+
+require_admin = require_role(UserRole.ADMIN)
+require_annotator = require_role(UserRole.ADMIN, UserRole.ANNOTATOR)
+require_viewer = require_role(UserRole.ADMIN, UserRole.ANNOTATOR, UserRole.VIEWER)
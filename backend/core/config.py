@@ -13,6 +13,10 @@ class Settings(BaseSettings):
     # Security
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    USER_CACHE_TTL: int = 60  # seconds an authenticated user is served from Redis
+    BCRYPT_ROUNDS: int = 12  # each +1 doubles hashing time
+    PASSWORD_HASH_WORKERS: int = 4  # threads per process for bcrypt
     
     # Database
     POSTGRES_SERVER: str
@@ -20,20 +24,44 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
     POSTGRES_PORT: str = "5432"
-    SQLALCHEMY_DATABASE_URI: Optional[PostgresDsn] = None
+    SQLALCHEMY_DATABASE_URI: Optional[str] = None  # any SQLAlchemy async URL, e.g. SQLite for load tests
 
-    @validator("SQLALCHEMY_DATABASE_URI", pre=True)
+    @validator("SQLALCHEMY_DATABASE_URI", pre=True, always=True)
     def assemble_db_connection(cls, v: Optional[str], values: Dict[str, Any]) -> Any:
         if isinstance(v, str):
             return v
-        return PostgresDsn.build(
+        return str(PostgresDsn.build(
             scheme="postgresql+asyncpg",
-            user=values.get("POSTGRES_USER"),
+            username=values.get("POSTGRES_USER"),
             password=values.get("POSTGRES_PASSWORD"),
             host=values.get("POSTGRES_SERVER"),
-            port=values.get("POSTGRES_PORT"),
-            path=f"/{values.get('POSTGRES_DB') or ''}",
-        )
+            port=int(values.get("POSTGRES_PORT")),
+            path=values.get("POSTGRES_DB") or "",
+        ))
+
+    # Connection pool, shared by the primary and replica engines
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # seconds, -1 disables recycling
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements per connection
+    DB_ECHO: bool = False  # logs every statement, keep off outside debugging
+    DB_SLOW_QUERY_MS: Optional[int] = None  # log statements slower than this, off when unset
+
+    # Per-request query profiling
+    SQL_PROFILE_HEADERS: bool = False  # X-Query-Count and Server-Timing on every response, for debugging
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5  # warn when one statement shape repeats this often
+    SQL_QUERY_BUDGET_ENFORCE: bool = False  # raise on N+1 or budget overruns, for tests
+
+    # Startup warmup, done before the app accepts traffic
+    WARMUP_CONNECTIONS: int = 5  # DB and Redis connections opened per pool
+    WARMUP_PROJECTS: int = 50  # recently active projects whose prompts are prebuilt
+    WARMUP_TIMEOUT: float = 30.0  # seconds, startup continues cold after this
+
+    # Read replica (optional), GET endpoints read from it when set
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_STICKINESS_SECONDS: int = 10  # reads stay on primary after a write
 
     # CORS
     BACKEND_CORS_ORIGINS: list[str] = [
@@ -45,14 +73,78 @@ class Settings(BaseSettings):
     # OpenAI
     OPENAI_API_KEY: str
     OPENAI_MODEL: str = "gpt-3.5-turbo"
+    # models a request may ask for, OPENAI_MODEL is always one of them
+    OPENAI_ALLOWED_MODELS: list[str] = ["gpt-3.5-turbo", "gpt-4", "gpt-4o", "gpt-4o-mini"]
+    OPENAI_MAX_CONNECTIONS: int = 100  # keep-alive connections shared by async completions
+    OPENAI_TIMEOUT: float = 120.0  # seconds per completion request
+
+    @validator("OPENAI_ALLOWED_MODELS", always=True)
+    def include_default_model(cls, v: list[str], values: Dict[str, Any]) -> list[str]:
+        default = values.get("OPENAI_MODEL")
+        return v if default in v else [*v, default]
     
     # Redis (for caching)
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
+    REDIS_URL: Optional[str] = None
+
+    @validator("REDIS_URL", pre=True, always=True)
+    def assemble_redis_url(cls, v: Optional[str], values: Dict[str, Any]) -> str:
+        if isinstance(v, str):
+            return v
+        return f"redis://{values.get('REDIS_HOST')}:{values.get('REDIS_PORT')}/0"
+
+    REDIS_MAX_CONNECTIONS: int = 50
+    CACHE_DEFAULT_TTL: int = 300  # seconds
+    CACHE_NEGATIVE_TTL: int = 30  # how long a "not found" is remembered
+    CACHE_LOCAL_TTL: int = 5  # upper bound on in-process staleness
+    CACHE_LOCAL_MAX_ITEMS: int = 2048
+    CACHE_LOCAL_MAX_ITEM_BYTES: int = 256 * 1024
+    CACHE_LOCK_TIMEOUT: int = 5  # seconds a cache fill may hold the stampede lock
     
     # Logging
     LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True  # JSON lines on stdout, False for colored text when developing
+    LOG_FILE: Optional[str] = "logs/app.log"
+    LOG_SUCCESS_SAMPLE_RATE: float = 0.1  # share of 2xx/3xx requests logged, errors always are
+    LOG_ROUTE_SAMPLE_RATES: Dict[str, float] = {"/metrics": 0.0, "/api/v1/health": 0.0}  # per route template
+
+    # Tracing, spans of sampled requests are written as OTLP/JSON
+    TRACE_SAMPLE_RATE: float = 0.01  # share of requests without an incoming traceparent
+    TRACE_EXPORT_PATH: str = "logs/traces.jsonl"
+    TRACE_OTLP_ENDPOINT: Optional[str] = None  # e.g. http://localhost:4318/v1/traces, replaces the file
+    
+    # Profiling, admin-only stack sampling of a request or a whole worker
+    PROFILER_HEADER: str = "X-Profile"  # send it with a request to profile that request
+    PROFILER_INTERVAL_MS: float = 5.0
+    PROFILER_MAX_SECONDS: int = 60
+    PROFILER_REPORT_TTL: int = 3600  # seconds a request profile can be fetched
+
+    # Batch progress, per-document events fanned out over Redis pub/sub
+    BATCH_PROGRESS_TTL: int = 3600  # seconds the running counts of a job are kept
+    BATCH_PROGRESS_HEARTBEAT: int = 15  # seconds between keepalive events on an idle channel
+
+    # Annotator prefetch of the next unreviewed documents
+    PREFETCH_MAX_DOCUMENTS: int = 50
+    PREFETCH_PREANNOTATE_MAX: int = 5  # unannotated documents pre-annotated per prefetch, nearest first
+    PREFETCH_PREANNOTATE_LOCK: int = 300  # seconds one worker owns a document's pre-annotation
+
+    # Change feed, clients sync documents and annotations from a cursor
+    CHANGE_FEED_MAX_CHANGES: int = 1000  # per response, has_more tells clients to ask again
+    CHANGE_LOG_RETENTION_DAYS: int = 30  # older cursors get 410 and reload everything
     
+    # Document storage, large texts are zstd-compressed when enabled
+    DOCUMENT_COMPRESSION_ENABLED: bool = False
+    DOCUMENT_COMPRESSION_MIN_BYTES: int = 4096
+    DOCUMENT_COMPRESSION_LEVEL: int = 3
+
+    # Annotation history, a full snapshot is stored every N versions
+    ANNOTATION_SNAPSHOT_INTERVAL: int = 10
+
+    # Project purge, rows deleted per transaction and documents deleted inline
+    PURGE_BATCH_SIZE: int = 1000
+    PURGE_INLINE_MAX_DOCUMENTS: int = 1000
+
     # File Upload
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_FILE_TYPES: list[str] = ["txt", "pdf", "doc", "docx"]
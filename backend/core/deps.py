@@ -9,10 +9,7 @@ from models import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> User:
+async def _user_from_token(token: str, db: AsyncSession, refresh: bool) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -25,9 +22,26 @@ async def get_current_user(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-        
+    # both kinds share the key, a refresh token must never pass as an access token
+    if (payload.get("type") == "refresh") != refresh:
+        raise credentials_exception
+
+    # served from the user cache, the database is only hit on a miss
     auth_service = AuthService(db)
-    user = await auth_service.get_user_by_email(email=email)
-    if user is None:
+    user = await auth_service.get_cached_user(email)
+    if user is None or not user.is_active:
         raise credentials_exception
-    return user 
\ No newline at end of file
+    return user
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    return await _user_from_token(token, db, refresh=False)
+
+async def get_refresh_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """User of a refresh token, sent as the bearer token to /refresh"""
+    return await _user_from_token(token, db, refresh=True)
@@ -0,0 +1,34 @@
+from fastapi import Request, Response
+from typing import Any
+from datetime import datetime
+import hashlib
+
+# clients must revalidate every time, a 304 keeps that cheap
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag from version parts such as ids, updated_at and counts"""
+    # datetimes come back from the cache as isoformat strings, hash them the same way
+    text = "|".join(part.isoformat() if isinstance(part, datetime) else str(part) for part in parts)
+    digest = hashlib.sha1(text.encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison against If-None-Match, as RFC 9110 requires for GET"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return _opaque(etag) in {_opaque(tag) for tag in header.split(",")}
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
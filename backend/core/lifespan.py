@@ -0,0 +1,99 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+import asyncio
+from fastapi import FastAPI
+from sqlalchemy import select, text
+from core.config import settings
+from core.logging import logger
+
+# Shared clients are built and warmed before the app accepts traffic, and
+# torn down in reverse once the server has stopped sending requests.
+
+# documents touched within this window make their project "active"
+ACTIVE_PROJECT_WINDOW = timedelta(days=7)
+
+async def warm_database() -> None:
+    """Open WARMUP_CONNECTIONS pooled connections per engine"""
+    from database import engine, replica_engine
+
+    async def connect(eng):
+        async with eng.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    engines = [engine] if replica_engine is engine else [engine, replica_engine]
+    # concurrent checkouts, so each one opens its own connection
+    await asyncio.gather(*(connect(eng) for eng in engines for _ in range(settings.WARMUP_CONNECTIONS)))
+
+async def warm_redis() -> None:
+    from services.cache import get_redis
+
+    client = get_redis()
+    await asyncio.gather(*(client.ping() for _ in range(settings.WARMUP_CONNECTIONS)))
+
+async def warm_prompts() -> int:
+    """Build the system prompts of recently active projects"""
+    from database import AsyncSessionLocal
+    from models import Project, Document
+    from services.factory import ServiceFactory
+
+    active = (
+        select(Document.project_id)
+        .where(Document.updated_at >= datetime.utcnow() - ACTIVE_PROJECT_WINDOW)
+        .distinct()
+    )
+    async with AsyncSessionLocal() as db:
+        schemas = (await db.execute(
+            select(Project.schema)
+            .where(Project.id.in_(active))
+            .order_by(Project.updated_at.desc())
+            .limit(settings.WARMUP_PROJECTS)
+        )).scalars().all()
+    service = ServiceFactory.get_annotation_service(settings.OPENAI_MODEL)
+    for schema in schemas:
+        await service.generate_system_prompt(schema or {})
+    return len(schemas)
+
+async def warmup() -> None:
+    from services.llm import open_llm_session
+    from core.security import open_hash_pool
+
+    await open_llm_session()
+    open_hash_pool()
+    steps = {"database": warm_database(), "redis": warm_redis(), "prompts": warm_prompts()}
+    results = await asyncio.gather(*steps.values(), return_exceptions=True)
+    for name, result in zip(steps, results):
+        # a cold start is slower, not broken: log and carry on
+        if isinstance(result, Exception):
+            logger.warning(f"Warmup of {name} failed: {result}")
+    prompts = results[2] if isinstance(results[2], int) else 0
+    logger.info(f"Warmed up {settings.WARMUP_CONNECTIONS} connections per pool and {prompts} project prompts")
+
+async def drain() -> None:
+    """Close shared clients, newest first, then flush queued logs"""
+    from database import dispose_engines
+    from services.cache import close_redis
+    from services.llm import close_llm_session
+    from core.security import close_hash_pool
+
+    for name, close in (("llm session", close_llm_session), ("redis", close_redis), ("database", dispose_engines)):
+        try:
+            await close()
+        except Exception as e:
+            logger.warning(f"Closing {name} failed: {e}")
+    close_hash_pool()
+    await logger.complete()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("Starting up TagFlow API")
+    app.state.ready = False
+    try:
+        await asyncio.wait_for(warmup(), settings.WARMUP_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning(f"Warmup took over {settings.WARMUP_TIMEOUT}s, starting cold")
+    app.state.ready = True
+    yield
+    # uvicorn has finished in-flight requests by now
+    app.state.ready = False
+    logger.info("Shutting down TagFlow API")
+    await drain()
@@ -5,29 +5,49 @@ from pathlib import Path
 from loguru import logger
 from core.config import settings
 
+class InterceptHandler(logging.Handler):
+    """Send stdlib logging (uvicorn, sqlalchemy, httpx) through loguru's queued sinks"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            level = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+        logger.opt(depth=6, exception=record.exc_info).log(level, record.getMessage())
+
 # Configure loguru logger
 def setup_logging() -> None:
     # Remove default logger
     logger.remove()
     
-    # Add console logger
+    # Sinks are queued (enqueue=True): a background thread does the writing,
+    # so a request only pays for putting the record on the queue
     logger.add(
         sys.stdout,
         format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
         level=settings.LOG_LEVEL,
-        colorize=True
+        serialize=settings.LOG_JSON,
+        colorize=not settings.LOG_JSON,
+        enqueue=True
     )
     
-    # Add file logger
-    log_file = Path("logs/app.log")
-    log_file.parent.mkdir(exist_ok=True)
-    logger.add(
-        log_file,
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
-        level=settings.LOG_LEVEL,
-        rotation="500 MB",
-        retention="10 days"
-    )
+    # Add file logger, always JSON
+    if settings.LOG_FILE:
+        log_file = Path(settings.LOG_FILE)
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        logger.add(
+            log_file,
+            level=settings.LOG_LEVEL,
+            serialize=True,
+            enqueue=True,
+            rotation="500 MB",
+            retention="10 days"
+        )
+
+    logging.basicConfig(handlers=[InterceptHandler()], level=settings.LOG_LEVEL, force=True)
+    # an INFO root logger would otherwise make sqlalchemy log every statement
+    if not settings.DB_ECHO:
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
 
 # Custom exception handler
 class APIException(Exception):
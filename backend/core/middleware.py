@@ -1,23 +1,109 @@
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
 from core.logging import logger, APIException
+from core.config import settings
+from database import PRIMARY_STICKY_COOKIE
+from core.monitoring import request_count, request_latency, requests_in_progress, route_template
+from core.tracing import start_trace, NOOP_SPAN
+from core.sql_profiler import profile_queries, check_profile
 import time
+import random
 from typing import Callable
 import traceback
 
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+KNOWN_METHODS = SAFE_METHODS | {"POST", "PUT", "PATCH", "DELETE"}
+
+async def record_metrics(request: Request, call_next: Callable):
+    """RED metrics per route template and status"""
+    started = time.perf_counter()
+    requests_in_progress.inc()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        requests_in_progress.dec()
+        # the matched route's template, e.g. /api/documents/{document_id}
+        template = route_template(request.scope) or "unmatched"
+        method = request.method if request.method in KNOWN_METHODS else "OTHER"
+        request_count.labels(method, template, status_code).inc()
+        request_latency.labels(method, template).observe(time.perf_counter() - started)
+
+async def read_your_writes(request: Request, call_next: Callable):
+    """Pin the client's reads to the primary for a short window after a write"""
+    response = await call_next(request)
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        until = time.time() + settings.REPLICA_STICKINESS_SECONDS
+        response.set_cookie(
+            PRIMARY_STICKY_COOKIE,
+            f"{until:.3f}",
+            max_age=settings.REPLICA_STICKINESS_SECONDS,
+            httponly=True,
+            samesite="lax"
+        )
+    return response
+
+async def trace_requests(request: Request, call_next: Callable):
+    """Root span per request, continuing an incoming W3C traceparent"""
+    span = start_trace(
+        f"{request.method} {request.url.path}",
+        traceparent=request.headers.get("traceparent"),
+        **{"http.method": request.method, "http.target": request.url.path}
+    )
+    if span is NOOP_SPAN:
+        return await call_next(request)
+
+    with span:
+        response = await call_next(request)
+        template = route_template(request.scope)
+        if template is not None:
+            span.name = f"{request.method} {template}"
+            span.set_attribute("http.route", template)
+        span.set_attribute("http.status_code", response.status_code)
+    response.headers["traceparent"] = span.traceparent()
+    response.headers["X-Trace-Id"] = span.trace_id
+    return response
+
+async def count_queries(request: Request, call_next: Callable):
+    """Query count and DB time per request, with N+1 and budget checks"""
+    with profile_queries() as profile:
+        response = await call_next(request)
+    route = request.scope.get("route")
+    check_profile(
+        profile,
+        route_template(request.scope) or request.url.path,
+        getattr(getattr(route, "endpoint", None), "__query_budget__", None)
+    )
+    if settings.SQL_PROFILE_HEADERS:
+        response.headers["X-Query-Count"] = str(profile.count)
+        response.headers["Server-Timing"] = f'db;dur={profile.total_ms:.1f};desc="{profile.count} queries"'
+    return response
+
+def _should_log(request: Request, status_code: int) -> bool:
+    """Errors are always logged, successes are sampled per route template"""
+    if status_code >= 400:
+        return True
+    rate = settings.LOG_ROUTE_SAMPLE_RATES.get(route_template(request.scope), settings.LOG_SUCCESS_SAMPLE_RATE)
+    return rate >= 1 or random.random() < rate
+
 async def error_handler(request: Request, call_next: Callable) -> JSONResponse:
     try:
-        start_time = time.time()
+        start_time = time.perf_counter()
         response = await call_next(request)
-        process_time = time.time() - start_time
+        process_time = time.perf_counter() - start_time
         
         # Log request details
-        logger.info(
-            f"Path: {request.url.path} | "
-            f"Method: {request.method} | "
-            f"Status: {response.status_code} | "
-            f"Process Time: {process_time:.2f}s"
-        )
+        if _should_log(request, response.status_code):
+            logger.bind(
+                path=request.url.path,
+                method=request.method,
+                status=response.status_code,
+                duration_ms=round(process_time * 1000, 1)
+            ).info(
+                f"{request.method} {request.url.path} {response.status_code} {process_time * 1000:.1f}ms"
+            )
         
         return response
         
@@ -1,6 +1,97 @@
-# Need to add metrics collection
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
+from typing import Any, Mapping, Optional
 import time
+from core.config import settings
+from core.tracing import start_span
 
-request_count = Counter('http_requests_total', 'Total HTTP requests')
-request_latency = Histogram('http_request_duration_seconds', 'HTTP request latency') 
\ No newline at end of file
+def route_template(scope: Mapping[str, Any]) -> Optional[str]:
+    """Full template of the matched route, e.g. /api/documents/{document_id}.
+
+    Routes of an included router only carry their own path, "/health" for
+    /api/v1/health, so the prefix is taken from the request path: it has as
+    many segments in front of the route's own path as the prefix has.
+    None when no route matched.
+    """
+    path = getattr(scope.get("route"), "path", None)
+    if path is None:
+        return None
+    segments = scope["path"].rstrip("/").split("/")
+    own = path.rstrip("/").count("/")
+    return "/".join(segments[:len(segments) - own]) + path
+
+# RED metrics, labelled by route template (not raw path) to keep cardinality low
+request_count = Counter('http_requests_total', 'Total HTTP requests', ['method', 'route', 'status'])
+request_latency = Histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency',
+    ['method', 'route'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+requests_in_progress = Gauge('http_requests_in_progress', 'HTTP requests being served', multiprocess_mode='livesum')
+
+# database connection pool, labelled by engine ("primary" / "replica"); under
+# PROMETHEUS_MULTIPROC_DIR the gauges add up the live worker processes
+db_pool_size = Gauge('db_pool_size', 'Configured connection pool size', ['pool'], multiprocess_mode='livesum')
+db_pool_checked_out = Gauge('db_pool_checked_out', 'Connections currently checked out', ['pool'], multiprocess_mode='livesum')
+db_pool_overflow = Gauge('db_pool_overflow', 'Connections open beyond the pool size', ['pool'], multiprocess_mode='livesum')
+db_pool_wait = Histogram(
+    'db_pool_wait_seconds',
+    'Time spent waiting to check out a connection',
+    ['pool'],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+)
+db_pool_timeouts = Counter('db_pool_timeouts_total', 'Checkouts that timed out waiting for a connection', ['pool'])
+
+# two-tier cache, hit ratio = hits / (hits + misses) per tier
+cache_requests = Counter('cache_requests_total', 'Cache lookups', ['tier', 'result'])
+
+# LLM calls, labelled by model and outcome ("success" / "error"). Models
+# outside OPENAI_ALLOWED_MODELS are counted as "other", the name can come
+# from a request
+llm_request_latency = Histogram(
+    'llm_request_duration_seconds',
+    'Latency of LLM completion calls',
+    ['model', 'outcome'],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+)
+llm_tokens = Counter('llm_tokens_total', 'Tokens used by LLM calls', ['model', 'kind'])
+
+# batch annotation jobs
+batch_documents = Counter('batch_documents_total', 'Documents processed by batch jobs', ['outcome'])
+batch_job_duration = Histogram(
+    'batch_job_duration_seconds',
+    'Wall time of batch annotation jobs',
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800)
+)
+
+def model_label(model: str) -> str:
+    return model if model in settings.OPENAI_ALLOWED_MODELS else "other"
+
+class track_llm_call:
+    """Times an LLM call, counts its tokens and traces it as an llm.chat_completion span.
+
+        with track_llm_call(model) as call:
+            call.response = await openai.ChatCompletion.acreate(...)
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self.response: Optional[Any] = None
+
+    def __enter__(self) -> "track_llm_call":
+        self.span = start_span("llm.chat_completion", **{"llm.model": self.model})
+        self.span.__enter__()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        outcome = "error" if exc_type else "success"
+        model = model_label(self.model)
+        llm_request_latency.labels(model, outcome).observe(time.perf_counter() - self.started)
+        usage = getattr(self.response, "usage", None) if self.response is not None else None
+        if usage:
+            llm_tokens.labels(model, "prompt").inc(usage.get("prompt_tokens", 0))
+            llm_tokens.labels(model, "completion").inc(usage.get("completion_tokens", 0))
+            self.span.set_attribute("llm.prompt_tokens", usage.get("prompt_tokens", 0))
+            self.span.set_attribute("llm.completion_tokens", usage.get("completion_tokens", 0))
+        self.span.__exit__(exc_type, exc, tb)
@@ -0,0 +1,233 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+import asyncio
+import sys
+import threading
+import time
+import uuid
+from core.config import settings
+from core.logging import logger
+from core.monitoring import route_template
+
+# Admin-only stack sampling. Nothing is hooked while no profile runs: a
+# sampler thread reads sys._current_frames() only for the profile's duration.
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+# samples where the profiled request's code wasn't on the loop's stack
+ELSEWHERE = ("(elsewhere: awaiting I/O or other requests)", "", 0)
+
+_busy = threading.Lock()
+
+FrameKey = Tuple[str, str, int]
+
+def _frame_key(frame) -> FrameKey:
+    code = frame.f_code
+    return getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno
+
+class StackSampler:
+    """Samples the stacks of running threads from a background thread"""
+
+    def __init__(self, interval: float, thread_ids: Optional[set] = None):
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.frames: List[FrameKey] = []
+        self._index: Dict[FrameKey, int] = {}
+        self.samples: Dict[int, List[Tuple[int, ...]]] = {}
+        self.started = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _frame_id(self, key: FrameKey) -> int:
+        index = self._index.get(key)
+        if index is None:
+            index = self._index[key] = len(self.frames)
+            self.frames.append(key)
+        return index
+
+    def _stack(self, frame) -> Tuple[int, ...]:
+        stack = []
+        while frame is not None:
+            stack.append(self._frame_id(_frame_key(frame)))
+            frame = frame.f_back
+        stack.reverse()  # root first, as speedscope and folded stacks expect
+        return tuple(stack)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or (self.thread_ids and thread_id not in self.thread_ids):
+                    continue
+                self.samples.setdefault(thread_id, []).append(self._stack(frame))
+
+    def start(self) -> "StackSampler":
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "StackSampler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self
+
+    def only_within(self, thread_id: int, code) -> None:
+        """Keep full stacks only where ``code`` is running, collapse the rest into one frame"""
+        frame_ids = {i for i, key in enumerate(self.frames) if key == (
+            getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno
+        )}
+        elsewhere = (self._frame_id(ELSEWHERE),)
+        self.samples = {
+            thread_id: [
+                stack if frame_ids.intersection(stack) else elsewhere
+                for stack in self.samples.get(thread_id, [])
+            ]
+        }
+
+def _thread_names() -> Dict[int, str]:
+    return {thread.ident: thread.name for thread in threading.enumerate()}
+
+def to_speedscope(sampler: StackSampler, name: str) -> Dict[str, Any]:
+    """Sampled profile per thread in speedscope's file format"""
+    names = _thread_names()
+    profiles = []
+    for thread_id, stacks in sampler.samples.items():
+        if not stacks:
+            continue
+        profiles.append({
+            "type": "sampled",
+            "name": names.get(thread_id, str(thread_id)),
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": sampler.duration,
+            "samples": [list(stack) for stack in stacks],
+            "weights": [sampler.interval] * len(stacks),
+        })
+    return {
+        "$schema": SPEEDSCOPE_SCHEMA,
+        "name": name,
+        "exporter": f"{settings.PROJECT_NAME.lower()}-{settings.VERSION}",
+        "activeProfileIndex": 0,
+        "shared": {"frames": [
+            {"name": fn, "file": file, "line": line} for fn, file, line in sampler.frames
+        ]},
+        "profiles": profiles,
+    }
+
+def to_collapsed(sampler: StackSampler) -> str:
+    """Folded stacks, one "thread;frame;frame count" line each, for flamegraph.pl"""
+    names = _thread_names()
+    counts: Dict[Tuple[str, Tuple[int, ...]], int] = {}
+    for thread_id, stacks in sampler.samples.items():
+        thread = names.get(thread_id, str(thread_id))
+        for stack in stacks:
+            counts[(thread, stack)] = counts.get((thread, stack), 0) + 1
+    lines = []
+    for (thread, stack), count in counts.items():
+        frames = ";".join(sampler.frames[i][0].replace(";", ":") for i in stack)
+        lines.append(f"{thread};{frames} {count}")
+    return "\n".join(lines) + "\n"
+
+async def sample_worker(seconds: float, interval: float, loop_only: bool) -> StackSampler:
+    """Sample this worker's threads for ``seconds`` while it keeps serving requests"""
+    if not _busy.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A profile is already running on this worker")
+    try:
+        threads = {threading.get_ident()} if loop_only else None
+        sampler = StackSampler(interval, threads).start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+        return sampler
+    finally:
+        _busy.release()
+
+def profile_key(profile_id: str) -> str:
+    return f"profile:{profile_id}"
+
+# last few reports of this worker, for when Redis isn't available
+_recent: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+RECENT_REPORTS = 10
+
+async def save_report(profile_id: str, report: Dict[str, Any]) -> None:
+    from services.cache import CacheService
+
+    _recent[profile_id] = report
+    while len(_recent) > RECENT_REPORTS:
+        _recent.popitem(last=False)
+    await CacheService().set(profile_key(profile_id), report, expire=settings.PROFILER_REPORT_TTL, local=False)
+
+async def load_report(profile_id: str) -> Optional[Dict[str, Any]]:
+    from services.cache import CacheService
+
+    report = await CacheService().get(profile_key(profile_id), local=False)
+    return report if report is not None else _recent.get(profile_id)
+
+class RequestProfiler:
+    """ASGI middleware profiling a single request when an admin sends the profile header.
+
+    Requests without the header pass straight through; with it, the event
+    loop thread is sampled while the request runs and the report is stored
+    under the id returned in the same header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.header = settings.PROFILER_HEADER.lower().encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not any(name == self.header for name, _ in scope["headers"]):
+            return await self.app(scope, receive, send)
+
+        try:
+            await self._require_admin(scope)
+        except HTTPException as e:
+            return await JSONResponse({"detail": e.detail}, status_code=e.status_code)(scope, receive, send)
+        if not _busy.acquire(blocking=False):
+            # another profile is running, serve the request unprofiled
+            return await self.app(scope, receive, send)
+
+        profile_id = uuid.uuid4().hex
+        header = (self.header, profile_id.encode())
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [header]
+            await send(message)
+
+        sampler = StackSampler(settings.PROFILER_INTERVAL_MS / 1000, {threading.get_ident()}).start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.stop()
+            _busy.release()
+            await self._store(scope, sampler, profile_id)
+
+    async def _require_admin(self, scope) -> None:
+        from fastapi.security.utils import get_authorization_scheme_param
+        from core.deps import get_current_user
+        from auth.roles import require_admin
+        from database import AsyncSessionLocal
+
+        headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+        scheme, token = get_authorization_scheme_param(headers.get("authorization"))
+        if scheme.lower() != "bearer" or not token:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        async with AsyncSessionLocal() as db:
+            await require_admin(current_user=await get_current_user(token=token, db=db))
+
+    async def _store(self, scope, sampler: StackSampler, profile_id: str) -> None:
+        route = scope.get("route")
+        endpoint = getattr(route, "endpoint", None)
+        if endpoint is not None and hasattr(endpoint, "__code__"):
+            sampler.only_within(threading.get_ident(), endpoint.__code__)
+        name = f"{scope['method']} {route_template(scope) or scope['path']}"
+        report = to_speedscope(sampler, name)
+        await save_report(profile_id, report)
+        logger.info(f"Profiled {name} in {sampler.duration * 1000:.0f}ms as {profile_id}")
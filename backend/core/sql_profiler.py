@@ -0,0 +1,115 @@
+from typing import Callable, Dict, Optional
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+import re
+import time
+from core.config import settings
+from core.logging import logger
+
+# Per-request query accounting: engine events add to the profile of the
+# current request, outside a profiled context they cost one contextvar read.
+
+_current_profile: ContextVar[Optional["QueryProfile"]] = ContextVar("query_profile", default=None)
+
+# IN lists and VALUES rows expand to a different number of placeholders per call
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\$\d+|\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\$\d+|\?|%\(\w+\)s|:\w+))*\s*\)")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|:\w+")
+_WHITESPACE = re.compile(r"\s+")
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in enforce mode when a request runs more queries than its budget"""
+
+def statement_shape(statement: str) -> str:
+    """Statement with its placeholders normalised, repeated shapes point at per-row queries"""
+    shape = _PLACEHOLDER_LIST.sub("(?)", statement)
+    shape = _PLACEHOLDER.sub("?", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+class QueryProfile:
+    __slots__ = ("count", "total_ms", "shapes", "_started")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter = Counter()
+        self._started: list = []
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Shapes run at least ``threshold`` times, the usual N+1 signature"""
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+def current_profile() -> Optional[QueryProfile]:
+    return _current_profile.get()
+
+@contextmanager
+def profile_queries():
+    """Count the queries run inside the block, nesting reuses the outer profile"""
+    profile = _current_profile.get()
+    if profile is not None:
+        yield profile
+        return
+    profile = QueryProfile()
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """Test helper: fail when the block runs more than ``limit`` queries"""
+    with profile_queries() as profile:
+        before = profile.count
+        yield profile
+    used = profile.count - before
+    if used > limit:
+        raise QueryBudgetExceeded(f"{used} queries, budget is {limit}: {dict(profile.shapes)}")
+
+def query_budget(limit: int) -> Callable:
+    """Declare how many queries an endpoint may run, checked by the request profiler"""
+    def decorator(func):
+        func.__query_budget__ = limit
+        return func
+    return decorator
+
+def profile_engine(engine) -> None:
+    """Feed every statement on an AsyncEngine into the current request's profile"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        profile = _current_profile.get()
+        if profile is not None:
+            profile._started.append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        profile = _current_profile.get()
+        if profile is not None and profile._started:
+            profile.total_ms += (time.perf_counter() - profile._started.pop()) * 1000
+            profile.count += 1
+            profile.shapes[statement_shape(statement)] += 1
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _error(exception_context):
+        profile = _current_profile.get()
+        if profile is not None and profile._started:
+            profile._started.pop()
+
+def check_profile(profile: QueryProfile, route: Optional[str], budget: Optional[int]) -> None:
+    """Warn about repeated statement shapes and budget overruns, raise in enforce mode"""
+    repeated = profile.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD)
+    for shape, n in repeated.items():
+        logger.bind(route=route, statement=shape[:2000], repeats=n).warning(
+            f"Possible N+1 on {route}: same statement ran {n} times: {shape[:200]}"
+        )
+    over_budget = budget is not None and profile.count > budget
+    if over_budget:
+        logger.bind(route=route, queries=profile.count, budget=budget).warning(
+            f"{route} ran {profile.count} queries, budget is {budget}"
+        )
+    if settings.SQL_QUERY_BUDGET_ENFORCE and (over_budget or repeated):
+        raise QueryBudgetExceeded(
+            f"{route} ran {profile.count} queries (budget {budget}), repeated: {repeated}"
+        )
@@ -0,0 +1,251 @@
+from typing import Any, Dict, List, Optional
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+import asyncio
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from core.config import settings
+from core.logging import logger
+
+# Minimal tracing: spans live in a contextvar, sampled traces are exported as
+# OTLP/JSON (the format of the OTLP HTTP exporter) to a file or a collector.
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error", "_token")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, **attributes: Any):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error: Optional[str] = None
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.time_ns()
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        _exporter.submit(self)
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+class _NoopSpan:
+    """Returned when the current request isn't sampled, costs one contextvar read"""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def start_span(name: str, **attributes: Any):
+    """Child span of the current one, or a no-op outside a sampled trace"""
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(name, parent.trace_id, parent.span_id, **attributes)
+
+def parse_traceparent(header: Optional[str]):
+    """(trace_id, parent_span_id, sampled) from a W3C traceparent header"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3][:2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+def start_trace(name: str, traceparent: Optional[str] = None, **attributes: Any):
+    """Root span for a request, continuing the caller's trace when a traceparent is given.
+
+    A caller's sampling decision is honoured; otherwise TRACE_SAMPLE_RATE
+    decides. Unsampled requests get the no-op span.
+    """
+    incoming = parse_traceparent(traceparent)
+    if incoming:
+        trace_id, parent_id, sampled = incoming
+    else:
+        trace_id, parent_id = os.urandom(16).hex(), None
+        sampled = random.random() < settings.TRACE_SAMPLE_RATE
+    if not sampled:
+        return NOOP_SPAN
+    return Span(name, trace_id, parent_id, **attributes)
+
+def traced(name: Optional[str] = None):
+    """Decorator wrapping a sync or async function in a span"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with start_span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    data = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 2 if span.parent_id is None else 1,  # server for roots, internal otherwise
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    return data
+
+class _Exporter:
+    """Batches finished spans on a daemon thread so requests never wait on I/O"""
+
+    def __init__(self, batch_size: int = 512, interval: float = 1.0):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: "queue.SimpleQueue[Span]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, span: Span) -> None:
+        if self._thread is None:
+            self._start()
+        self._queue.put(span)
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._drain()
+            if batch:
+                try:
+                    self._export(batch)
+                except Exception as e:
+                    logger.warning(f"Dropped {len(batch)} spans: {e}")
+
+    def _drain(self) -> List[Span]:
+        batch = []
+        deadline = time.monotonic() + self.interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _export(self, batch: List[Span]) -> None:
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": settings.PROJECT_NAME.lower()}},
+                    {"key": "service.version", "value": {"stringValue": settings.VERSION}},
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "tagflow.tracing"},
+                    "spans": [_otlp_span(span) for span in batch],
+                }],
+            }]
+        }
+        body = json.dumps(payload, default=str)
+        if settings.TRACE_OTLP_ENDPOINT:
+            request = urllib.request.Request(
+                settings.TRACE_OTLP_ENDPOINT,
+                data=body.encode(),
+                headers={"Content-Type": "application/json"}
+            )
+            urllib.request.urlopen(request, timeout=5).close()
+        else:
+            path = Path(settings.TRACE_EXPORT_PATH)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("a", encoding="utf-8") as f:
+                f.write(body + "\n")
+
+_exporter = _Exporter()
+
+def instrument_engine(engine) -> None:
+    """Span per SQL statement on an AsyncEngine, only inside sampled traces"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        span = start_span("db.query", **{
+            "db.system": engine.dialect.name,
+            "db.statement": statement[:500],
+            "db.executemany": executemany,
+        })
+        if span is not NOOP_SPAN:
+            span.__enter__()
+        conn.info.setdefault("trace_spans", []).append(span)
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("trace_spans")
+        if spans:
+            span = spans.pop()
+            if span is not NOOP_SPAN:
+                span.__exit__(None, None, None)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _error(exception_context):
+        spans = exception_context.connection.info.get("trace_spans") if exception_context.connection else None
+        if spans:
+            span = spans.pop()
+            if span is not NOOP_SPAN:
+                exc = exception_context.original_exception
+                span.__exit__(type(exc), exc, None)
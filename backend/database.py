@@ -1,12 +1,22 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, create_async_engine
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql import Insert, Update, Delete
+from sqlalchemy import exc, event
 import os
+import time
+from typing import Any, Dict
 from dotenv import load_dotenv
 from sqlalchemy.exc import SQLAlchemyError
-import logging
-from fastapi import HTTPException
+from fastapi import HTTPException, Request
 from core.config import settings
+from core.logging import logger
+from core.monitoring import (
+    db_pool_size, db_pool_checked_out, db_pool_overflow, db_pool_wait, db_pool_timeouts
+)
+from core.tracing import instrument_engine
+from core.sql_profiler import profile_engine
 
 load_dotenv()
 
@@ -16,22 +26,150 @@ DATABASE_URL = settings.SQLALCHEMY_DATABASE_URI
 if DATABASE_URL is None:
     raise ValueError("Database URL is not configured. Check your .env file.")
 
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that reports checkout waits and occupancy to Prometheus"""
+
+    def _do_get(self):
+        name = self.logging_name or "default"
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            db_pool_timeouts.labels(name).inc()
+            raise
+        finally:
+            db_pool_wait.labels(name).observe(time.perf_counter() - start)
+            self._report(name)
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._report(self.logging_name or "default")
+
+    def _report(self, name: str) -> None:
+        db_pool_checked_out.labels(name).set(self.checkedout())
+        db_pool_overflow.labels(name).set(max(self.overflow(), 0))
+
+def build_engine(url: Any, name: str = "primary", **overrides) -> AsyncEngine:
+    """Build an async engine with the pool settings from config.
+
+    This is the only place engines are created; keyword overrides win over
+    settings (e.g. poolclass=NullPool for scripts and migrations).
+    """
+    url = make_url(str(url))
+    options: Dict[str, Any] = {
+        "echo": settings.DB_ECHO,
+        "future": True,
+    }
+    # the queue pool settings don't apply to another pool class (e.g. NullPool)
+    if url.get_backend_name() != "sqlite" and "poolclass" not in overrides:
+        options.update(
+            poolclass=InstrumentedPool,
+            pool_logging_name=name,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+        db_pool_size.labels(name).set(settings.DB_POOL_SIZE)
+    if url.get_driver_name() == "asyncpg":
+        url = url.update_query_dict(
+            {"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)}
+        )
+    options.update(overrides)
+    engine = create_async_engine(url, **options)
+    instrument_engine(engine)
+    profile_engine(engine)
+    if settings.DB_SLOW_QUERY_MS:
+        log_slow_queries(engine, settings.DB_SLOW_QUERY_MS)
+    return engine
+
+def log_slow_queries(engine: AsyncEngine, threshold_ms: int) -> None:
+    """Warn about statements slower than ``threshold_ms``, everything else stays silent"""
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_started"].pop()) * 1000
+        if elapsed_ms >= threshold_ms:
+            logger.bind(duration_ms=round(elapsed_ms, 1), statement=statement[:2000]).warning(
+                f"Slow query ({elapsed_ms:.0f}ms): {statement[:200]}"
+            )
+
 # create async engine
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=True,
-    future=True
+engine = build_engine(DATABASE_URL)
+
+# read replica engine, falls back to the primary when no replica is configured
+replica_engine = (
+    build_engine(settings.DATABASE_REPLICA_URL, name="replica")
+    if settings.DATABASE_REPLICA_URL
+    else engine
 )
 
+def pool_status() -> Dict[str, Dict[str, Any]]:
+    """Current occupancy of every engine's pool, for health checks"""
+    engines = {"primary": engine}
+    if replica_engine is not engine:
+        engines["replica"] = replica_engine
+    status = {}
+    for name, eng in engines.items():
+        pool = eng.pool
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            status[name] = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "idle": pool.checkedin(),
+            }
+        else:
+            status[name] = {"status": pool.status()}
+    return status
+
+# cookie holding the unix time until which a client's reads stay on the primary
+PRIMARY_STICKY_COOKIE = "tagflow_primary_until"
+
+class RoutingSession(Session):
+    """Session that sends plain reads to the replica when marked read-only.
+
+    Flushes and INSERT/UPDATE/DELETE statements always go to the primary,
+    so a read session that ends up writing still behaves correctly.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            self.info.get("use_replica")
+            and not self._flushing
+            and not isinstance(clause, (Insert, Update, Delete))
+        ):
+            return replica_engine.sync_engine
+        return engine.sync_engine
+
 # create async session
 AsyncSessionLocal = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False
 )
 
-Base = declarative_base()
+async def dispose_engines() -> None:
+    """Close every pooled connection, called once on shutdown"""
+    if replica_engine is not engine:
+        await replica_engine.dispose()
+    await engine.dispose()
 
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+def primary_sticky(request: Request) -> bool:
+    """True while the client is inside its read-your-writes window"""
+    try:
+        until = float(request.cookies.get(PRIMARY_STICKY_COOKIE, 0))
+    except ValueError:
+        return False
+    return until > time.time()
+
+def use_replica_for(request: Request) -> bool:
+    """Whether reads for this request may go to the replica"""
+    return replica_engine is not engine and not primary_sticky(request)
 
 # dependency to get DB session
 async def get_db() -> AsyncSession:
@@ -39,4 +177,12 @@ async def get_db() -> AsyncSession:
         try:
             yield session
         finally:
-            await session.close() 
+            await session.close()
+
+# dependency to get a read-only DB session, routed to the replica
+async def get_read_db(request: Request) -> AsyncSession:
+    async with AsyncSessionLocal(info={"use_replica": use_replica_for(request)}) as session:
+        try:
+            yield session
+        finally:
+            await session.close()
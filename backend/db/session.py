@@ -1,24 +1,4 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from core.config import settings
+# kept for older imports, the engine and sessions live in database.py
+from database import engine, replica_engine, AsyncSessionLocal, get_db, get_read_db
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    pool_size=20,
-    max_overflow=10,
-    pool_timeout=30,
-    echo=settings.LOG_LEVEL == "DEBUG"
-)
-
-AsyncSessionLocal = sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False
-)
-
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close() 
\ No newline at end of file
+__all__ = ["engine", "replica_engine", "AsyncSessionLocal", "get_db", "get_read_db"]
@@ -1,32 +1,45 @@
-from fastapi import FastAPI, HTTPException, Depends, Body, UploadFile, File, Request
+from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from dotenv import load_dotenv
 import os
-import openai
-from database import get_db
-from models import User, Project, Document, Annotation
+from database import get_db, get_read_db
+from models import User, Document, Annotation
 from sqlalchemy import select
+from sqlalchemy.orm import defer
 from datetime import datetime
-import uvicorn
 from typing import List
+from uuid import UUID
 from api.v1.api import api_router
-from routers import auth, documents, annotations
+from services.search_service import SearchService
+from services.annotation_history import AnnotationHistoryService
+from services.read_cache import (
+    get_project_payload, get_document_payload, invalidate_documents,
+    document_annotations_version, project_documents_version
+)
+from core.etag import make_etag, etag_matches, set_etag, not_modified
+from core.sql_profiler import query_budget
+from routers import auth, documents, annotations, admin, projects
 from middleware.error_handler import ErrorHandler
 from core.config import settings
 from core.logging import setup_logging, logger
-from core.middleware import error_handler
+from core.middleware import error_handler, read_your_writes, record_metrics, trace_requests, count_queries
+from core.monitoring import track_llm_call
+from services.llm import get_openai
+from core.lifespan import lifespan
+from core.profiler import RequestProfiler
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest, multiprocess, REGISTRY
 
 load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
 
 # setup logging
 setup_logging()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    version=settings.VERSION
+    version=settings.VERSION,
+    lifespan=lifespan
 )
 
 # add CORS middleware
@@ -36,6 +49,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Query-Count", "Server-Timing", settings.PROFILER_HEADER],
 )
 
 # add error handling middleware
@@ -43,22 +57,39 @@ app.add_middleware(
 async def middleware(request: Request, call_next):
     return await error_handler(request, call_next)
 
+# keep reads on the primary right after a client writes
+@app.middleware("http")
+async def replica_stickiness(request: Request, call_next):
+    return await read_your_writes(request, call_next)
+
+# query count per request, outside the error handler so budget failures reach tests
+@app.middleware("http")
+async def query_profiler(request: Request, call_next):
+    return await count_queries(request, call_next)
+
+# sampled requests get a trace covering db, cache and llm spans
+@app.middleware("http")
+async def tracing(request: Request, call_next):
+    return await trace_requests(request, call_next)
+
+# outermost, so it sees the status the client gets
+@app.middleware("http")
+async def metrics(request: Request, call_next):
+    return await record_metrics(request, call_next)
+
+# admin-only request profiling, a plain ASGI check of one header otherwise
+app.add_middleware(RequestProfiler)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 app.include_router(auth.router, prefix="/auth")
+app.include_router(projects.router)
 app.include_router(documents.router)
 app.include_router(annotations.router)
+app.include_router(admin.router)
 
 class DocumentRequest(BaseModel):
     text: str
-    project_id: str
-
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Starting up TagFlow API")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("Shutting down TagFlow API")
+    project_id: UUID
 
 @app.get("/")
 async def root():
@@ -76,10 +107,7 @@ async def annotate_document(
 ):
     try:
         # verify project exists
-        project = await db.execute(
-            select(Project).where(Project.id == request.project_id)
-        )
-        project = project.scalar_one_or_none()
+        project = await get_project_payload(db, request.project_id)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
 
@@ -92,109 +120,97 @@ async def annotate_document(
         await db.flush()
 
         # get annotations from openai
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that analyzes text and provides annotations."},
-                {"role": "user", "content": f"Please analyze this text and provide key annotations: {request.text}"}
-            ]
-        )
+        with track_llm_call("gpt-3.5-turbo") as call:
+            response = call.response = get_openai().ChatCompletion.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant that analyzes text and provides annotations."},
+                    {"role": "user", "content": f"Please analyze this text and provide key annotations: {request.text}"}
+                ]
+            )
         
         annotations = response.choices[0].message.content.split('\n')
         
         # store annotation in db
         annotation = Annotation(
             document_id=document.id,
-            content=annotations,
-            model_version="gpt-3.5-turbo"
+            content=annotations
         )
         db.add(annotation)
+        AnnotationHistoryService(db).record_created(annotation)
         await db.flush()
+        await SearchService(db).index_documents([document.id])
 
         return {"annotations": annotations}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/projects")
-async def create_project(
-    project_data: dict = Body(...),
-    db: AsyncSession = Depends(get_db)
-):
-    try:
-        # create default schema if none provided
-        default_schema = {
-            "type": "text_classification",
-            "labels": ["positive", "negative", "neutral"],
-            "multi_label": False
-        }
-        
-        new_project = Project(
-            name=project_data['name'],
-            description=project_data.get('description', ''),
-            schema=project_data.get('schema', default_schema),
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
-        )
-        
-        db.add(new_project)
-        await db.commit()
-        await db.refresh(new_project)
-        
-        return {
-            "id": str(new_project.id),
-            "name": new_project.name,
-            "description": new_project.description,
-            "schema": new_project.schema,
-            "created_at": new_project.created_at.isoformat()
-        }
-    except Exception as e:
-        print(f"Project creation error: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/api/projects")
-async def get_projects(db: AsyncSession = Depends(get_db)):
-    try:
-        result = await db.execute(select(Project))
-        projects = result.scalars().all()
-        return [
-            {
-                "id": str(p.id),
-                "name": p.name,
-                "schema": p.schema,
-                "created_at": p.created_at.isoformat(),
-                "updated_at": p.updated_at.isoformat()
-            }
-            for p in projects
-        ]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # several worker processes, aggregate their metric files
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
 
 @app.get("/config")
 def get_config():
     return {"db_url": os.getenv("DATABASE_URL")}
 
 @app.get("/api/projects/{project_id}/documents")
+@query_budget(2)  # version aggregate and the listing itself, never a query per row
 async def get_project_documents(
-    project_id: str,
-    db: AsyncSession = Depends(get_db)
+    project_id: UUID,
+    request: Request,
+    response: Response,
+    include_content: bool = False,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    result = await db.execute(
-        select(Document).where(Document.project_id == project_id)
+    # a repeat view only pays for two aggregates
+    etag = make_etag("documents", project_id, include_content, *await project_documents_version(db, project_id))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    has_annotations = (
+        select(Annotation.id)
+        .where(Annotation.document_id == Document.id)
+        .exists()
+        .label("has_annotations")
     )
-    documents = result.scalars().all()
-    return [{
-        "id": doc.id,
-        "content": doc.content,
-        "metadata": {
-            "status": "annotated" if doc.annotations else "pending"
+    query = select(Document, has_annotations).where(Document.project_id == project_id)
+    if not include_content:
+        # listings only need ids and status, content is fetched per document
+        query = query.options(defer(Document.content))
+    result = await db.execute(query)
+    documents = []
+    for doc, annotated in result.all():
+        item = {
+            "id": doc.id,
+            "metadata": {
+                "status": "annotated" if annotated else "pending"
+            }
         }
-    } for doc in documents]
+        if include_content:
+            item["content"] = doc.content
+        documents.append(item)
+    return documents
 
 @app.get("/api/documents/{document_id}/annotations")
+@query_budget(2)
 async def get_document_annotations(
-    document_id: str,
-    db: AsyncSession = Depends(get_db)
+    document_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
 ):
+    etag = make_etag("annotations", document_id, *await document_annotations_version(db, document_id))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
     result = await db.execute(
         select(Annotation).where(Annotation.document_id == document_id)
     )
@@ -203,24 +219,29 @@ async def get_document_annotations(
 
 @app.put("/api/documents/{document_id}")
 async def update_document(
-    document_id: str,
+    document_id: UUID,
     content: str,
     db: AsyncSession = Depends(get_db)
 ):
     result = await db.execute(
-        select(Document).where(Document.id == document_id)
+        select(Document)
+        .options(defer(Document.content))
+        .where(Document.id == document_id)
     )
     document = result.scalar_one_or_none()
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
     document.content = content
+    await db.flush()
+    await SearchService(db).index_documents([document.id])
     await db.commit()
+    await invalidate_documents(document_id)
     return {"message": "Document updated successfully"}
 
 @app.get("/api/projects/{project_id}/stats")
 async def get_project_stats(
-    project_id: str,
+    project_id: UUID,
     db: AsyncSession = Depends(get_db)
 ):
     # add project statistics logic
@@ -236,7 +257,7 @@ async def test():
 
 @app.post("/api/projects/{project_id}/documents/batch")
 async def upload_documents(
-    project_id: str,
+    project_id: UUID,
     files: List[UploadFile] = File(...),
     db: AsyncSession = Depends(get_db)
 ):
@@ -252,6 +273,8 @@ async def upload_documents(
             db.add(doc)
             uploaded_docs.append(doc)
         
+        await db.flush()
+        await SearchService(db).index_documents(doc.id for doc in uploaded_docs)
         await db.commit()
         return {"message": f"Successfully uploaded {len(uploaded_docs)} documents"}
     except Exception as e:
@@ -259,27 +282,28 @@ async def upload_documents(
 
 @app.post("/api/documents/{document_id}/annotate")
 async def annotate_document(
-    document_id: str,
+    document_id: UUID,
     db: AsyncSession = Depends(get_db)
 ):
     try:
         # get document
-        doc = await db.get(Document, document_id)
+        doc = await get_document_payload(db, document_id)
         if not doc:
             raise HTTPException(status_code=404, detail="Document not found")
         
         # get project schema
-        project = await db.get(Project, doc.project_id)
+        project = await get_project_payload(db, doc["project_id"])
         
         # generate AI annotation
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": f"You are an expert at {project.schema['type']} annotation. Available labels: {project.schema['labels']}"},
-                {"role": "user", "content": f"Please analyze this text and provide labels: {doc.content}"}
-            ],
-            temperature=0.3
-        )
+        with track_llm_call("gpt-3.5-turbo") as call:
+            response = call.response = get_openai().ChatCompletion.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": f"You are an expert at {project['schema']['type']} annotation. Available labels: {project['schema']['labels']}"},
+                    {"role": "user", "content": f"Please analyze this text and provide labels: {doc['content']}"}
+                ],
+                temperature=0.3
+            )
         
         # calculate confidence score (example)
         confidence_score = 0.85  # maybe implement more sophisticated scoring later 
@@ -293,6 +317,9 @@ async def annotate_document(
         )
         
         db.add(annotation)
+        AnnotationHistoryService(db).record_created(annotation)
+        await db.flush()
+        await SearchService(db).index_documents([document_id])
         await db.commit()
         
         return {
@@ -303,4 +330,5 @@ async def annotate_document(
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,19 +1,18 @@
+import asyncio
 from logging.config import fileConfig
-from sqlalchemy import engine_from_config
-from sqlalchemy import pool
+from sqlalchemy import UUID
+from sqlalchemy.engine import Connection
+from sqlalchemy.pool import NullPool
 from alembic import context
+from core.config import settings
+from database import build_engine
 from models import Base  # Import our SQLAlchemy Base
-from dotenv import load_dotenv
-import os
-
-# Load environment variables
-load_dotenv()
 
 # this is the Alembic Config object
 config = context.config
 
-# Set the sqlalchemy url from environment variable
-config.set_main_option("sqlalchemy.url", os.getenv("DATABASE_URL"))
+# the URL comes from the app settings unless the caller set sqlalchemy.url
+url = config.get_main_option("sqlalchemy.url") or settings.SQLALCHEMY_DATABASE_URI
 
 # Interpret the config file for Python logging
 if config.config_file_name is not None:
@@ -22,4 +21,37 @@ if config.config_file_name is not None:
 # Set the target metadata for migrations
 target_metadata = Base.metadata  # Use our SQLAlchemy models
 
-# ... rest of the file remains the same ... 
\ No newline at end of file
+def _configure(**kw) -> None:
+    # SQLite can't ALTER most things, batch mode rebuilds the table instead
+    context.configure(
+        target_metadata=target_metadata,
+        render_as_batch=url.startswith("sqlite"),
+        compare_type=True,
+        **kw,
+    )
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL to stdout (alembic upgrade head --sql)"""
+    _configure(url=url, literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+def do_run_migrations(connection: Connection) -> None:
+    if connection.dialect.name == "sqlite":
+        # batch mode copies tables as reflected, keep UUID columns UUID
+        # instead of the NUMERIC SQLite reflects unknown type names as
+        connection.dialect.ischema_names = {**connection.dialect.ischema_names, "UUID": UUID}
+    _configure(connection=connection)
+    with context.begin_transaction():
+        context.run_migrations()
+
+async def run_migrations_online() -> None:
+    engine = build_engine(url, name="migrations", poolclass=NullPool)
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await engine.dispose()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
@@ -0,0 +1,55 @@
+"""store document content as bytes
+
+Revision ID: 14cdfd743118
+Revises: 54a7a356c379
+Create Date: 2026-10-19 17:04:37.926301
+
+documents.content becomes bytea so CompressedText can store zstd frames.
+Existing rows are converted to their UTF-8 bytes, which CompressedText
+reads back unchanged. They are compressed when next written.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '14cdfd743118'
+down_revision: Union[str, None] = '54a7a356c379'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# start of every zstd frame, as models.types.ZSTD_MAGIC
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.alter_column(
+            'content',
+            existing_type=sa.String(),
+            type_=sa.LargeBinary(),
+            existing_nullable=False,
+            postgresql_using="convert_to(content, 'UTF8')",
+        )
+
+
+def downgrade() -> None:
+    compressed = op.get_bind().execute(
+        sa.text("SELECT 1 FROM documents WHERE substr(content, 1, 4) = :magic LIMIT 1"),
+        {"magic": ZSTD_MAGIC},
+    ).first()
+    if compressed is not None:
+        raise RuntimeError(
+            "documents hold zstd-compressed content, which a text column "
+            "can't store; decompress them before downgrading"
+        )
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.alter_column(
+            'content',
+            existing_type=sa.LargeBinary(),
+            type_=sa.String(),
+            existing_nullable=False,
+            postgresql_using="convert_from(content, 'UTF8')",
+        )
@@ -0,0 +1,84 @@
+"""initial schema
+
+Revision ID: 54a7a356c379
+Revises: 
+Create Date: 2026-10-19 17:02:11.408215
+
+Databases created with Base.metadata.create_all before migrations existed
+match this revision, mark them with ``alembic stamp 54a7a356c379``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '54a7a356c379'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # foreign keys carry PostgreSQL's default names so later revisions can
+    # drop them on databases created with create_all as well
+    op.create_table(
+        'users',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('role', sa.Enum('ADMIN', 'ANNOTATOR', 'VIEWER', name='userrole'), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id', name='users_pkey'),
+        sa.UniqueConstraint('email', name='users_email_key'),
+    )
+    op.create_table(
+        'projects',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('schema', sa.JSON(), nullable=False),
+        sa.Column('created_by', sa.UUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], name='projects_created_by_fkey'),
+        sa.PrimaryKeyConstraint('id', name='projects_pkey'),
+    )
+    op.create_table(
+        'documents',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('project_id', sa.UUID(), nullable=True),
+        sa.Column('content', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], name='documents_project_id_fkey'),
+        sa.PrimaryKeyConstraint('id', name='documents_pkey'),
+    )
+    op.create_table(
+        'annotations',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('document_id', sa.UUID(), nullable=True),
+        sa.Column('created_by', sa.UUID(), nullable=True),
+        sa.Column('content', sa.JSON(), nullable=False),
+        sa.Column('confidence_score', sa.Float(), nullable=True),
+        sa.Column('verified', sa.Boolean(), nullable=True),
+        sa.Column('verified_by', sa.UUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], name='annotations_created_by_fkey'),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], name='annotations_document_id_fkey'),
+        sa.ForeignKeyConstraint(['verified_by'], ['users.id'], name='annotations_verified_by_fkey'),
+        sa.PrimaryKeyConstraint('id', name='annotations_pkey'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('annotations')
+    op.drop_table('documents')
+    op.drop_table('projects')
+    op.drop_table('users')
+    sa.Enum(name='userrole').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,54 @@
+"""add the change_log table and its triggers
+
+Revision ID: 5d48839c336c
+Revises: d17b36fe8d81
+Create Date: 2026-10-19 17:31:15.069420
+
+The log starts empty. Clients load a project in full once and follow the
+feed from its head cursor, see services/change_feed.py.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from models.triggers import change_log_ddl
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d48839c336c'
+down_revision: Union[str, None] = 'd17b36fe8d81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'change_log',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+        sa.Column('xid', sa.BigInteger(), nullable=False),
+        sa.Column('project_id', sa.UUID(), nullable=False),
+        sa.Column('entity', sa.String(), nullable=False),
+        sa.Column('entity_id', sa.UUID(), nullable=False),
+        sa.Column('op', sa.String(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id', name='change_log_pkey'),
+    )
+    op.create_index('ix_change_log_project_cursor', 'change_log', ['project_id', 'xid', 'id'])
+    op.create_index('ix_change_log_changed_at', 'change_log', ['changed_at'])
+    for statement in change_log_ddl(op.get_bind().dialect.name):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP TRIGGER IF EXISTS annotations_change_log ON annotations')
+        op.execute('DROP TRIGGER IF EXISTS documents_change_log ON documents')
+        op.execute('DROP FUNCTION IF EXISTS log_annotation_change()')
+        op.execute('DROP FUNCTION IF EXISTS log_document_change()')
+    elif op.get_bind().dialect.name == 'sqlite':
+        for table in ('documents', 'annotations'):
+            for event in ('insert', 'update', 'delete'):
+                op.execute(f'DROP TRIGGER IF EXISTS {table}_change_log_{event}')
+    op.drop_index('ix_change_log_changed_at', table_name='change_log')
+    op.drop_index('ix_change_log_project_cursor', table_name='change_log')
+    op.drop_table('change_log')
@@ -0,0 +1,42 @@
+"""add documents.search_vector and the search indexes
+
+Revision ID: 949ed14083f9
+Revises: 14cdfd743118
+Create Date: 2026-10-19 17:11:52.640187
+
+search_vector starts out NULL, and a NULL vector matches no search. Run
+scripts/reindex_search.py after upgrading to index existing documents.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '949ed14083f9'
+down_revision: Union[str, None] = '14cdfd743118'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # tsvector on PostgreSQL, lowercased text for the LIKE fallback elsewhere
+    op.add_column(
+        'documents',
+        sa.Column('search_vector', sa.Text().with_variant(postgresql.TSVECTOR(), 'postgresql'), nullable=True),
+    )
+    op.create_index('ix_documents_project_status', 'documents', ['project_id', 'status'])
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index('ix_documents_search_vector', 'documents', ['search_vector'], postgresql_using='gin')
+    op.create_index('ix_annotations_document_id', 'annotations', ['document_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_annotations_document_id', table_name='annotations')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_documents_search_vector', table_name='documents')
+    op.drop_index('ix_documents_project_status', table_name='documents')
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.drop_column('search_vector')
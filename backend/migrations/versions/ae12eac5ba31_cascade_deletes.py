@@ -0,0 +1,45 @@
+"""delete documents, annotations and versions with their parent
+
+Revision ID: ae12eac5ba31
+Revises: c039f758f44e
+Create Date: 2026-10-19 17:19:44.275610
+
+Purges delete projects and documents with set-based statements and rely
+on ON DELETE CASCADE for the rows below them.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ae12eac5ba31'
+down_revision: Union[str, None] = 'c039f758f44e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, referenced table), named as PostgreSQL names them
+FOREIGN_KEYS = [
+    ('documents', 'project_id', 'projects'),
+    ('annotations', 'document_id', 'documents'),
+    ('annotation_versions', 'annotation_id', 'annotations'),
+]
+
+# names the unnamed foreign keys SQLite reflects from create_all databases
+NAMING_CONVENTION = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+
+
+def _replace_foreign_keys(ondelete) -> None:
+    for table, column, referred in FOREIGN_KEYS:
+        name = f'{table}_{column}_fkey'
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            batch_op.drop_constraint(name, type_='foreignkey')
+            batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    _replace_foreign_keys('CASCADE')
+
+
+def downgrade() -> None:
+    _replace_foreign_keys(None)
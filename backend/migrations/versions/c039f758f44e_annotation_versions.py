@@ -0,0 +1,51 @@
+"""add annotations.version and the annotation_versions table
+
+Revision ID: c039f758f44e
+Revises: 949ed14083f9
+Create Date: 2026-10-19 17:15:08.113942
+
+Existing annotations start at version 1 with no history rows. The first
+change to one stores its old content as a version 1 snapshot, see
+services/annotation_history.py.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c039f758f44e'
+down_revision: Union[str, None] = '949ed14083f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('annotations', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.create_table(
+        'annotation_versions',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('annotation_id', sa.UUID(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('is_snapshot', sa.Boolean(), nullable=False),
+        sa.Column('content', sa.JSON(), nullable=False),
+        sa.Column('verified', sa.Boolean(), nullable=True),
+        sa.Column('created_by', sa.UUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['annotation_id'], ['annotations.id'], name='annotation_versions_annotation_id_fkey'),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], name='annotation_versions_created_by_fkey'),
+        sa.PrimaryKeyConstraint('id', name='annotation_versions_pkey'),
+    )
+    op.create_index(
+        'ix_annotation_versions_annotation_version', 'annotation_versions', ['annotation_id', 'version'], unique=True
+    )
+    op.create_index('ix_annotation_versions_created_at', 'annotation_versions', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_annotation_versions_created_at', table_name='annotation_versions')
+    op.drop_index('ix_annotation_versions_annotation_version', table_name='annotation_versions')
+    op.drop_table('annotation_versions')
+    with op.batch_alter_table('annotations') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,28 @@
+"""add users.is_active
+
+Revision ID: d17b36fe8d81
+Revises: ae12eac5ba31
+Create Date: 2026-10-19 17:26:30.581749
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd17b36fe8d81'
+down_revision: Union[str, None] = 'ae12eac5ba31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # existing users stay able to log in
+    op.add_column('users', sa.Column('is_active', sa.Boolean(), server_default=sa.true(), nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('is_active')
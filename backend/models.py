@@ -1,60 +0,0 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Float, Boolean, UUID
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
-from datetime import datetime
-import uuid
-from database import Base
-
-class Project(Base):
-    __tablename__ = "projects"
-    
-    id = Column(UUID, primary_key=True, default=uuid.uuid4)
-    name = Column(String, nullable=False)
-    schema = Column(JSON, nullable=True, default={})
-    description = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
-    documents = relationship("Document", back_populates="project")
-
-class Document(Base):
-    __tablename__ = "documents"
-    
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    project_id = Column(String, ForeignKey("projects.id"), nullable=False)
-    content = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
-    project = relationship("Project", back_populates="documents")
-    annotations = relationship("Annotation", back_populates="document")
-
-class Annotation(Base):
-    __tablename__ = "annotations"
-    
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    document_id = Column(String, ForeignKey("documents.id"), nullable=False)
-    content = Column(JSON, nullable=False)
-    model_version = Column(String)  # To track which AI model version created this
-    confidence_score = Column(Float)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    
-    document = relationship("Document", back_populates="annotations")
-
-class User(Base):
-    __tablename__ = "users"
-    
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    email = Column(String, unique=True, nullable=False)
-    hashed_password = Column(String, nullable=False)
-    is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-
-class AnnotationVersion(Base):
-    __tablename__ = "annotation_versions"
-    
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    annotation_id = Column(String, ForeignKey("annotations.id"))
-    content = Column(JSON, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    created_by = Column(String, ForeignKey("users.id")) 
\ No newline at end of file
@@ -1,3 +1,4 @@
-from .base import Base, User, Project, Document, Annotation, UserRole
+from .base import Base, User, Project, Document, Annotation, AnnotationVersion, ChangeLog, UserRole
+from . import triggers  # noqa: F401, installs the change log triggers on create_all
 
-__all__ = ['Base', 'User', 'Project', 'Document', 'Annotation', 'UserRole']
\ No newline at end of file
+__all__ = ['Base', 'User', 'Project', 'Document', 'Annotation', 'AnnotationVersion', 'ChangeLog', 'UserRole']
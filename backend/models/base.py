@@ -1,8 +1,9 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, UUID, Enum, Float, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Enum, Float, Boolean, Index, Integer, BigInteger, true
 from sqlalchemy.orm import declarative_base, relationship
 from datetime import datetime
 import uuid
 import enum
+from .types import CompressedText, SearchVector, UUID
 
 Base = declarative_base()
 
@@ -20,10 +21,11 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     hashed_password = Column(String, nullable=False)
+    is_active = Column(Boolean, nullable=False, default=True, server_default=true())
     
     projects = relationship("Project", back_populates="creator")
-    annotations = relationship("Annotation", back_populates="created_by_user")
-    verified_annotations = relationship("Annotation", back_populates="verified_by_user")
+    annotations = relationship("Annotation", foreign_keys="Annotation.created_by", back_populates="created_by_user")
+    verified_annotations = relationship("Annotation", foreign_keys="Annotation.verified_by", back_populates="verified_by_user")
 
 class Project(Base):
     __tablename__ = "projects"
@@ -36,32 +38,78 @@ class Project(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     creator = relationship("User", back_populates="projects")
-    documents = relationship("Document", back_populates="project")
+    documents = relationship("Document", back_populates="project", passive_deletes=True)
 
 class Document(Base):
     __tablename__ = "documents"
     id = Column(UUID, primary_key=True, default=uuid.uuid4)
-    project_id = Column(UUID, ForeignKey('projects.id'))
-    content = Column(String, nullable=False)
+    project_id = Column(UUID, ForeignKey('projects.id', ondelete="CASCADE"))
+    content = Column(CompressedText, nullable=False)
     status = Column(String, default='pending')
+    search_vector = Column(SearchVector)  # content + annotation labels, see services/search_service.py
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     project = relationship("Project", back_populates="documents")
-    annotations = relationship("Annotation", back_populates="document")
+    annotations = relationship("Annotation", back_populates="document", passive_deletes=True)
+
+    __table_args__ = (
+        Index("ix_documents_project_status", "project_id", "status"),
+        Index("ix_documents_search_vector", "search_vector", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
 
 class Annotation(Base):
     __tablename__ = "annotations"
     id = Column(UUID, primary_key=True, default=uuid.uuid4)
-    document_id = Column(UUID, ForeignKey('documents.id'))
+    document_id = Column(UUID, ForeignKey('documents.id', ondelete="CASCADE"), index=True)
     created_by = Column(UUID, ForeignKey('users.id'))
     content = Column(JSON, nullable=False)
     confidence_score = Column(Float)
     verified = Column(Boolean, default=False)
     verified_by = Column(UUID, ForeignKey('users.id'))
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # bumped on every change, see AnnotationVersion
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     document = relationship("Document", back_populates="annotations")
     created_by_user = relationship("User", foreign_keys=[created_by], back_populates="annotations")
-    verified_by_user = relationship("User", foreign_keys=[verified_by], back_populates="verified_annotations") 
\ No newline at end of file
+    verified_by_user = relationship("User", foreign_keys=[verified_by], back_populates="verified_annotations")
+    versions = relationship("AnnotationVersion", back_populates="annotation", passive_deletes=True)
+
+class AnnotationVersion(Base):
+    __tablename__ = "annotation_versions"
+    id = Column(UUID, primary_key=True, default=uuid.uuid4)
+    annotation_id = Column(UUID, ForeignKey('annotations.id', ondelete="CASCADE"), nullable=False)
+    version = Column(Integer, nullable=False)
+    is_snapshot = Column(Boolean, nullable=False, default=False)
+    content = Column(JSON, nullable=False)  # full content for snapshots, a JSON delta otherwise
+    verified = Column(Boolean, default=False)
+    created_by = Column(UUID, ForeignKey('users.id'))  # None for AI-generated versions
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    annotation = relationship("Annotation", back_populates="versions")
+
+    __table_args__ = (
+        Index("ix_annotation_versions_annotation_version", "annotation_id", "version", unique=True),
+        Index("ix_annotation_versions_created_at", "created_at"),
+    )
+
+class ChangeLog(Base):
+    """One row per document or annotation change, written by database triggers.
+
+    Deletes stay here as tombstones, so there are no foreign keys. See
+    models/triggers.py and services/change_feed.py.
+    """
+    __tablename__ = "change_log"
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    xid = Column(BigInteger, nullable=False, default=0)  # writing transaction on PostgreSQL, 0 elsewhere
+    project_id = Column(UUID, nullable=False)
+    entity = Column(String, nullable=False)  # "document" or "annotation"
+    entity_id = Column(UUID, nullable=False)
+    op = Column(String, nullable=False)  # "upsert" or "delete"
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_change_log_project_cursor", "project_id", "xid", "id"),
+        Index("ix_change_log_changed_at", "changed_at"),
+    )
@@ -0,0 +1,116 @@
+from typing import List
+from sqlalchemy import event
+from .base import Base
+
+# Triggers that fill change_log. Triggers catch every write, including bulk
+# UPDATE/DELETE statements and purges that never go through the ORM.
+# Alembic autogenerate does not see them, migrations add them with
+# ``for statement in change_log_ddl(dialect): op.execute(statement)``.
+
+_POSTGRES = [
+    """
+    CREATE OR REPLACE FUNCTION log_document_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            INSERT INTO change_log (xid, project_id, entity, entity_id, op, changed_at)
+            SELECT txid_current(), OLD.project_id, 'document', OLD.id, 'delete', now() AT TIME ZONE 'utc'
+            WHERE OLD.project_id IS NOT NULL;
+            RETURN OLD;
+        END IF;
+        INSERT INTO change_log (xid, project_id, entity, entity_id, op, changed_at)
+        SELECT txid_current(), NEW.project_id, 'document', NEW.id, 'upsert', now() AT TIME ZONE 'utc'
+        WHERE NEW.project_id IS NOT NULL;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    # a document deleted with ON DELETE CASCADE is gone when its annotations
+    # are, its own tombstone covers them
+    """
+    CREATE OR REPLACE FUNCTION log_annotation_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            INSERT INTO change_log (xid, project_id, entity, entity_id, op, changed_at)
+            SELECT txid_current(), project_id, 'annotation', OLD.id, 'delete', now() AT TIME ZONE 'utc'
+            FROM documents WHERE id = OLD.document_id AND project_id IS NOT NULL;
+            RETURN OLD;
+        END IF;
+        INSERT INTO change_log (xid, project_id, entity, entity_id, op, changed_at)
+        SELECT txid_current(), project_id, 'annotation', NEW.id, 'upsert', now() AT TIME ZONE 'utc'
+        FROM documents WHERE id = NEW.document_id AND project_id IS NOT NULL;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS documents_change_log ON documents",
+    # search_vector is rewritten on every annotation change, it is not a change of its own
+    """
+    CREATE TRIGGER documents_change_log
+    AFTER INSERT OR UPDATE OF project_id, content, status OR DELETE ON documents
+    FOR EACH ROW EXECUTE PROCEDURE log_document_change()
+    """,
+    "DROP TRIGGER IF EXISTS annotations_change_log ON annotations",
+    """
+    CREATE TRIGGER annotations_change_log
+    AFTER INSERT OR UPDATE OR DELETE ON annotations
+    FOR EACH ROW EXECUTE PROCEDURE log_annotation_change()
+    """,
+]
+
+# SQLite has one writer at a time, so ids alone are in commit order
+_SQLITE = [
+    """
+    CREATE TRIGGER IF NOT EXISTS documents_change_log_insert AFTER INSERT ON documents
+    WHEN NEW.project_id IS NOT NULL BEGIN
+        INSERT INTO change_log (xid, project_id, entity, entity_id, op, changed_at)
+        VALUES (0, NEW.project_id, 'document', NEW.id, 'upsert', CURRENT_TIMESTAMP);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS documents_change_log_update AFTER UPDATE OF project_id, content, status ON documents
+    WHEN NEW.project_id IS NOT NULL BEGIN
+        INSERT INTO change_log (xid, project_id, entity, entity_id, op, changed_at)
+        VALUES (0, NEW.project_id, 'document', NEW.id, 'upsert', CURRENT_TIMESTAMP);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS documents_change_log_delete AFTER DELETE ON documents
+    WHEN OLD.project_id IS NOT NULL BEGIN
+        INSERT INTO change_log (xid, project_id, entity, entity_id, op, changed_at)
+        VALUES (0, OLD.project_id, 'document', OLD.id, 'delete', CURRENT_TIMESTAMP);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS annotations_change_log_insert AFTER INSERT ON annotations BEGIN
+        INSERT INTO change_log (xid, project_id, entity, entity_id, op, changed_at)
+        SELECT 0, project_id, 'annotation', NEW.id, 'upsert', CURRENT_TIMESTAMP
+        FROM documents WHERE id = NEW.document_id AND project_id IS NOT NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS annotations_change_log_update AFTER UPDATE ON annotations BEGIN
+        INSERT INTO change_log (xid, project_id, entity, entity_id, op, changed_at)
+        SELECT 0, project_id, 'annotation', NEW.id, 'upsert', CURRENT_TIMESTAMP
+        FROM documents WHERE id = NEW.document_id AND project_id IS NOT NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS annotations_change_log_delete AFTER DELETE ON annotations BEGIN
+        INSERT INTO change_log (xid, project_id, entity, entity_id, op, changed_at)
+        SELECT 0, project_id, 'annotation', OLD.id, 'delete', CURRENT_TIMESTAMP
+        FROM documents WHERE id = OLD.document_id AND project_id IS NOT NULL;
+    END
+    """,
+]
+
+def change_log_ddl(dialect: str) -> List[str]:
+    """Statements creating the change log triggers, empty for other databases"""
+    return {"postgresql": _POSTGRES, "sqlite": _SQLITE}.get(dialect, [])
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_change_log_triggers(metadata, connection, tables=(), **kw):
+    names = {table.name for table in tables}
+    if tables and "change_log" not in names:
+        return
+    for statement in change_log_ddl(connection.dialect.name):
+        connection.exec_driver_sql(statement)
@@ -0,0 +1,73 @@
+from typing import Any, Optional
+import uuid
+from sqlalchemy.types import TypeDecorator, LargeBinary, Text, UUID as _UUID
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # compression is optional, plain UTF-8 is stored without it
+    zstandard = None
+
+# every zstd frame starts with these bytes, UTF-8 text never does (0xB5 can't follow '(')
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+class CompressedText(TypeDecorator):
+    """Text column stored as bytes, zstd-compressed above a size threshold.
+
+    Values are decompressed transparently on load, so callers only ever see
+    str. Rows written uncompressed (small texts, or compression disabled)
+    are plain UTF-8 and read back unchanged.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        data = value.encode("utf-8")
+        if (
+            settings.DOCUMENT_COMPRESSION_ENABLED
+            and zstandard is not None
+            and len(data) >= settings.DOCUMENT_COMPRESSION_MIN_BYTES
+        ):
+            compressed = zstandard.ZstdCompressor(
+                level=settings.DOCUMENT_COMPRESSION_LEVEL
+            ).compress(data)
+            if len(compressed) < len(data):
+                return compressed
+        return data
+
+    def process_result_value(self, value, dialect) -> Optional[str]:
+        if value is None or isinstance(value, str):
+            return value
+        data = bytes(value)
+        if data.startswith(ZSTD_MAGIC):
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read compressed document content")
+            data = zstandard.ZstdDecompressor().decompress(data)
+        return data.decode("utf-8")
+
+class SearchVector(TypeDecorator):
+    """tsvector on PostgreSQL, plain text elsewhere for the SQLite search fallback"""
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(TSVECTOR())
+        return dialect.type_descriptor(Text())
+
+class UUID(TypeDecorator):
+    """UUID column that also binds ids given as strings, as route parameters are.
+
+    PostgreSQL casts strings itself, SQLite stores hex and needs uuid.UUID.
+    """
+    impl = _UUID
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[uuid.UUID]:
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(str(value))
+
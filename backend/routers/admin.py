@@ -0,0 +1,72 @@
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_db
+from models import User, UserRole
+from auth.roles import require_admin, role_of
+from schemas.user import UserUpdate, UserResponse
+from services.auth_service import AuthService
+from core.config import settings
+from core.profiler import sample_worker, to_speedscope, to_collapsed, load_report
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+@router.get("/profile")
+async def profile_worker(
+    seconds: float = Query(10, gt=0),
+    interval_ms: float = Query(settings.PROFILER_INTERVAL_MS, ge=1, le=1000),
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed)$"),
+    loop_only: bool = False,
+    current_user: User = Depends(require_admin)
+):
+    """Sample the worker serving this request for N seconds.
+
+    Returns a speedscope profile per thread, or folded stacks for
+    flamegraph.pl with format=collapsed. Only this worker process is sampled.
+    """
+    if seconds > settings.PROFILER_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.PROFILER_MAX_SECONDS} seconds")
+    sampler = await sample_worker(seconds, interval_ms / 1000, loop_only)
+    if format == "collapsed":
+        return PlainTextResponse(to_collapsed(sampler))
+    return to_speedscope(sampler, f"worker sample, {seconds:g}s")
+
+@router.get("/profiles/{profile_id}")
+async def get_request_profile(
+    profile_id: str,
+    current_user: User = Depends(require_admin)
+):
+    """Speedscope report of a request sent with the profile header"""
+    report = await load_report(profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found or expired")
+    return report
+
+@router.patch("/users/{user_id}", response_model=UserResponse)
+async def update_user(
+    user_id: UUID,
+    update: UserUpdate,
+    current_user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Change a user's role or (de)activate them.
+
+    The user's cache entry is dropped, so the change applies to their very
+    next request instead of after USER_CACHE_TTL.
+    """
+    user = await db.get(User, user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    auth_service = AuthService(db)
+    if update.role is not None:
+        await auth_service.set_role(user, UserRole(update.role))
+    if update.is_active is not None:
+        await auth_service.set_active(user, update.is_active)
+    return {
+        "id": user.id,
+        "email": user.email,
+        "name": user.name,
+        "role": role_of(user),
+        "is_active": user.is_active,
+    }
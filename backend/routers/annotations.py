@@ -1,26 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, Response, Query, WebSocket, WebSocketDisconnect, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from database import get_db
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from database import get_db, get_read_db, AsyncSessionLocal
 from models import Annotation, Document, User, Project
 from typing import List, Optional
-from schemas.annotation import AnnotationCreate, AnnotationResponse, BatchAnnotationResponse
+from schemas.annotation import (
+    AnnotationCreate, AnnotationResponse, BatchAnnotationResponse, AnnotationHistoryResponse,
+    BulkVerifyRequest, BulkCorrectRequest, BulkUpdateResponse
+)
 from auth.roles import require_admin, require_annotator, require_viewer
-import openai
-from services.ai_annotation_service import AIAnnotationService, AIAnnotationError
+from services.ai_annotation_service import AIAnnotationError
+from services.factory import ServiceFactory
+from services.search_service import SearchService
+from services.annotation_history import AnnotationHistoryService
+from services.read_cache import document_annotations_version
+from services.batch_progress import BatchProgress, current_state, subscribe
+from core.config import settings
+from core.deps import get_current_user
+from core.logging import logger
+from core.etag import make_etag, etag_matches, set_etag, not_modified
+from core.monitoring import batch_documents, batch_job_duration
+from core.sql_profiler import query_budget
+import json
+import time
+import uuid
 
 router = APIRouter(prefix="/api/annotations", tags=["annotations"])
 
+# keeps IN lists and version inserts of a single request reasonable
+MAX_BULK_ITEMS = 1000
+
+def _check_bulk_size(count: int) -> None:
+    if count == 0:
+        raise HTTPException(status_code=400, detail="No annotations given")
+    if count > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_ITEMS} annotations per request")
+
 @router.post("/{document_id}", response_model=AnnotationResponse)
 async def create_annotation(
-    document_id: str,
+    document_id: uuid.UUID,
     annotation: AnnotationCreate,
     current_user: User = Depends(require_annotator),  # Only admins and annotators can create
     db: AsyncSession = Depends(get_db)
 ):
     # Verify document exists
     document = await db.execute(
-        select(Document).where(Document.id == document_id)
+        select(Document.id).where(Document.id == document_id)
     )
     document = document.scalar_one_or_none()
     if not document:
@@ -34,13 +60,16 @@ async def create_annotation(
         created_by=current_user.id
     )
     db.add(db_annotation)
+    AnnotationHistoryService(db).record_created(db_annotation, current_user.id)
+    await db.flush()
+    await SearchService(db).index_documents([document_id])
     await db.commit()
     await db.refresh(db_annotation)
     return db_annotation
 
 @router.put("/{annotation_id}/verify", response_model=AnnotationResponse)
 async def verify_annotation(
-    annotation_id: str,
+    annotation_id: uuid.UUID,
     current_user: User = Depends(require_admin),  # Only admins can verify
     db: AsyncSession = Depends(get_db)
 ):
@@ -53,16 +82,40 @@ async def verify_annotation(
 
     annotation.verified = True
     annotation.verified_by = current_user.id
+    await AnnotationHistoryService(db).record_change(annotation, annotation.content, current_user.id)
     await db.commit()
     await db.refresh(annotation)
     return annotation
 
+@router.get("/{annotation_id}/history", response_model=AnnotationHistoryResponse)
+async def get_annotation_history(
+    annotation_id: uuid.UUID,
+    current_user: User = Depends(require_viewer),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Every version of an annotation, oldest first"""
+    annotation = await db.execute(
+        select(Annotation.id).where(Annotation.id == annotation_id)
+    )
+    if not annotation.scalar_one_or_none():
+        raise HTTPException(status_code=404, detail="Annotation not found")
+
+    versions = await AnnotationHistoryService(db).history(annotation_id)
+    return {"annotation_id": annotation_id, "versions": versions}
+
 @router.get("/document/{document_id}", response_model=List[AnnotationResponse])
 async def get_document_annotations(
-    document_id: str,
+    document_id: uuid.UUID,
+    request: Request,
+    response: Response,
     current_user: User = Depends(require_viewer),  # All authenticated users can view
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
+    etag = make_etag("annotations", document_id, *await document_annotations_version(db, document_id))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
     result = await db.execute(
         select(Annotation).where(Annotation.document_id == document_id)
     )
@@ -70,68 +123,252 @@ async def get_document_annotations(
     return annotations
 
 @router.post("/batch/{project_id}", response_model=BatchAnnotationResponse)
+@query_budget(10)  # constant in the number of documents
 async def batch_annotate_documents(
-    project_id: str,
-    document_ids: List[str],
-    model: str = "gpt-3.5-turbo",
+    project_id: uuid.UUID,
+    document_ids: List[uuid.UUID],
+    model: str = settings.OPENAI_MODEL,
+    job_id: Optional[str] = Query(None, max_length=64, pattern=r"^[A-Za-z0-9_-]+$"),
     background_tasks: BackgroundTasks = None,
     current_user = Depends(require_annotator),
     db: AsyncSession = Depends(get_db)
 ):
-    """Batch annotate multiple documents with enhanced AI"""
+    """Batch annotate multiple documents with enhanced AI
+
+    Progress is published per document under ``job_id``, pass your own to
+    subscribe to /batch/jobs/{job_id}/events before the batch starts.
+    """
+    if model not in settings.OPENAI_ALLOWED_MODELS:
+        raise HTTPException(status_code=422, detail=f"Model must be one of {', '.join(settings.OPENAI_ALLOWED_MODELS)}")
+    job_id = job_id or uuid.uuid4().hex
+    progress = None
     try:
         # Get project and documents
         project = await db.get(Project, project_id)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
             
-        documents = []
-        for doc_id in document_ids:
-            doc = await db.get(Document, doc_id)
-            if doc and doc.project_id == project_id:
-                documents.append(doc)
+        # one IN query, not a lookup per id
+        result = await db.execute(
+            select(Document).where(
+                Document.id.in_(document_ids),
+                Document.project_id == project_id
+            )
+        )
+        documents = result.scalars().all()
 
         if not documents:
             raise HTTPException(status_code=404, detail="No valid documents found")
 
-        # Initialize AI service
-        ai_service = AIAnnotationService(model)
+        # shared per model, prompts and the HTTP session are reused
+        ai_service = ServiceFactory.get_annotation_service(model)
         
         # Process annotations
+        progress = BatchProgress(job_id, project_id, len(documents))
+        await progress.started()
+        started = time.perf_counter()
+        history = AnnotationHistoryService(db)
         stored_annotations = []
         for doc in documents:
             try:
                 result = await ai_service.annotate_document(doc, project, db)
                 
                 db_annotation = Annotation(
+                    id=uuid.uuid4(),  # known before the flush, for the progress event
                     document_id=doc.id,
-                    content=result,
-                    model_version=model,
+                    content=result,  # needs_review travels inside the content
                     confidence_score=result.get('confidence', 0),
-                    created_by=current_user.id,
-                    needs_review=result.get('needs_review', False)
+                    created_by=current_user.id
                 )
                 db.add(db_annotation)
+                history.record_created(db_annotation)
                 stored_annotations.append(db_annotation)
+                batch_documents.labels("success").inc()
+                await progress.document_done(doc.id, {
+                    "id": db_annotation.id,
+                    "content": result,
+                    "confidence_score": db_annotation.confidence_score,
+                    "needs_review": result.get("needs_review", False),
+                })
                 
             except AIAnnotationError as e:
                 # Log error but continue with other documents
-                print(f"Error annotating document {doc.id}: {str(e)}")
+                logger.warning(f"Error annotating document {doc.id} in batch {job_id}: {e}")
+                batch_documents.labels("error").inc()
+                await progress.document_failed(doc.id, str(e))
                 continue
+        batch_job_duration.observe(time.perf_counter() - started)
         
+        await db.flush()
+        await SearchService(db).index_documents(a.document_id for a in stored_annotations)
         await db.commit()
+        # announced after the commit, so clients can fetch what they were told about
+        await progress.finished()
         
         return {
             "message": f"Successfully annotated {len(stored_annotations)} documents",
+            "job_id": job_id,
             "annotations": stored_annotations
         }
         
     except Exception as e:
+        if progress is not None:
+            await progress.aborted(str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/batch/jobs/{job_id}")
+async def get_batch_job(
+    job_id: str,
+    current_user: User = Depends(require_viewer)
+):
+    """Running counts of a batch job"""
+    state = await current_state(job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return state
+
+@router.websocket("/batch/jobs/{job_id}/events")
+async def batch_job_events(websocket: WebSocket, job_id: str, token: str = ""):
+    """Per-document events of a batch job, closed once the job is over.
+
+    Browsers cannot set headers on a WebSocket, so the access token comes as
+    the ``token`` query parameter.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            await require_viewer(current_user=await get_current_user(token=token, db=db))
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    try:
+        async for event in subscribe(job_id):
+            await websocket.send_text(json.dumps(event, default=str))
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+@router.post("/bulk/verify", response_model=BulkUpdateResponse)
+async def bulk_verify_annotations(
+    request: BulkVerifyRequest,
+    current_user: User = Depends(require_admin),  # Only admins can verify
+    db: AsyncSession = Depends(get_db)
+):
+    """Verify many annotations with a single UPDATE"""
+    annotation_ids = list(dict.fromkeys(request.annotation_ids))
+    _check_bulk_size(len(annotation_ids))
+
+    result = await db.execute(
+        update(Annotation)
+        .where(Annotation.id.in_(annotation_ids))
+        .values(verified=True, verified_by=current_user.id, version=Annotation.version + 1)
+        .returning(Annotation.id, Annotation.version, Annotation.content, Annotation.created_by)
+        .execution_options(synchronize_session=False)
+    )
+    changes = [
+        {
+            "annotation_id": row.id,
+            "version": row.version,
+            "previous_content": row.content,
+            "content": row.content,
+            "verified": True,
+            "original_author": row.created_by,
+        }
+        for row in result
+    ]
+    await AnnotationHistoryService(db).record_versions(changes, current_user.id)
+    await db.commit()
+
+    updated = {change["annotation_id"] for change in changes}
+    return {
+        "updated": [i for i in annotation_ids if i in updated],
+        "not_found": [i for i in annotation_ids if i not in updated]
+    }
+
+@router.post("/bulk/correct", response_model=BulkUpdateResponse)
+async def bulk_correct_annotations(
+    request: BulkCorrectRequest,
+    current_user = Depends(require_annotator),
+    db: AsyncSession = Depends(get_db)
+):
+    """Apply many corrections in one batched UPDATE and recalibrate the AI once"""
+    # last correction wins if an annotation is listed twice
+    corrections = {c.annotation_id: c.content for c in request.corrections}
+    _check_bulk_size(len(corrections))
+
+    result = await db.execute(
+        select(
+            Annotation.id,
+            Annotation.document_id,
+            Annotation.content,
+            Annotation.version,
+            Annotation.created_by
+        ).where(Annotation.id.in_(list(corrections)))
+    )
+    current = result.all()
+
+    if current:
+        # ORM bulk UPDATE by primary key, sent as one executemany
+        await db.execute(
+            update(Annotation),
+            [
+                {
+                    "id": row.id,
+                    "content": corrections[row.id],
+                    "verified": True,
+                    "verified_by": current_user.id,
+                    "version": row.version + 1,
+                }
+                for row in current
+            ]
+        )
+        await AnnotationHistoryService(db).record_versions(
+            [
+                {
+                    "annotation_id": row.id,
+                    "version": row.version + 1,
+                    "previous_content": row.content,
+                    "content": corrections[row.id],
+                    "verified": True,
+                    "original_author": row.created_by,
+                }
+                for row in current
+            ],
+            current_user.id
+        )
+        try:
+            await db.flush()
+        except IntegrityError:
+            # the unique (annotation_id, version) index caught a concurrent
+            # correction that read the same version
+            await db.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail="Some annotations were changed by another request, reload them and retry"
+            )
+
+        # Feed the whole batch back to the AI, thresholds are recalibrated once;
+        # training examples aren't stored yet, so the document text isn't loaded
+        ai_service = ServiceFactory.get_annotation_service()
+        await ai_service.learn_from_correction_batch(
+            db,
+            [(None, row.content, corrections[row.id]) for row in current]
+        )
+
+        await SearchService(db).index_documents({row.document_id for row in current})
+        await db.commit()
+
+    updated = {row.id for row in current}
+    return {
+        "updated": [i for i in corrections if i in updated],
+        "not_found": [i for i in corrections if i not in updated]
+    }
+
+# after the /bulk routes, or it would take /bulk/correct for an annotation id
 @router.post("/{annotation_id}/correct")
 async def correct_annotation(
-    annotation_id: str,
+    annotation_id: uuid.UUID,
     corrections: dict,
     current_user = Depends(require_annotator),
     db: AsyncSession = Depends(get_db)
@@ -142,13 +379,17 @@ async def correct_annotation(
         raise HTTPException(status_code=404, detail="Annotation not found")
 
     # Update the annotation with corrections
+    previous_content = annotation.content
     annotation.content = corrections
     annotation.verified = True
     annotation.verified_by = current_user.id
+    await AnnotationHistoryService(db).record_change(annotation, previous_content, current_user.id)
     
     # Feed correction back to AI for learning
-    ai_service = AIAnnotationService()
+    ai_service = ServiceFactory.get_annotation_service()
     await ai_service.learn_from_corrections(db, annotation.document_id, corrections)
     
+    await db.flush()
+    await SearchService(db).index_documents([annotation.document_id])
     await db.commit()
-    return {"message": "Annotation corrected and AI model updated"} 
\ No newline at end of file
+    return {"message": "Annotation corrected and AI model updated"}
@@ -1,14 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from database import get_db
 from models import User
-from auth.jwt import create_access_token, create_refresh_token
-from auth.config import Token
-from utils.security import verify_password
+from auth.roles import role_of
+from core.deps import get_refresh_user
+from core.security import create_access_token, create_refresh_token
+from services.auth_service import AuthService
 from exceptions.auth import InvalidCredentialsError, TokenExpiredError
 from schemas.error import ErrorResponse
+from schemas.auth import Token
 
 router = APIRouter(tags=["auth"])
 
@@ -23,17 +24,13 @@ async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
-    # Find user by email
-    result = await db.execute(
-        select(User).where(User.email == form_data.username)
-    )
-    user = result.scalar_one_or_none()
-    
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # also rehashes the password if BCRYPT_ROUNDS changed since it was set
+    user = await AuthService(db).authenticate_user(form_data.username, form_data.password)
+    if not user:
         raise InvalidCredentialsError()
     
     # Create tokens
-    access_token = create_access_token({"sub": user.email, "role": user.role})
+    access_token = create_access_token({"sub": user.email, "role": role_of(user)})
     refresh_token = create_refresh_token({"sub": user.email})
     
     return {
@@ -44,10 +41,10 @@ async def login(
 
 @router.post("/refresh", response_model=Token)
 async def refresh_token(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_refresh_user),
     db: AsyncSession = Depends(get_db)
 ):
-    access_token = create_access_token({"sub": current_user.email, "role": current_user.role})
+    access_token = create_access_token({"sub": current_user.email, "role": role_of(current_user)})
     return {
         "access_token": access_token,
         "token_type": "bearer"
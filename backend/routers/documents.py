@@ -1,17 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, Response, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from database import get_db
-from models import Document, Project, User
-from typing import List
-from schemas.document import DocumentCreate, DocumentResponse
+from sqlalchemy import select, and_, func, tuple_, literal
+from database import get_db, get_read_db
+from models import Document, Project, User, Annotation
+from typing import List, Optional
+from uuid import UUID
+from schemas.document import DocumentCreate, DocumentResponse, DocumentSearchResponse, DocumentPrefetchResponse
+from services.search_service import SearchService
+from services.purge_service import delete_documents
+from services.read_cache import get_document_payload, invalidate_documents
+from services.preannotation import claim_documents, preannotate_documents
+from core.config import settings
+from core.sql_profiler import query_budget
+from core.etag import make_etag, etag_matches, set_etag, not_modified
 from auth.roles import require_admin, require_annotator, require_viewer
 
 router = APIRouter(prefix="/api/documents", tags=["documents"])
 
 @router.post("/{project_id}/upload", response_model=List[DocumentResponse])
 async def upload_documents(
-    project_id: str,
+    project_id: UUID,
     files: List[UploadFile] = File(...),
     current_user: User = Depends(require_annotator),  # Only admins and annotators can upload
     db: AsyncSession = Depends(get_db)
@@ -34,42 +42,158 @@ async def upload_documents(
         doc = Document(
             project_id=project_id,
             content=content.decode(),
-            status="pending",
-            created_by=current_user.id
+            status="pending"
         )
         db.add(doc)
         uploaded_docs.append(doc)
     
+    await db.flush()
+    await SearchService(db).index_documents(doc.id for doc in uploaded_docs)
     await db.commit()
     return uploaded_docs
 
+@router.get("/search", response_model=DocumentSearchResponse)
+async def search_documents(
+    q: Optional[str] = None,
+    project_id: Optional[UUID] = None,
+    status: Optional[str] = None,
+    label: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(require_viewer),  # All authenticated users can search
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Ranked full-text search over document content and annotation labels"""
+    items, has_more = await SearchService(db).search(
+        query=q,
+        project_id=project_id,
+        status=status,
+        label=label,
+        limit=limit,
+        offset=offset
+    )
+    return {"items": items, "limit": limit, "offset": offset, "has_more": has_more}
+
+@router.get("/project/{project_id}/next", response_model=DocumentPrefetchResponse, response_model_exclude_none=True)
+@query_budget(2)  # the page in one query, plus the user on a cache miss
+async def prefetch_next_documents(
+    project_id: UUID,
+    background_tasks: BackgroundTasks,
+    limit: int = Query(5, ge=1, le=settings.PREFETCH_MAX_DOCUMENTS),
+    after: Optional[UUID] = None,
+    preannotate: bool = False,
+    current_user: User = Depends(require_annotator),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """The next unreviewed documents of a project with their latest annotation.
+
+    Documents come in upload order; pass ``next_cursor`` as ``after`` to
+    continue. With ``preannotate`` the first unannotated ones of the page are
+    annotated by the AI after the response is sent.
+    """
+    verified = (
+        select(Annotation.id)
+        .where(Annotation.document_id == Document.id, Annotation.verified == True)
+        .exists()
+    )
+    page = (
+        select(Document.id, Document.content, Document.created_at)
+        .where(Document.project_id == project_id, ~verified)
+        .order_by(Document.created_at, Document.id)
+        .limit(limit)
+    )
+    if after:
+        after_created = select(Document.created_at).where(Document.id == after).scalar_subquery()
+        # bound with the column type, a plain parameter compares uuid to varchar
+        page = page.where(tuple_(Document.created_at, Document.id) > tuple_(after_created, literal(after, Document.id.type)))
+    page = page.subquery()
+
+    latest = (
+        select(
+            Annotation.document_id,
+            Annotation.id,
+            Annotation.content,
+            Annotation.confidence_score,
+            Annotation.verified,
+            Annotation.version,
+            func.row_number().over(
+                partition_by=Annotation.document_id,
+                order_by=(Annotation.updated_at.desc(), Annotation.created_at.desc())
+            ).label("rank")
+        )
+        .where(Annotation.document_id.in_(select(page.c.id)))
+        .subquery()
+    )
+    rows = (await db.execute(
+        select(
+            page.c.id,
+            page.c.content,
+            latest.c.id.label("annotation_id"),
+            latest.c.content.label("annotation"),
+            latest.c.confidence_score,
+            latest.c.verified,
+            latest.c.version
+        )
+        .outerjoin(latest, and_(latest.c.document_id == page.c.id, latest.c.rank == 1))
+        .order_by(page.c.created_at, page.c.id)
+    )).mappings().all()
+
+    documents = [
+        {
+            "id": row["id"],
+            "content": row["content"],
+            "annotation": {
+                "id": row["annotation_id"],
+                "content": row["annotation"],
+                "confidence_score": row["confidence_score"],
+                "verified": row["verified"],
+                "version": row["version"],
+            } if row["annotation_id"] else None,
+        }
+        for row in rows
+    ]
+
+    preannotating = []
+    if preannotate:
+        missing = [doc["id"] for doc in documents if doc["annotation"] is None]
+        preannotating = await claim_documents(missing[:settings.PREFETCH_PREANNOTATE_MAX])
+        if preannotating:
+            background_tasks.add_task(preannotate_documents, project_id, preannotating, current_user.id)
+
+    return {
+        "documents": documents,
+        # a short page is the last one
+        "next_cursor": documents[-1]["id"] if len(documents) == limit else None,
+        "preannotating": preannotating,
+    }
+
 @router.get("/{document_id}", response_model=DocumentResponse)
 async def get_document(
-    document_id: str,
+    document_id: UUID,
+    request: Request,
+    response: Response,
     current_user: User = Depends(require_viewer),  # All authenticated users can view
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    result = await db.execute(
-        select(Document).where(Document.id == document_id)
-    )
-    document = result.scalar_one_or_none()
+    document = await get_document_payload(db, document_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
+
+    etag = make_etag("document", document_id, document["updated_at"])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return document
 
 @router.delete("/{document_id}")
 async def delete_document(
-    document_id: str,
+    document_id: UUID,
     current_user: User = Depends(require_admin),  # Only admins can delete
     db: AsyncSession = Depends(get_db)
 ):
-    document = await db.execute(
-        select(Document).where(Document.id == document_id)
-    )
-    document = document.scalar_one_or_none()
-    if not document:
+    deleted = await delete_documents(db, [document_id])
+    if not deleted:
         raise HTTPException(status_code=404, detail="Document not found")
-    
-    await db.delete(document)
     await db.commit()
+    await invalidate_documents(document_id)
     return {"message": "Document deleted successfully"} 
\ No newline at end of file
@@ -1,24 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query, BackgroundTasks
+from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from database import get_db
+from sqlalchemy import select, delete
+from database import get_db, get_read_db, use_replica_for
 from models import Project, Document, User
-from typing import List
-from schemas.project import ProjectCreate, ProjectResponse
+from typing import List, Optional
+from uuid import UUID
+from datetime import datetime, timezone
+from schemas.project import ProjectCreate, ProjectResponse, ProjectChangesResponse
+from schemas.annotation import ProjectAnnotationsAsOfResponse
+from services.export_service import ExportService, EXPORT_FORMATS, HAS_PYARROW
+from services.annotation_history import AnnotationHistoryService
+from services.change_feed import ChangeFeedService, InvalidCursor, CursorExpired
+from services.purge_service import PurgeService, delete_documents
+from services.read_cache import get_project_payload, invalidate_project, invalidate_documents, projects_version
+from core.etag import make_etag, etag_matches, set_etag, not_modified
+from core.config import settings
+from core.sql_profiler import query_budget
 from auth.roles import UserRole, require_admin, require_annotator, require_viewer
 
 router = APIRouter(prefix="/api/projects", tags=["projects"])
 
-@router.get("/", response_model=List[ProjectResponse])
+@router.get("", response_model=List[ProjectResponse])
 async def get_projects(
+    request: Request,
+    response: Response,
     current_user: User = Depends(require_viewer),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
+    etag = make_etag("projects", *await projects_version(db))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
     result = await db.execute(select(Project))
     projects = result.scalars().all()
     return projects
 
-@router.post("/", response_model=ProjectResponse)
+@router.post("", response_model=ProjectResponse)
 async def create_project(
     project: ProjectCreate, 
     current_user: User = Depends(require_admin),  # Only admins can create projects
@@ -32,21 +52,101 @@ async def create_project(
 
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
-    project_id: str,
+    project_id: UUID,
+    request: Request,
+    response: Response,
     current_user: User = Depends(require_viewer),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    result = await db.execute(
-        select(Project).where(Project.id == project_id)
-    )
-    project = result.scalar_one_or_none()
+    project = await get_project_payload(db, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+
+    etag = make_etag("project", project_id, project["updated_at"])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return project
 
+@router.get("/{project_id}/export")
+async def export_project(
+    project_id: UUID,
+    request: Request,
+    format: str = Query("jsonl", enum=list(EXPORT_FORMATS)),
+    current_user: User = Depends(require_annotator),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Stream documents with their latest verified annotation as JSONL or Parquet"""
+    project = await db.execute(
+        select(Project.id).where(Project.id == project_id)
+    )
+    if not project.scalar_one_or_none():
+        raise HTTPException(status_code=404, detail="Project not found")
+    if format == "parquet" and not HAS_PYARROW:
+        raise HTTPException(status_code=501, detail="Parquet export is not available on this server")
+
+    exporter = ExportService(project_id, use_replica=use_replica_for(request))
+    if format == "parquet":
+        body, media_type = exporter.stream_parquet(), "application/vnd.apache.parquet"
+    else:
+        body, media_type = exporter.stream_jsonl(), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="project-{project_id}.{format}"'}
+    )
+
+@router.get("/{project_id}/annotations/as-of", response_model=ProjectAnnotationsAsOfResponse)
+async def get_project_annotations_as_of(
+    project_id: UUID,
+    at: datetime = Query(..., description="UTC timestamp to reconstruct annotations at"),
+    current_user: User = Depends(require_viewer),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Annotations of a project as they were at a point in time"""
+    project = await db.execute(
+        select(Project.id).where(Project.id == project_id)
+    )
+    if not project.scalar_one_or_none():
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    # versions are stamped with naive utc datetimes
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    annotations = await AnnotationHistoryService(db).project_state_as_of(project_id, at)
+    return {"project_id": project_id, "as_of": at, "annotations": annotations}
+
+@router.get("/{project_id}/changes", response_model=ProjectChangesResponse, response_model_exclude_none=True)
+@query_budget(4)  # the log, documents and annotations, plus the user on a cache miss
+async def get_project_changes(
+    project_id: UUID,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.CHANGE_FEED_MAX_CHANGES, ge=1, le=settings.CHANGE_FEED_MAX_CHANGES),
+    include_content: bool = False,
+    current_user: User = Depends(require_viewer),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Documents and annotations created, updated or deleted since ``cursor``.
+
+    Without a cursor only the current one is returned: take it, load the
+    project in full, then poll with it. Changed rows come back whole,
+    deleted ones as ``{"id": ..., "deleted": true}``. Keep asking while
+    ``has_more`` is set. A 410 means the cursor is older than the change
+    log, start over with a full load.
+    """
+    feed = ChangeFeedService(db)
+    if cursor is None:
+        return {"cursor": await feed.head(project_id), "has_more": False, "documents": [], "annotations": []}
+    try:
+        return await feed.changes_since(project_id, cursor, limit, include_content)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CursorExpired:
+        raise HTTPException(status_code=410, detail="Cursor expired, reload the project")
+
 @router.put("/{project_id}", response_model=ProjectResponse)
 async def update_project(
-    project_id: str,
+    project_id: UUID,
     project_update: ProjectCreate,
     current_user: User = Depends(require_annotator),  # Admins and annotators can update
     db: AsyncSession = Depends(get_db)
@@ -67,21 +167,53 @@ async def update_project(
     
     await db.commit()
     await db.refresh(project)
+    await invalidate_project(project_id)
     return project
 
 @router.delete("/{project_id}")
 async def delete_project(
-    project_id: str,
+    project_id: UUID,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(require_admin),  # Only admins can delete
     db: AsyncSession = Depends(get_db)
 ):
     result = await db.execute(
-        select(Project).where(Project.id == project_id)
+        select(Project.id).where(Project.id == project_id)
     )
-    project = result.scalar_one_or_none()
-    if not project:
+    if not result.scalar_one_or_none():
         raise HTTPException(status_code=404, detail="Project not found")
-    
-    await db.delete(project)
+
+    purger = PurgeService()
+    document_count = await purger.count_documents(db, project_id)
+    if document_count > settings.PURGE_INLINE_MAX_DOCUMENTS:
+        # large projects are deleted batch by batch in the background
+        background_tasks.add_task(purger.purge_project, project_id)
+        return JSONResponse(
+            status_code=202,
+            content={
+                "message": f"Deleting project with {document_count} documents",
+                "status_url": f"{router.prefix}/{project_id}/purge"
+            }
+        )
+
+    document_ids = await db.execute(
+        select(Document.id).where(Document.project_id == project_id)
+    )
+    document_ids = document_ids.scalars().all()
+    await delete_documents(db, document_ids)
+    await db.execute(delete(Project).where(Project.id == project_id))
     await db.commit()
-    return {"message": "Project deleted successfully"} 
\ No newline at end of file
+    await invalidate_documents(*document_ids)
+    await invalidate_project(project_id)
+    return {"message": "Project deleted successfully"}
+
+@router.get("/{project_id}/purge")
+async def get_purge_progress(
+    project_id: UUID,
+    current_user: User = Depends(require_admin)
+):
+    """Progress of a background project deletion"""
+    progress = await PurgeService().get_progress(project_id)
+    if not progress:
+        raise HTTPException(status_code=404, detail="No deletion in progress for this project")
+    return progress 
\ No newline at end of file
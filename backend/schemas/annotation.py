@@ -2,7 +2,6 @@ from pydantic import BaseModel
 from typing import Optional, Any, List
 from datetime import datetime
 from uuid import UUID
-from .base import AnnotationResponse
 
 class AnnotationBase(BaseModel):
     content: Any  # JSON content
@@ -14,7 +13,7 @@ class AnnotationCreate(AnnotationBase):
 class AnnotationResponse(AnnotationBase):
     id: UUID
     document_id: UUID
-    created_by: UUID
+    created_by: Optional[UUID]  # None for AI annotations made without a user
     verified: bool
     verified_by: Optional[UUID]
     created_at: datetime
@@ -24,4 +23,43 @@ class AnnotationResponse(AnnotationBase):
 
 class BatchAnnotationResponse(BaseModel):
     message: str
-    annotations: List[AnnotationResponse] 
\ No newline at end of file
+    job_id: Optional[str] = None  # channel of the progress events
+    annotations: List[AnnotationResponse]
+
+class BulkVerifyRequest(BaseModel):
+    annotation_ids: List[UUID]
+
+class AnnotationCorrection(BaseModel):
+    annotation_id: UUID
+    content: Any  # corrected JSON content
+
+class BulkCorrectRequest(BaseModel):
+    corrections: List[AnnotationCorrection]
+
+class BulkUpdateResponse(BaseModel):
+    updated: List[UUID]
+    not_found: List[UUID]
+
+class AnnotationVersionResponse(BaseModel):
+    version: int
+    content: Any
+    verified: bool
+    created_by: Optional[UUID]
+    created_at: datetime
+
+class AnnotationHistoryResponse(BaseModel):
+    annotation_id: UUID
+    versions: List[AnnotationVersionResponse]
+
+class AnnotationStateResponse(BaseModel):
+    annotation_id: UUID
+    document_id: UUID
+    version: int
+    content: Any
+    verified: bool
+    updated_at: datetime
+
+class ProjectAnnotationsAsOfResponse(BaseModel):
+    project_id: UUID
+    as_of: datetime
+    annotations: List[AnnotationStateResponse]
\ No newline at end of file
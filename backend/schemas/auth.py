@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class Token(BaseModel):
+    access_token: str
+    refresh_token: Optional[str] = None  # only on login
+    token_type: str
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, Optional, List
 from datetime import datetime
 from uuid import UUID
 
@@ -13,8 +13,37 @@ class DocumentCreate(DocumentBase):
 class DocumentResponse(DocumentBase):
     id: UUID
     project_id: UUID
-    created_by: UUID
     created_at: datetime
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class DocumentSearchHit(BaseModel):
+    id: UUID
+    project_id: UUID
+    status: Optional[str]
+    created_at: datetime
+    rank: float
+
+class DocumentSearchResponse(BaseModel):
+    items: List[DocumentSearchHit]
+    limit: int
+    offset: int
+    has_more: bool
+
+class PrefetchAnnotation(BaseModel):
+    id: UUID
+    content: Any
+    confidence_score: Optional[float] = None
+    verified: bool
+    version: int
+
+class PrefetchDocument(BaseModel):
+    id: UUID
+    content: str
+    annotation: Optional[PrefetchAnnotation] = None  # latest one, None until annotated
+
+class DocumentPrefetchResponse(BaseModel):
+    documents: List[PrefetchDocument]
+    next_cursor: Optional[UUID] = None  # pass as ``after`` for the following page
+    preannotating: List[UUID] = []
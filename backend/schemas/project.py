@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List
 from uuid import UUID
 from datetime import datetime
 
@@ -8,8 +8,15 @@ class ProjectBase(BaseModel):
     description: Optional[str] = None
     schema: Dict[str, Any]
 
+# used when a project is created without one
+DEFAULT_SCHEMA = {
+    "type": "text_classification",
+    "labels": ["positive", "negative", "neutral"],
+    "multi_label": False
+}
+
 class ProjectCreate(ProjectBase):
-    pass
+    schema: Dict[str, Any] = Field(default_factory=lambda: dict(DEFAULT_SCHEMA))
 
 class ProjectResponse(ProjectBase):
     id: UUID
@@ -18,4 +25,29 @@ class ProjectResponse(ProjectBase):
     updated_at: datetime
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class DocumentChange(BaseModel):
+    id: UUID
+    deleted: Optional[bool] = None  # set on tombstones, which carry nothing else
+    status: Optional[str] = None
+    content: Optional[str] = None  # only with include_content
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class AnnotationChange(BaseModel):
+    id: UUID
+    deleted: Optional[bool] = None
+    document_id: Optional[UUID] = None
+    content: Any = None
+    confidence_score: Optional[float] = None
+    verified: Optional[bool] = None
+    verified_by: Optional[UUID] = None
+    version: Optional[int] = None
+    updated_at: Optional[datetime] = None
+
+class ProjectChangesResponse(BaseModel):
+    cursor: str  # pass back to get the changes after this response
+    has_more: bool
+    documents: List[DocumentChange]
+    annotations: List[AnnotationChange]
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Literal, Optional
+from uuid import UUID
+
+class UserUpdate(BaseModel):
+    role: Optional[Literal["admin", "annotator", "viewer"]] = None
+    is_active: Optional[bool] = None
+
+class UserResponse(BaseModel):
+    id: UUID
+    email: str
+    name: str
+    role: str
+    is_active: bool
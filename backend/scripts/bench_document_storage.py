@@ -0,0 +1,105 @@
+import asyncio
+import argparse
+import math
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+from core.config import settings
+from database import build_engine
+from models import Base, Project, Document
+
+WORDS = (
+    "the annotation model label entity contract customer invoice payment "
+    "delivery report quarter revenue policy claim patient treatment review "
+    "service account manager request support issue resolved pending urgent"
+).split()
+
+def make_texts(count: int, mean_words: int, seed: int = 42) -> list:
+    """Texts with a log-normal length distribution, like real uploads"""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        words = max(1, int(rng.lognormvariate(math.log(mean_words), 0.8)))
+        texts.append(" ".join(rng.choice(WORDS) for _ in range(words)))
+    return texts
+
+async def load_documents(engine, texts: list):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        project = Project(name="Benchmark", schema={})
+        session.add(project)
+        await session.flush()
+        session.add_all(Document(project_id=project.id, content=t) for t in texts)
+        await session.commit()
+        return project.id
+
+async def time_listing(engine, project_id, deferred: bool, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        async with AsyncSession(engine) as session:
+            query = select(Document).where(Document.project_id == project_id)
+            if deferred:
+                query = query.options(defer(Document.content))
+            start = time.perf_counter()
+            (await session.execute(query)).scalars().all()
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+async def table_size(engine) -> int:
+    """Bytes used by the documents table (including TOAST on PostgreSQL)"""
+    async with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("VACUUM ANALYZE documents"))
+            return (await conn.execute(text("SELECT pg_total_relation_size('documents')"))).scalar()
+        try:
+            return (await conn.execute(
+                text("SELECT SUM(pgsize) FROM dbstat WHERE name = 'documents'")
+            )).scalar()
+        except Exception:
+            # dbstat isn't compiled into every SQLite build, fall back to the whole file
+            page_count = (await conn.execute(text("PRAGMA page_count"))).scalar()
+            page_size = (await conn.execute(text("PRAGMA page_size"))).scalar()
+            return page_count * page_size
+
+async def run(url: str, docs: int, mean_words: int, repeat: int):
+    engine = build_engine(url)
+    texts = make_texts(docs, mean_words)
+    print(f"Benchmarking {docs} documents (~{mean_words} words each) on {engine.dialect.name}")
+    print(f"{'storage':<12}{'table size':>14}{'list full':>14}{'list deferred':>16}")
+
+    try:
+        for compressed in (False, True):
+            settings.DOCUMENT_COMPRESSION_ENABLED = compressed
+            project_id = await load_documents(engine, texts)
+            size = await table_size(engine)
+            full = await time_listing(engine, project_id, deferred=False, repeat=repeat)
+            deferred = await time_listing(engine, project_id, deferred=True, repeat=repeat)
+            label = "zstd" if compressed else "plain"
+            print(f"{label:<12}{size / 1024 / 1024:>11.2f} MB{full * 1000:>11.1f} ms{deferred * 1000:>13.1f} ms")
+    finally:
+        await engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Document listing and storage benchmark")
+    parser.add_argument("--url", default="sqlite+aiosqlite:///bench_documents.db")
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--mean-words", type=int, default=800)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.docs, args.mean_words, args.repeat))
+
+if __name__ == "__main__":
+    main()
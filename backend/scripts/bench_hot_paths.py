@@ -0,0 +1,197 @@
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import timeit
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+from jose import jwt
+from pydantic import TypeAdapter
+from core.config import settings
+from core.security import create_access_token
+from schemas.annotation import AnnotationResponse
+from services.ai_annotation_service import AIAnnotationService
+from services.prompt_templates import PromptTemplate, AnnotationType
+
+DEFAULT_BASELINE = Path(__file__).parent / "bench_hot_paths_baseline.json"
+LABELS = ["positive", "negative", "neutral", "mixed", "question", "complaint", "praise", "spam"]
+
+def make_labels(count: int) -> List[str]:
+    return [f"{LABELS[i % len(LABELS)]}_{i}" for i in range(count)]
+
+def make_examples(rng: random.Random, count: int) -> list:
+    return [
+        {
+            "text": " ".join(rng.choice(LABELS) for _ in range(60)),
+            "annotation": {"label": rng.choice(LABELS), "confidence": round(rng.random(), 3)},
+        }
+        for _ in range(count)
+    ]
+
+def make_entities(rng: random.Random, count: int) -> dict:
+    return {"entities": [
+        {
+            "text": f"entity {i}",
+            "label": rng.choice(LABELS),
+            "start": i * 10,
+            "end": i * 10 + 8,
+            # strings, as the model sometimes sends them and the parser converts;
+            # above the default threshold so threshold checks scan every entity
+            "confidence": str(round(rng.uniform(0.85, 1.0), 3)),
+        }
+        for i in range(count)
+    ]}
+
+def make_annotations(rng: random.Random, count: int) -> list:
+    """ORM-like rows, AnnotationResponse reads them with from_attributes"""
+    now = datetime(2024, 1, 1)
+    return [
+        SimpleNamespace(
+            id=uuid.UUID(int=rng.getrandbits(128)),
+            document_id=uuid.UUID(int=rng.getrandbits(128)),
+            created_by=uuid.UUID(int=rng.getrandbits(128)),
+            verified=rng.random() < 0.3,
+            verified_by=None,
+            created_at=now + timedelta(seconds=i),
+            content={"label": rng.choice(LABELS), "confidence": rng.random(), "spans": []},
+            confidence_score=rng.random(),
+        )
+        for i in range(count)
+    ]
+
+def build_cases(seed: int) -> list:
+    """(name, size, callable) for every benchmark, inputs are built once up front"""
+    rng = random.Random(seed)
+    service = AIAnnotationService()
+    cases = []
+
+    template = PromptTemplate(AnnotationType.CLASSIFICATION)
+    for labels, examples in ((3, 0), (30, 3), (300, 3)):
+        label_list, example_list = make_labels(labels), make_examples(rng, examples)
+        cases.append((
+            "PromptTemplate.generate_prompt", f"{labels} labels, {examples} examples",
+            lambda l=label_list, e=example_list: template.generate_prompt(l, e, "Customer support tickets")
+        ))
+
+    classification = json.dumps({"label": "positive", "confidence": "0.91", "reasoning": "short"})
+    cases.append((
+        "AIAnnotationService._parse_ai_response", "classification",
+        lambda: service._parse_ai_response(classification)
+    ))
+    for count in (10, 100, 1000):
+        text = json.dumps(make_entities(rng, count))
+        cases.append((
+            "AIAnnotationService._parse_ai_response", f"{count} entities",
+            lambda t=text: service._parse_ai_response(t)
+        ))
+
+    for count in (10, 100, 1000):
+        result = service._parse_ai_response(json.dumps(make_entities(rng, count)))
+        cases.append((
+            "AIAnnotationService._check_confidence_threshold", f"{count} entities",
+            lambda r=result: service._check_confidence_threshold(r)
+        ))
+
+    for rows in (100, 1000, 10000):
+        confidences = np.array([rng.random() for _ in range(rows)])
+        accuracies = np.array([1.0 if rng.random() < c else 0.0 for c in confidences])
+        matrix = np.column_stack([confidences, accuracies])
+        cases.append((
+            "AIAnnotationService._find_optimal_threshold", f"{rows} rows",
+            lambda m=matrix: service._find_optimal_threshold(m)
+        ))
+
+    adapter = TypeAdapter(List[AnnotationResponse])
+    for count in (10, 100, 1000):
+        rows = make_annotations(rng, count)
+        cases.append((
+            "AnnotationResponse list to JSON", f"{count} annotations",
+            lambda r=rows: adapter.dump_json(adapter.validate_python(r, from_attributes=True))
+        ))
+
+    payload = {"sub": "annotator@tagflow.ai", "role": "annotator"}
+    token = create_access_token(payload)
+    cases.append(("core.security.create_access_token", "HS256", lambda: create_access_token(payload)))
+    cases.append((
+        "jwt.decode (core.deps)", "HS256",
+        lambda: jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+    ))
+    return cases
+
+def measure(func, repeat: int, min_time: float) -> dict:
+    """Per-call seconds over ``repeat`` rounds, each round long enough to time reliably"""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    rounds = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {"median": statistics.median(rounds), "min": min(rounds), "calls": number * repeat}
+
+def format_time(seconds: float) -> str:
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} µs"
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the annotation hot paths")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="baseline results file")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="slowdown flagged as a regression, 0.15 = 15%%")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing round")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text())["results"] if baseline_path.exists() else {}
+    if not baseline and not args.save_baseline:
+        print(f"ℹ️  No baseline at {baseline_path}, run with --save-baseline to create one")
+
+    print(f"{'benchmark':<50}{'size':<22}{'median':>11}{'min':>11}{'baseline':>11}{'change':>9}")
+    results, regressions = {}, []
+    for name, size, func in build_cases(args.seed):
+        if args.filter and args.filter not in name:
+            continue
+        key = f"{name} [{size}]"
+        timing = results[key] = measure(func, args.repeat, args.min_time)
+        line = f"{name:<50}{size:<22}{format_time(timing['median']):>11}{format_time(timing['min']):>11}"
+        previous = baseline.get(key)
+        if previous:
+            change = timing["median"] / previous["median"] - 1
+            flag = ""
+            if change > args.tolerance:
+                flag = "  ❌ regression"
+                regressions.append(key)
+            elif change < -args.tolerance:
+                flag = "  ✅ faster"
+            line += f"{format_time(previous['median']):>11}{change:>+9.1%}{flag}"
+        print(line)
+
+    if args.save_baseline:
+        if args.filter and baseline:
+            # a filtered run only replaces its own entries
+            results = {**baseline, **results}
+        baseline_path.write_text(json.dumps({
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }, indent=2, sort_keys=True))
+        print(f"💾 Baseline written to {baseline_path}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) slower than the baseline by more than {args.tolerance:.0%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# modules that should only load on first use, never while importing the app
+LAZY_MODULES = ("openai", "numpy", "pyarrow", "aiohttp", "uvicorn")
+
+def parse_importtime(stderr: str) -> dict:
+    """{module: (self_us, cumulative_us)} from python -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            modules[name.strip()] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            continue
+    return modules
+
+def run_once(module: str, env: dict) -> tuple:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    return time.perf_counter() - started, parse_importtime(result.stderr), result
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time of the app, per module")
+    parser.add_argument("--module", default="main", help="module to import (default: main)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=25, help="modules to list")
+    parser.add_argument("--json", help="write per-module timings to this file")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    # settings needs these to load, their values don't matter for imports
+    for name in ("POSTGRES_SERVER", "POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB", "OPENAI_API_KEY"):
+        env.setdefault(name, "unused")
+    env.setdefault("SQLALCHEMY_DATABASE_URI", "sqlite+aiosqlite://")
+
+    interpreter = statistics.median(
+        run_once("sys", env)[0] for _ in range(args.runs)
+    )
+    walls, runs = [], []
+    for _ in range(args.runs):
+        wall, modules, result = run_once(args.module, env)
+        walls.append(wall)
+        runs.append(modules)
+    if result.returncode != 0:
+        # timings of a half-imported app say nothing about startup
+        errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        print(f"❌ import {args.module} failed:")
+        print("   " + (errors or ["?"])[-1])
+        sys.exit(1)
+
+    # median per module across runs, the first run pays for cold .pyc files
+    names = set().union(*runs)
+    timings = {
+        name: (
+            statistics.median(run[name][0] for run in runs if name in run),
+            statistics.median(run[name][1] for run in runs if name in run),
+        )
+        for name in names
+    }
+    wall = statistics.median(walls)
+    print(f"⏱️  import {args.module}: {wall * 1000:.0f} ms wall ({interpreter * 1000:.0f} ms of it interpreter startup), {len(timings)} modules")
+
+    print(f"\n{'module (cumulative)':<60}{'ms':>10}")
+    top_level = sorted(
+        ((name, cum) for name, (_, cum) in timings.items() if "." not in name),
+        key=lambda item: -item[1]
+    )
+    for name, cumulative in top_level[:args.top]:
+        print(f"{name:<60}{cumulative / 1000:>10.1f}")
+
+    packages = {}
+    for name, (self_us, _) in timings.items():
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us
+    print(f"\n{'package (self time)':<60}{'ms':>10}")
+    for name, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<60}{self_us / 1000:>10.1f}")
+
+    eager = [name for name in LAZY_MODULES if name in timings]
+    if eager:
+        print(f"\n⚠️  Loaded at import time although only needed on first use: {', '.join(eager)}")
+    else:
+        print(f"\n✅ None of {', '.join(LAZY_MODULES)} loaded at import time")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "module": args.module,
+            "wall_ms": wall * 1000,
+            "interpreter_ms": interpreter * 1000,
+            "eager_heavy_modules": eager,
+            "modules": {
+                name: {"self_ms": self_us / 1000, "cumulative_ms": cum / 1000}
+                for name, (self_us, cum) in sorted(timings.items(), key=lambda item: -item[1][1])
+            },
+        }, indent=2))
+        print(f"💾 Per-module timings written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import asyncio
+import argparse
+import json
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Stand-in for the OpenAI chat completions API, point the app at it with
+# OPENAI_API_BASE=http://host:port/v1. Answers look like real annotations.
+
+LABELS = ["positive", "negative", "neutral"]
+
+def build_fake_openai(latency_ms: float = 800, jitter_ms: float = 300, error_rate: float = 0.0, seed: int = 42) -> FastAPI:
+    """Fake chat completions with log-normal latency and a share of 429/500 errors"""
+    app = FastAPI()
+    rng = random.Random(seed)
+    app.state.calls = 0
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.calls += 1
+        delay = latency_ms / 1000
+        if jitter_ms:
+            # long tail like the real API, median stays at latency_ms
+            delay *= rng.lognormvariate(0, jitter_ms / max(latency_ms, 1))
+        await asyncio.sleep(delay)
+
+        if rng.random() < error_rate:
+            status = rng.choice([429, 500])
+            return JSONResponse(status_code=status, content={"error": {
+                "message": "Rate limit reached" if status == 429 else "The server had an error",
+                "type": "rate_limit_error" if status == 429 else "server_error",
+                "code": None,
+            }})
+
+        prompt = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+        content = json.dumps({
+            "label": rng.choice(LABELS),
+            "confidence": round(rng.betavariate(8, 2), 3),
+            "spans": [],
+        })
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = max(1, len(content) // 4)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-3.5-turbo"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    return app
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=800, help="median completion latency")
+    parser.add_argument("--jitter-ms", type=float, default=300, help="spread of the latency tail")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 429/500")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    print(f"🤖 Fake OpenAI on http://{args.host}:{args.port}/v1")
+    uvicorn.run(
+        build_fake_openai(args.latency_ms, args.jitter_ms, args.error_rate, args.seed),
+        host=args.host, port=args.port, log_level="warning"
+    )
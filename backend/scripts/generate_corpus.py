@@ -0,0 +1,279 @@
+import asyncio
+import argparse
+import json
+import math
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+from sqlalchemy import JSON, insert, text
+from sqlalchemy.pool import NullPool
+from core.config import settings
+from core.security import get_password_hash
+from database import build_engine
+from models import Base, User, Project, Document, Annotation, AnnotationVersion, UserRole
+from reindex_search import reindex
+
+WORDS = (
+    "the annotation model label entity contract customer invoice payment "
+    "delivery report quarter revenue policy claim patient treatment review "
+    "service account manager request support issue resolved pending urgent "
+    "shipment refund warranty order product quality late damaged excellent"
+).split()
+LABELS = ["positive", "negative", "neutral", "mixed", "question", "complaint", "praise", "spam"]
+PASSWORD = "corpus123"
+
+class BulkWriter:
+    """Appends rows with COPY on PostgreSQL, batched executemany elsewhere"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.is_postgres = engine.dialect.name == "postgresql"
+        self.rows = 0
+        self._conn = None
+        self._driver = None
+
+    async def __aenter__(self) -> "BulkWriter":
+        self._conn = await self.engine.connect()
+        if self.is_postgres:
+            raw = await self._conn.get_raw_connection()
+            self._driver = raw.driver_connection
+            # losing the last batch on a crash is fine for generated data
+            await self._driver.execute("SET synchronous_commit TO off")
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._conn.close()
+
+    async def write(self, table, columns: list, rows: list) -> None:
+        if not rows:
+            return
+        if self.is_postgres:
+            await self._driver.copy_records_to_table(table.name, records=rows, columns=columns)
+        else:
+            # values are prepared for COPY, give the ORM types back what they expect
+            json_at = [i for i, c in enumerate(columns) if isinstance(table.c[c].type, JSON)]
+            records = []
+            for row in rows:
+                record = dict(zip(columns, row))
+                for i in json_at:
+                    record[columns[i]] = json.loads(row[i])
+                records.append(record)
+            await self._conn.execute(insert(table), records)
+            await self._conn.commit()
+        self.rows += len(rows)
+
+def uuids(rng: np.random.Generator, count: int) -> list:
+    """Version 4 UUIDs from the seeded generator, so reruns produce the same ids"""
+    raw = rng.integers(0, 2**63, size=(count, 2), dtype=np.int64).astype(np.uint64)
+    values = []
+    for high, low in raw.tolist():
+        value = (high << 64) | low
+        value = (value & ~(0xF000 << 64)) | (0x4000 << 64)  # version 4
+        value = (value & ~(0xC000 << 48)) | (0x8000 << 48)  # RFC 4122 variant
+        values.append(uuid.UUID(int=value))
+    return values
+
+def text_pool(rng: np.random.Generator, words: int = 2_000_000) -> str:
+    """One long random text, documents are slices of it"""
+    return " ".join(np.array(WORDS)[rng.integers(0, len(WORDS), words)].tolist())
+
+class CorpusGenerator:
+    def __init__(self, engine, args):
+        self.engine = engine
+        self.args = args
+        self.rng = np.random.default_rng(args.seed)
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.content_type = Document.__table__.c.content.type
+        self.role_value = (lambda role: role.name) if engine.dialect.name == "postgresql" else (lambda role: role)
+
+    def timestamps(self, count: int) -> list:
+        """Creation times spread over the last --days days"""
+        offsets = self.rng.integers(0, self.args.days * 86400, count)
+        return [self.now - timedelta(seconds=int(s)) for s in offsets]
+
+    async def users(self, writer: BulkWriter) -> tuple:
+        count = self.args.users
+        ids = uuids(self.rng, count)
+        hashed = get_password_hash(PASSWORD)  # one bcrypt run, shared by every generated user
+        run = ids[0].hex[:8]
+        admins = max(1, count // 10)
+        rows = []
+        for i, (user_id, created) in enumerate(zip(ids, self.timestamps(count))):
+            role = UserRole.ADMIN if i < admins else UserRole.ANNOTATOR
+            rows.append((
+                user_id, f"corpus-{run}-{i}@tagflow.ai", f"Corpus user {i}",
+                self.role_value(role), created, created, hashed, True
+            ))
+        await writer.write(User.__table__, [
+            "id", "email", "name", "role", "created_at", "updated_at", "hashed_password", "is_active"
+        ], rows)
+        print(f"👥 {count} users ({admins} admins), password {PASSWORD!r}, emails corpus-{run}-N@tagflow.ai")
+        return ids[:admins], ids[admins:] or ids[:admins]
+
+    async def projects(self, writer: BulkWriter, admins: list) -> list:
+        count = self.args.projects
+        ids = uuids(self.rng, count)
+        schema = json.dumps({"type": "classification", "labels": LABELS, "multi_label": False})
+        rows = [
+            (project_id, f"Corpus project {i}", "Generated for scale testing", schema,
+             admins[i % len(admins)], created, created)
+            for i, (project_id, created) in enumerate(zip(ids, self.timestamps(count)))
+        ]
+        await writer.write(Project.__table__, [
+            "id", "name", "description", "schema", "created_by", "created_at", "updated_at"
+        ], rows)
+        print(f"📁 {count} projects")
+        return ids
+
+    async def documents_and_annotations(self, writer: BulkWriter, projects: list, annotators: list, admins: list) -> None:
+        args = self.args
+        rng = self.rng
+        pool = text_pool(rng)
+        mean_annotations = args.annotations / max(args.documents, 1)
+        # documents per chunk, sized so its annotations fit in about one batch
+        chunk = max(100, int(args.batch_size / max(mean_annotations, 1)))
+        # a few big projects and a long tail, like real tenants
+        project_weights = rng.pareto(1.5, len(projects)) + 1
+        project_weights /= project_weights.sum()
+
+        document_columns = ["id", "project_id", "content", "status", "created_at", "updated_at"]
+        annotation_columns = [
+            "id", "document_id", "created_by", "content", "confidence_score", "verified",
+            "verified_by", "version", "created_at", "updated_at"
+        ]
+        version_columns = ["id", "annotation_id", "version", "is_snapshot", "content", "verified", "created_by", "created_at"]
+        dialect = self.engine.dialect
+        to_bytes = writer.is_postgres
+
+        started = time.perf_counter()
+        documents = annotations = 0
+        for offset in range(0, args.documents, chunk):
+            n = min(chunk, args.documents - offset)
+            doc_ids = uuids(rng, n)
+            doc_projects = rng.choice(len(projects), n, p=project_weights)
+            # about 7 characters per word in the pool, long tails are capped at half of it
+            chars = np.clip(rng.lognormal(math.log(args.mean_words), args.length_sigma, n) * 7, 1, len(pool) // 2).astype(int)
+            starts = (rng.random(n) * (len(pool) - chars)).astype(int)
+            counts = rng.poisson(mean_annotations, n)
+            created = self.timestamps(n)
+
+            rows = []
+            for i in range(n):
+                body = pool[starts[i]:starts[i] + chars[i]]
+                content = self.content_type.process_bind_param(body, dialect) if to_bytes else body
+                rows.append((
+                    doc_ids[i], projects[doc_projects[i]], content,
+                    "annotated" if counts[i] else "pending", created[i], created[i]
+                ))
+            await writer.write(Document.__table__, document_columns, rows)
+            documents += n
+
+            total = int(counts.sum())
+            if total:
+                owners = np.repeat(np.arange(n), counts)
+                ann_ids = uuids(rng, total)
+                confidence = rng.beta(args.confidence_alpha, args.confidence_beta, total)
+                verified = rng.random(total) < args.verified_rate
+                labels = rng.integers(0, len(LABELS), total)
+                creators = rng.integers(0, len(annotators), total)
+                verifiers = rng.integers(0, len(admins), total)
+                # annotated within a week of upload, verified within another
+                delays = rng.integers(0, 7 * 86400, (total, 2))
+
+                ann_rows, version_rows = [], []
+                for j in range(total):
+                    doc = int(owners[j])
+                    made = created[doc] + timedelta(seconds=int(delays[j, 0]))
+                    score = round(float(confidence[j]), 3)
+                    body = f'{{"label": "{LABELS[labels[j]]}", "confidence": {score}}}'
+                    is_verified = bool(verified[j])
+                    ann_rows.append((
+                        ann_ids[j], doc_ids[doc], annotators[creators[j]], body, score, is_verified,
+                        admins[verifiers[j]] if is_verified else None, 1,
+                        made, made + timedelta(seconds=int(delays[j, 1])) if is_verified else made
+                    ))
+                    if args.with_history:
+                        version_rows.append((uuid.UUID(int=ann_ids[j].int ^ 1), ann_ids[j], 1, True, body, is_verified, None, made))
+
+                for start in range(0, total, args.batch_size):
+                    await writer.write(Annotation.__table__, annotation_columns, ann_rows[start:start + args.batch_size])
+                    if version_rows:
+                        await writer.write(AnnotationVersion.__table__, version_columns, version_rows[start:start + args.batch_size])
+                annotations += total
+
+            elapsed = time.perf_counter() - started
+            print(
+                f"   {documents:>12,} documents {annotations:>14,} annotations"
+                f"   {writer.rows / elapsed:>10,.0f} rows/s", end="\r", flush=True
+            )
+        elapsed = time.perf_counter() - started
+        print(f"\n📄 {documents:,} documents and {annotations:,} annotations in {elapsed:.1f}s")
+
+async def prepare(engine, create_schema: bool, truncate: bool) -> None:
+    async with engine.begin() as conn:
+        if create_schema:
+            await conn.run_sync(Base.metadata.create_all)
+        if truncate:
+            # change_log last, deleting the rest writes tombstones into it
+            tables = ["annotation_versions", "annotations", "documents", "projects", "users", "change_log"]
+            if engine.dialect.name == "postgresql":
+                await conn.execute(text(f"TRUNCATE {', '.join(tables)} CASCADE"))
+            else:
+                for table in tables:
+                    await conn.execute(text(f"DELETE FROM {table}"))
+
+async def run(args):
+    engine = build_engine(args.url, name="corpus", poolclass=NullPool)
+    print(f"🏭 Generating into {engine.url.render_as_string(hide_password=True)}")
+    try:
+        await prepare(engine, args.create_schema, args.truncate)
+        generator = CorpusGenerator(engine, args)
+        started = time.perf_counter()
+        async with BulkWriter(engine) as writer:
+            admins, annotators = await generator.users(writer)
+            projects = await generator.projects(writer, admins)
+            await generator.documents_and_annotations(writer, projects, annotators, admins)
+        # rows are written around the ORM, search only sees them once indexed
+        if args.search_index:
+            await reindex(engine)
+        if engine.dialect.name == "postgresql":
+            async with engine.connect() as conn:
+                await conn.execution_options(isolation_level="AUTOCOMMIT")
+                await conn.execute(text("ANALYZE"))
+        print(f"✅ {writer.rows:,} rows in {time.perf_counter() - started:.1f}s")
+        if not args.search_index:
+            print("ℹ️  Search vectors are not filled, run scripts/reindex_search.py before searching")
+    finally:
+        await engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-generate a synthetic corpus for scale testing")
+    parser.add_argument("--url", default=str(settings.SQLALCHEMY_DATABASE_URI), help="database URL (default: from settings)")
+    parser.add_argument("--create-schema", action="store_true", help="create missing tables first")
+    parser.add_argument("--truncate", action="store_true", help="delete ALL users, projects, documents and annotations first")
+    parser.add_argument("--users", type=int, default=50, help="a tenth of them are admins")
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--annotations", type=int, default=1_000_000, help="total, spread over documents as a Poisson distribution")
+    parser.add_argument("--mean-words", type=int, default=300, help="median document length in words")
+    parser.add_argument("--length-sigma", type=float, default=0.8, help="log-normal spread of document lengths")
+    parser.add_argument("--confidence-alpha", type=float, default=8.0, help="beta distribution of confidence scores")
+    parser.add_argument("--confidence-beta", type=float, default=2.0)
+    parser.add_argument("--verified-rate", type=float, default=0.3)
+    parser.add_argument("--no-search-index", dest="search_index", action="store_false", help="skip filling the search vectors")
+    parser.add_argument("--with-history", action="store_true", help="also write the version 1 snapshot of every annotation")
+    parser.add_argument("--days", type=int, default=365, help="spread creation times over this many days")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="rows per COPY")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import asyncio
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import httpx
+from fastapi import FastAPI, Form, HTTPException
+from core.security import pwd_context, verify_password_async
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def report(label: str, samples: list) -> None:
+    if not samples:
+        print(f"{label:<24}no samples")
+        return
+    print(
+        f"{label:<24}{len(samples):>7}"
+        f"{statistics.median(samples) * 1000:>10.1f}"
+        f"{percentile(samples, 95) * 1000:>10.1f}"
+        f"{percentile(samples, 99) * 1000:>10.1f}"
+    )
+
+def build_inline_app(password_hash: str) -> FastAPI:
+    """Stand-in app with a blocking and an offloaded login next to a cheap endpoint"""
+    app = FastAPI()
+
+    @app.post("/login/blocking")
+    async def login_blocking(username: str = Form(...), password: str = Form(...)):
+        # the old behaviour: bcrypt on the event loop
+        if not pwd_context.verify(password, password_hash):
+            raise HTTPException(status_code=401)
+        return {"ok": True}
+
+    @app.post("/login/offloaded")
+    async def login_offloaded(username: str = Form(...), password: str = Form(...)):
+        if not await verify_password_async(password, password_hash):
+            raise HTTPException(status_code=401)
+        return {"ok": True}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+async def probe(client: httpx.AsyncClient, path: str, stop: asyncio.Event, samples: list, interval: float):
+    """Request an unrelated endpoint at a steady rate and record its latency.
+
+    Latency is measured from when each request was due, not when it was
+    sent, so time spent waiting for a blocked event loop is counted too.
+    """
+    due = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(max(0, due - time.perf_counter()))
+        await client.get(path)
+        samples.append(time.perf_counter() - due)
+        due += interval
+
+async def storm(client: httpx.AsyncClient, path: str, stop: asyncio.Event, credentials: dict, counter: list):
+    while not stop.is_set():
+        await client.post(path, data=credentials)
+        counter[0] += 1
+        # in-process requests may never suspend, give the probe a turn
+        await asyncio.sleep(0)
+
+async def run_phase(client, probe_path, login_path, credentials, duration, logins, interval):
+    stop = asyncio.Event()
+    samples, counter = [], [0]
+    tasks = [asyncio.create_task(probe(client, probe_path, stop, samples, interval))]
+    if login_path:
+        tasks += [
+            asyncio.create_task(storm(client, login_path, stop, credentials, counter))
+            for _ in range(logins)
+        ]
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return samples, counter[0]
+
+async def main(args):
+    credentials = {"username": args.username, "password": args.password}
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+        phases = [("baseline", None), ("login storm", args.login_path)]
+        probe_path = args.probe_path
+    else:
+        print(f"🔐 Hashing test password with {pwd_context.to_dict()['bcrypt__rounds']} rounds")
+        app = build_inline_app(pwd_context.hash(args.password))
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://inline", timeout=60)
+        phases = [
+            ("baseline", None),
+            ("storm, blocking", "/login/blocking"),
+            ("storm, offloaded", "/login/offloaded"),
+        ]
+        probe_path = "/ping"
+
+    print(f"🚀 {args.logins} concurrent logins, probing {probe_path} every {args.interval * 1000:.0f} ms for {args.duration}s per phase")
+    print(f"{'phase':<24}{'probes':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}   logins")
+    async with client:
+        if args.url:
+            # a wrong path or password would storm 404s/401s and measure nothing
+            response = await client.post(args.login_path, data=credentials)
+            if response.status_code != 200:
+                sys.exit(f"❌ POST {args.login_path} answered {response.status_code}, check --login-path and the credentials")
+        for label, login_path in phases:
+            samples, logins = await run_phase(
+                client, probe_path, login_path, credentials,
+                args.duration, args.logins, args.interval
+            )
+            report(label, samples)
+            if login_path:
+                print(f"{'':<61}{logins / args.duration:.1f}/s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency of unrelated endpoints during a login storm")
+    parser.add_argument("--url", help="running API to test, e.g. http://localhost:8000 (default: in-process stand-in app)")
+    parser.add_argument("--login-path", default="/auth/token")
+    parser.add_argument("--probe-path", default="/")
+    parser.add_argument("--username", default="annotator@tagflow.ai")
+    parser.add_argument("--password", default="annotator123")
+    parser.add_argument("--logins", type=int, default=20, help="concurrent login clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per phase")
+    parser.add_argument("--interval", type=float, default=0.02, help="seconds between probes")
+    asyncio.run(main(parser.parse_args()))
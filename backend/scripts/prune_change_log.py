@@ -0,0 +1,28 @@
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database import AsyncSessionLocal
+from services.change_feed import prune_change_log
+from core.config import settings
+
+BATCH_SIZE = 10000
+
+async def prune():
+    """Delete change log entries older than CHANGE_LOG_RETENTION_DAYS, one batch per transaction"""
+    total = 0
+    while True:
+        async with AsyncSessionLocal() as session:
+            deleted = await prune_change_log(session, BATCH_SIZE)
+            await session.commit()
+        if not deleted:
+            break
+        total += deleted
+        print(f"Deleted {total} entries")
+    print(f"✅ Change log pruned to the last {settings.CHANGE_LOG_RETENTION_DAYS} days")
+
+if __name__ == "__main__":
+    asyncio.run(prune())
@@ -0,0 +1,43 @@
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from database import AsyncSessionLocal
+from models import Document
+from services.search_service import SearchService
+
+BATCH_SIZE = 1000
+
+async def reindex(engine=None):
+    """Rebuild documents.search_vector in id order, one batch per transaction.
+
+    Uses the app database unless an engine is given (e.g. by generate_corpus.py).
+    """
+    session_factory = AsyncSessionLocal
+    if engine is not None:
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    last_id = None
+    total = 0
+    while True:
+        async with session_factory() as session:
+            query = select(Document.id).order_by(Document.id).limit(BATCH_SIZE)
+            if last_id is not None:
+                query = query.where(Document.id > last_id)
+            ids = (await session.execute(query)).scalars().all()
+            if not ids:
+                break
+            await SearchService(session).index_documents(ids)
+            await session.commit()
+        last_id = ids[-1]
+        total += len(ids)
+        print(f"Indexed {total} documents", end="\r", flush=True)
+    print(f"\n✅ Search index rebuilt for {total} documents")
+
+if __name__ == "__main__":
+    asyncio.run(reindex())
@@ -1,3 +1 @@
-from .annotation_service import AnnotationService
-
-__all__ = ['AnnotationService']
+# services are imported from their modules, e.g. services.search_service
@@ -1,13 +1,20 @@
-from typing import List, Dict, Any, Optional
-import openai
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 from models import Document, Project, Annotation
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 import json
 from enum import Enum
-import numpy as np
 from datetime import datetime
 from .prompt_templates import PromptManager, AnnotationType
+from .llm import get_openai
+from core.monitoring import track_llm_call
+from core.tracing import traced
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# distinct project schemas whose system prompt is kept per service
+PROMPT_CACHE_SIZE = 512
 
 class AnnotationConfidence(Enum):
     LOW = 0.6
@@ -21,9 +28,20 @@ class AIAnnotationService:
         self.temperature = 0.3
         self.max_retries = 2
         self.prompt_manager = PromptManager()
+        self._prompt_cache: Dict[str, str] = {}
 
+    @traced("ai.build_prompt")
     async def generate_system_prompt(self, project_schema: Dict) -> str:
-        """Generate a context-aware system prompt using the prompt manager"""
+        """Generate a context-aware system prompt, cached per project schema"""
+        key = json.dumps(project_schema, sort_keys=True, default=str)
+        prompt = self._prompt_cache.get(key)
+        if prompt is None:
+            if len(self._prompt_cache) >= PROMPT_CACHE_SIZE:
+                self._prompt_cache.clear()
+            prompt = self._prompt_cache[key] = self._build_system_prompt(project_schema)
+        return prompt
+
+    def _build_system_prompt(self, project_schema: Dict) -> str:
         schema_type = project_schema.get('type', 'classification')
         labels = project_schema.get('labels', [])
         domain = project_schema.get('domain')
@@ -55,15 +73,16 @@ class AIAnnotationService:
         try:
             system_prompt = await self.generate_system_prompt(project.schema)
             
-            response = await openai.ChatCompletion.acreate(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": document.content}
-                ],
-                temperature=self.temperature,
-                max_tokens=1000
-            )
+            with track_llm_call(self.model) as call:
+                response = call.response = await get_openai().ChatCompletion.acreate(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": document.content}
+                    ],
+                    temperature=self.temperature,
+                    max_tokens=1000
+                )
 
             result = self._parse_ai_response(response.choices[0].message.content)
             
@@ -84,6 +103,7 @@ class AIAnnotationService:
                 return await self.annotate_document(document, project, db, retry_count + 1)
             raise AIAnnotationError(f"Failed to annotate document after {self.max_retries} retries: {str(e)}")
 
+    @traced("ai.parse_response")
     def _parse_ai_response(self, content: str) -> Dict[str, Any]:
         """Parse and validate AI response"""
         try:
@@ -146,21 +166,36 @@ class AIAnnotationService:
         )
         annotation, document = result.one()
 
-        # Store correction as training example
-        await self._store_training_example(
+        await self.learn_from_correction_batch(
             db,
-            document.content,
-            annotation.content,
-            corrections
+            [(document.content, annotation.content, corrections)]
         )
 
+    async def learn_from_correction_batch(
+        self,
+        db: AsyncSession,
+        examples: List[Tuple[Optional[str], Dict[str, Any], Dict[str, Any]]]
+    ) -> None:
+        """Store (text, ai annotation, correction) examples, then recalibrate once.
+
+        Text may be None, callers don't load it while examples aren't stored.
+        """
+        # Store corrections as training examples
+        for text, ai_annotation, human_correction in examples:
+            await self._store_training_example(
+                db,
+                text,
+                ai_annotation,
+                human_correction
+            )
+
         # Adjust confidence thresholds based on historical accuracy
         await self._update_confidence_thresholds(db)
 
     async def _store_training_example(
         self,
         db: AsyncSession,
-        text: str,
+        text: Optional[str],
         ai_annotation: Dict,
         human_correction: Dict
     ) -> None:
@@ -187,13 +222,17 @@ class AIAnnotationService:
                 accuracies.append(1.0 if ann.verified else 0.0)
 
         if confidences:
+            import numpy as np  # only needed here, keeps it out of app startup
+
             # Update threshold based on historical performance
             confidence_matrix = np.array(list(zip(confidences, accuracies)))
             optimal_threshold = self._find_optimal_threshold(confidence_matrix)
             self.confidence_threshold = optimal_threshold
 
-    def _find_optimal_threshold(self, confidence_matrix: np.ndarray) -> float:
+    def _find_optimal_threshold(self, confidence_matrix: "np.ndarray") -> float:
         """Find optimal confidence threshold using F1 score"""
+        import numpy as np
+
         thresholds = np.arange(0.5, 1.0, 0.05)
         best_f1 = 0
         best_threshold = 0.8  # Default
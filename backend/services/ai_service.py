@@ -1,6 +1,8 @@
 from typing import List, Dict, Any
-import openai
 from models import Document, Project
+from core.monitoring import track_llm_call
+from services.llm import get_openai
+from core.tracing import traced
 import asyncio
 from enum import Enum
 
@@ -12,6 +14,7 @@ class AIService:
     def __init__(self, model: ModelType = ModelType.GPT35):
         self.model = model.value
         
+    @traced("ai.build_prompt")
     async def generate_prompt(self, project_schema: Dict[str, Any], content: str) -> str:
         """Generate a context-aware prompt based on project schema"""
         schema_type = project_schema.get('type', 'classification')
@@ -37,14 +40,15 @@ class AIService:
         prompt = await self.generate_prompt(project.schema, document.content)
         
         try:
-            response = await openai.ChatCompletion.acreate(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert annotator. Provide annotations in the specified JSON format."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3
-            )
+            with track_llm_call(self.model) as call:
+                response = call.response = await get_openai().ChatCompletion.acreate(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": "You are an expert annotator. Provide annotations in the specified JSON format."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.3
+                )
             
             return {
                 'content': response.choices[0].message.content,
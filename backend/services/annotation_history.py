@@ -0,0 +1,207 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from datetime import datetime
+import copy
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from sqlalchemy.orm import aliased
+from models import Annotation, AnnotationVersion, Document
+from core.config import settings
+
+def json_delta(old: Any, new: Any, path: Tuple = ()) -> List[Dict[str, Any]]:
+    """Ops turning ``old`` into ``new``; dicts are diffed key by key, anything else is replaced"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = [{"op": "remove", "path": [*path, key]} for key in old.keys() - new.keys()]
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "set", "path": [*path, key], "value": value})
+            elif old[key] != value:
+                ops.extend(json_delta(old[key], value, (*path, key)))
+        return ops
+    if old == new:
+        return []
+    return [{"op": "set", "path": list(path), "value": new}]
+
+def apply_delta(content: Any, ops: List[Dict[str, Any]]) -> Any:
+    """Inverse of json_delta"""
+    content = copy.deepcopy(content)
+    for op in ops:
+        path = op["path"]
+        if not path:
+            content = copy.deepcopy(op.get("value"))
+            continue
+        target = content
+        for key in path[:-1]:
+            target = target[key]
+        if op["op"] == "set":
+            target[path[-1]] = copy.deepcopy(op["value"])
+        else:
+            target.pop(path[-1], None)
+    return content
+
+class AnnotationHistoryService:
+    """Writes and reads AnnotationVersion rows.
+
+    Every change to an annotation bumps ``Annotation.version`` and stores a
+    version row. Most rows hold a JSON delta against the previous version;
+    every ANNOTATION_SNAPSHOT_INTERVAL versions (and whenever a delta would
+    not be smaller) the full content is stored instead, so rebuilding any
+    version reads at most one interval of rows.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.interval = max(1, settings.ANNOTATION_SNAPSHOT_INTERVAL)
+
+    def record_created(self, annotation: Annotation, user_id: Optional[Any] = None) -> AnnotationVersion:
+        """Version 1 of a new annotation, always a snapshot"""
+        annotation.version = 1
+        version = AnnotationVersion(
+            annotation=annotation,
+            version=1,
+            is_snapshot=True,
+            content=annotation.content,
+            verified=bool(annotation.verified),
+            created_by=user_id
+        )
+        self.db.add(version)
+        return version
+
+    async def record_change(
+        self,
+        annotation: Annotation,
+        previous_content: Any,
+        user_id: Optional[Any] = None
+    ) -> AnnotationVersion:
+        """Store the annotation's current state as its next version"""
+        annotation.version = (annotation.version or 1) + 1
+        rows = await self.record_versions([{
+            "annotation_id": annotation.id,
+            "version": annotation.version,
+            "previous_content": previous_content,
+            "content": annotation.content,
+            "verified": bool(annotation.verified),
+            "original_author": annotation.created_by,
+        }], user_id)
+        return rows[0]
+
+    async def record_versions(self, changes: List[Dict[str, Any]], user_id: Optional[Any] = None) -> List[AnnotationVersion]:
+        """Version rows for annotations whose ``version`` has already been bumped.
+
+        Each change carries annotation_id, the new version, previous_content,
+        content, verified and original_author. Existence of the previous
+        versions is checked with a single query for the whole batch.
+        """
+        if not changes:
+            return []
+        result = await self.db.execute(
+            select(AnnotationVersion.annotation_id, AnnotationVersion.version).where(
+                AnnotationVersion.annotation_id.in_({c["annotation_id"] for c in changes}),
+                AnnotationVersion.version.in_({c["version"] - 1 for c in changes})
+            )
+        )
+        existing = {tuple(row) for row in result}
+
+        versions = []
+        for change in changes:
+            previous_version = change["version"] - 1
+            if (change["annotation_id"], previous_version) not in existing:
+                # annotation predates history, keep its original (usually AI) content
+                self.db.add(AnnotationVersion(
+                    annotation_id=change["annotation_id"],
+                    version=previous_version,
+                    is_snapshot=True,
+                    content=change["previous_content"],
+                    verified=False,
+                    created_by=change.get("original_author")
+                ))
+            versions.append(self.build_version(change, user_id))
+        self.db.add_all(versions)
+        return versions
+
+    def build_version(self, change: Dict[str, Any], user_id: Optional[Any]) -> AnnotationVersion:
+        """Version row for ``change["version"]`` given the content of the version before it"""
+        delta = json_delta(change["previous_content"], change["content"])
+        snapshot = (
+            (change["version"] - 1) % self.interval == 0
+            or len(str(delta)) >= len(str(change["content"]))
+        )
+        return AnnotationVersion(
+            annotation_id=change["annotation_id"],
+            version=change["version"],
+            is_snapshot=snapshot,
+            content=change["content"] if snapshot else delta,
+            verified=change["verified"],
+            created_by=user_id
+        )
+
+    @staticmethod
+    def _replay(rows: List[AnnotationVersion]) -> Iterator[Tuple[AnnotationVersion, Any]]:
+        state = None
+        for row in rows:
+            state = copy.deepcopy(row.content) if row.is_snapshot else apply_delta(state, row.content)
+            yield row, state
+
+    async def history(self, annotation_id: str) -> List[Dict[str, Any]]:
+        """Every version of one annotation with its full content, oldest first"""
+        result = await self.db.execute(
+            select(AnnotationVersion)
+            .where(AnnotationVersion.annotation_id == annotation_id)
+            .order_by(AnnotationVersion.version)
+        )
+        return [
+            {
+                "version": row.version,
+                "content": state,
+                "verified": row.verified,
+                "created_by": row.created_by,
+                "created_at": row.created_at,
+            }
+            for row, state in self._replay(result.scalars().all())
+        ]
+
+    async def project_state_as_of(self, project_id: str, as_of: datetime) -> List[Dict[str, Any]]:
+        """Content of every annotation in a project as it was at ``as_of``.
+
+        Only rows from each annotation's latest snapshot at that time onward
+        are read, via the (annotation_id, version) index.
+        """
+        snapshot = aliased(AnnotationVersion)
+        base_version = (
+            select(func.max(snapshot.version))
+            .where(
+                snapshot.annotation_id == AnnotationVersion.annotation_id,
+                snapshot.is_snapshot == True,
+                snapshot.created_at <= as_of
+            )
+            .correlate(AnnotationVersion)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            select(AnnotationVersion, Annotation.document_id)
+            .join(Annotation, Annotation.id == AnnotationVersion.annotation_id)
+            .join(Document, Document.id == Annotation.document_id)
+            .where(
+                Document.project_id == project_id,
+                AnnotationVersion.created_at <= as_of,
+                AnnotationVersion.version >= base_version
+            )
+            .order_by(AnnotationVersion.annotation_id, AnnotationVersion.version)
+        )
+
+        states: Dict[Any, Dict[str, Any]] = {}
+        grouped: Dict[Any, List[AnnotationVersion]] = {}
+        documents: Dict[Any, Any] = {}
+        for row, document_id in result:
+            grouped.setdefault(row.annotation_id, []).append(row)
+            documents[row.annotation_id] = document_id
+        for annotation_id, rows in grouped.items():
+            for row, state in self._replay(rows):
+                states[annotation_id] = {
+                    "annotation_id": annotation_id,
+                    "document_id": documents[annotation_id],
+                    "version": row.version,
+                    "content": state,
+                    "verified": row.verified,
+                    "updated_at": row.created_at,
+                }
+        return list(states.values())
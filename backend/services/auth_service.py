@@ -1,10 +1,17 @@
-from typing import Optional
+from typing import Any, Dict, Optional
+from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from models import User
-from core.security import verify_password, get_password_hash
+from models.base import UserRole
+from core.security import verify_and_update_password, get_password_hash_async
+from core.config import settings
+from services.cache import CacheService
 from fastapi import HTTPException
 
+def _user_key(email: str) -> str:
+    return f"user:{email}"
+
 class AuthService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -13,14 +20,66 @@ class AuthService:
         user = await self.get_user_by_email(email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        verified, new_hash = await verify_and_update_password(password, user.hashed_password)
+        if not verified:
             return None
+        if new_hash:
+            # rehash with the current BCRYPT_ROUNDS
+            user.hashed_password = new_hash
+            await self.db.commit()
         return user
 
     async def get_user_by_email(self, email: str) -> Optional[User]:
         result = await self.db.execute(select(User).where(User.email == email))
         return result.scalar_one_or_none()
 
+    async def get_cached_user(self, email: str) -> Optional[User]:
+        """User for a token subject, served from Redis for USER_CACHE_TTL seconds.
+
+        Only the columns needed for authorization are cached and the result
+        is a detached User without its password hash. The process-local tier
+        is skipped so an invalidation takes effect on every worker at once.
+        """
+        async def load() -> Optional[Dict[str, Any]]:
+            user = await self.get_user_by_email(email)
+            if user is None:
+                return None
+            return {
+                "id": user.id,
+                "email": user.email,
+                "name": user.name,
+                "role": user.role.value if isinstance(user.role, UserRole) else user.role,
+                "is_active": user.is_active,
+            }
+
+        cached = await CacheService().get_or_set(
+            _user_key(email), load, expire=settings.USER_CACHE_TTL, local=False
+        )
+        if cached is None:
+            return None
+        return User(
+            id=UUID(str(cached["id"])),
+            email=cached["email"],
+            name=cached["name"],
+            role=UserRole(cached["role"]) if cached["role"] else None,
+            is_active=cached["is_active"]
+        )
+
+    async def invalidate_user(self, email: str) -> None:
+        await CacheService().delete(_user_key(email))
+
+    async def set_role(self, user: User, role: UserRole) -> User:
+        user.role = role
+        await self.db.commit()
+        await self.invalidate_user(user.email)
+        return user
+
+    async def set_active(self, user: User, is_active: bool) -> User:
+        user.is_active = is_active
+        await self.db.commit()
+        await self.invalidate_user(user.email)
+        return user
+
     async def create_user(self, email: str, password: str, name: str, role: str = "annotator") -> User:
         # Check if user exists
         existing_user = await self.get_user_by_email(email)
@@ -28,7 +87,7 @@ class AuthService:
             raise HTTPException(status_code=400, detail="Email already registered")
         
         # Create new user
-        hashed_password = get_password_hash(password)
+        hashed_password = await get_password_hash_async(password)
         user = User(
             email=email,
             hashed_password=hashed_password,
@@ -38,4 +97,6 @@ class AuthService:
         self.db.add(user)
         await self.db.commit()
         await self.db.refresh(user)
+        # drop a cached "no such user" left by an earlier token for this email
+        await self.invalidate_user(email)
         return user 
\ No newline at end of file
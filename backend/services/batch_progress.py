@@ -0,0 +1,171 @@
+from typing import Any, AsyncIterator, Dict, Optional, Set
+from datetime import datetime
+import asyncio
+import json
+import redis.asyncio as redis
+from core.config import settings
+from core.logging import logger
+from services.cache import get_redis
+
+# Progress of batch annotation jobs. Every event goes to the Redis channel of
+# its job, so a client connected to any worker sees it, and the running counts
+# are kept in a hash so late subscribers start from the current state.
+# Without Redis, events only reach subscribers in the same process.
+
+_local: Dict[str, Set[asyncio.Queue]] = {}
+
+def _channel(job_id: str) -> str:
+    return f"batch:{job_id}:events"
+
+def _state_key(job_id: str) -> str:
+    return f"batch:{job_id}:state"
+
+def _encode(event: dict) -> str:
+    return json.dumps(event, default=str)
+
+class BatchProgress:
+    """Publishes the events of one batch job"""
+
+    def __init__(self, job_id: str, project_id: str, total: int):
+        self.job_id = job_id
+        self.project_id = project_id
+        self.total = total
+        self.succeeded = 0
+        self.failed = 0
+        self.redis = get_redis()
+
+    def state(self, status: str) -> dict:
+        return {
+            "job_id": self.job_id,
+            "project_id": str(self.project_id),
+            "status": status,
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+        }
+
+    async def started(self) -> None:
+        await self._publish("started", "running")
+
+    async def document_done(self, document_id: Any, annotation: dict) -> None:
+        self.succeeded += 1
+        await self._publish("document", "running", document_id=document_id, annotation=annotation)
+
+    async def document_failed(self, document_id: Any, error: str) -> None:
+        self.failed += 1
+        await self._publish("document_error", "running", document_id=document_id, error=error)
+
+    async def finished(self) -> None:
+        await self._publish("finished", "finished")
+
+    async def aborted(self, error: str) -> None:
+        await self._publish("aborted", "aborted", error=error)
+
+    async def _publish(self, kind: str, status: str, **fields) -> None:
+        state = self.state(status)
+        event = {"type": kind, **state, **fields, "at": datetime.utcnow().isoformat()}
+        data = _encode(event)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(_state_key(self.job_id), _encode(state), ex=settings.BATCH_PROGRESS_TTL)
+                pipe.publish(_channel(self.job_id), data)
+                await pipe.execute()
+        except redis.RedisError as e:
+            # progress is best effort, the batch itself must not fail on it
+            logger.warning(f"Batch progress publish failed for {self.job_id}: {e}")
+            for queue in _local.get(self.job_id, ()):
+                queue.put_nowait(data)
+
+async def current_state(job_id: str) -> Optional[dict]:
+    """Running counts of a job, None if unknown or expired"""
+    try:
+        data = await get_redis().get(_state_key(job_id))
+    except redis.RedisError as e:
+        logger.warning(f"Batch progress lookup failed for {job_id}: {e}")
+        return None
+    return json.loads(data) if data else None
+
+class _Subscription:
+    """Redis channel of one job, plus a local queue for when Redis is down"""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.pubsub = get_redis().pubsub()
+
+    async def open(self) -> None:
+        _local.setdefault(self.job_id, set()).add(self.queue)
+        try:
+            await self.pubsub.subscribe(_channel(self.job_id))
+        except redis.RedisError as e:
+            logger.warning(f"Batch progress subscribe failed for {self.job_id}, local events only: {e}")
+            await self._drop_pubsub()
+
+    async def close(self) -> None:
+        queues = _local.get(self.job_id, set())
+        queues.discard(self.queue)
+        if not queues:
+            _local.pop(self.job_id, None)
+        await self._drop_pubsub()
+
+    async def _drop_pubsub(self) -> None:
+        if self.pubsub is not None:
+            try:
+                await self.pubsub.aclose()
+            except redis.RedisError:
+                pass
+            self.pubsub = None
+
+    async def next(self, timeout: float) -> Optional[str]:
+        """Next event, None if nothing arrived within ``timeout`` seconds"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            if not self.queue.empty():
+                return self.queue.get_nowait()
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            if self.pubsub is None:
+                try:
+                    return await asyncio.wait_for(self.queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    return None
+            try:
+                # short polls so local events are not held up behind Redis
+                message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=min(remaining, 1.0))
+            except redis.RedisError as e:
+                logger.warning(f"Batch progress channel lost for {self.job_id}, local events only: {e}")
+                await self._drop_pubsub()
+                continue
+            if message is not None:
+                data = message["data"]
+                return data.decode() if isinstance(data, bytes) else data
+
+async def subscribe(job_id: str) -> AsyncIterator[dict]:
+    """Events of a job until it finishes, starting with its current state.
+
+    A heartbeat event is yielded after BATCH_PROGRESS_HEARTBEAT idle seconds
+    so the caller notices a dropped client.
+    """
+    subscription = _Subscription(job_id)
+    try:
+        # subscribe before reading the state, nothing published in between is lost
+        await subscription.open()
+        state = await current_state(job_id)
+        if state:
+            yield {"type": "state", **state}
+            if state["status"] != "running":
+                return
+
+        while True:
+            data = await subscription.next(settings.BATCH_PROGRESS_HEARTBEAT)
+            if data is None:
+                yield {"type": "heartbeat", "job_id": job_id}
+                continue
+            event = json.loads(data)
+            yield event
+            if event["type"] in ("finished", "aborted"):
+                return
+    finally:
+        await subscription.close()
@@ -1,21 +1,247 @@
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Optional, Tuple
+from collections import OrderedDict
+from datetime import date, datetime
+from uuid import UUID
+import asyncio
+import secrets
+import time
+import msgpack
 import redis.asyncio as redis
 from core.config import settings
+from core.logging import logger
+from core.monitoring import cache_requests
+from core.tracing import traced
 
-class CacheService:
-    def __init__(self):
-        self.redis = redis.Redis.from_url(
+_MISSING = object()
+
+# one connection pool per process, shared by every CacheService
+_pool: Optional[redis.ConnectionPool] = None
+
+def get_redis() -> redis.Redis:
+    global _pool
+    if _pool is None:
+        _pool = redis.ConnectionPool.from_url(
             settings.REDIS_URL,
-            decode_responses=True
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_connect_timeout=1,
+            socket_timeout=1
         )
-        
-    async def get(self, key: str) -> Optional[Any]:
-        return await self.redis.get(key)
-        
+    return redis.Redis(connection_pool=_pool)
+
+async def close_redis() -> None:
+    """Disconnect the shared pool, called once on shutdown"""
+    global _pool
+    if _pool is not None:
+        await _pool.disconnect()
+        _pool = None
+
+def _encode_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+def dumps(value: Any) -> bytes:
+    return msgpack.packb(value, default=_encode_default, use_bin_type=True)
+
+def loads(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False)
+
+class LocalCache:
+    """Process-local LRU of encoded values with per-entry expiry.
+
+    Entries are kept as msgpack bytes and decoded by the caller on every
+    hit, so no two callers ever share (and mutate) one cached object.
+    """
+
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        """The stored bytes, or _MISSING"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, data: bytes, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+_local = LocalCache(settings.CACHE_LOCAL_MAX_ITEMS)
+_inflight: "dict[str, asyncio.Lock]" = {}
+# hits and misses per tier, mirrored in the cache_requests_total metric
+_stats = {"local": [0, 0], "redis": [0, 0]}
+
+def _record(tier: str, hit: bool) -> None:
+    _stats[tier][0 if hit else 1] += 1
+    cache_requests.labels(tier=tier, result="hit" if hit else "miss").inc()
+
+class CacheService:
+    """Two-tier cache: a process-local LRU in front of Redis.
+
+    Values are msgpack encoded in both tiers, so every ``get`` returns a
+    fresh object. Local entries live for at most CACHE_LOCAL_TTL seconds so
+    workers converge quickly after a write elsewhere, and values over
+    CACHE_LOCAL_MAX_ITEM_BYTES stay in Redis only. ``None`` is cached as a
+    negative result; ``get`` returns None for both misses and negative hits.
+    Redis errors are logged and treated as misses, the cache never fails a
+    request.
+    """
+
+    def __init__(self):
+        self.redis = get_redis()
+        self.local = _local
+
+    @traced("cache.get")
+    async def get(self, key: str, local: bool = True) -> Optional[Any]:
+        value = await self._lookup(key, local)
+        return None if value is _MISSING else value
+
+    @traced("cache.set")
     async def set(
         self,
         key: str,
         value: Any,
-        expire: int = 3600
+        expire: int = settings.CACHE_DEFAULT_TTL,
+        local: bool = True
     ) -> None:
-        await self.redis.set(key, value, ex=expire) 
\ No newline at end of file
+        data = dumps(value)
+        if local and len(data) <= settings.CACHE_LOCAL_MAX_ITEM_BYTES:
+            self.local.set(key, data, min(expire, settings.CACHE_LOCAL_TTL))
+        try:
+            await self.redis.set(key, data, ex=expire)
+        except redis.RedisError as e:
+            logger.warning(f"Cache set failed for {key}: {e}")
+
+    @traced("cache.delete")
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.local.delete(key)
+        try:
+            await self.redis.delete(*keys)
+        except redis.RedisError as e:
+            logger.warning(f"Cache delete failed for {keys}: {e}")
+
+    @traced("cache.get_or_set")
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        expire: int = settings.CACHE_DEFAULT_TTL,
+        negative_expire: int = settings.CACHE_NEGATIVE_TTL,
+        local: bool = True
+    ) -> Optional[Any]:
+        """Cached value of ``key``, calling ``loader`` once on a miss.
+
+        Concurrent misses for the same key are collapsed: within a process by
+        an asyncio lock, across processes by a short Redis lock. Callers that
+        lose the race wait for the winner's value instead of hitting the
+        database too. A ``None`` result is cached for ``negative_expire``.
+        """
+        value = await self._lookup(key, local)
+        if value is not _MISSING:
+            return value
+
+        lock = _inflight.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                value = await self._lookup(key, local)
+                if value is not _MISSING:
+                    return value
+
+                token = await self._acquire(key)
+                if token is None:
+                    value = await self._wait_for(key, local)
+                    if value is not _MISSING:
+                        return value
+                try:
+                    value = await loader()
+                    await self.set(key, value, negative_expire if value is None else expire, local)
+                    return value
+                finally:
+                    if token:
+                        await self._release(key, token)
+        finally:
+            if not lock.locked() and _inflight.get(key) is lock:
+                del _inflight[key]
+
+    async def _lookup(self, key: str, local: bool) -> Any:
+        if local:
+            data = self.local.get(key)
+            if data is not _MISSING:
+                _record("local", hit=True)
+                return loads(data)
+            _record("local", hit=False)
+
+        try:
+            data = await self.redis.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Cache get failed for {key}: {e}")
+            data = None
+        if data is None:
+            _record("redis", hit=False)
+            return _MISSING
+
+        _record("redis", hit=True)
+        value = loads(data)
+        if local and len(data) <= settings.CACHE_LOCAL_MAX_ITEM_BYTES:
+            self.local.set(key, data, settings.CACHE_LOCAL_TTL)
+        return value
+
+    async def _acquire(self, key: str) -> Optional[str]:
+        """Take the cross-process fill lock, "" if Redis is unavailable"""
+        token = secrets.token_hex(8)
+        try:
+            if await self.redis.set(f"lock:{key}", token, nx=True, px=settings.CACHE_LOCK_TIMEOUT * 1000):
+                return token
+            return None
+        except redis.RedisError:
+            return ""
+
+    async def _release(self, key: str, token: str) -> None:
+        try:
+            # only delete the lock if it is still ours
+            await self.redis.eval(
+                "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0",
+                1, f"lock:{key}", token
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Cache lock release failed for {key}: {e}")
+
+    async def _wait_for(self, key: str, local: bool) -> Any:
+        """Poll for the value another process is filling, up to the lock timeout"""
+        deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+        delay = 0.01
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            value = await self._lookup(key, local)
+            if value is not _MISSING:
+                return value
+            delay = min(delay * 2, 0.2)
+        return _MISSING
+
+    @staticmethod
+    def hit_ratio() -> dict:
+        """Hit ratio per tier since process start"""
+        return {
+            tier: round(hits / (hits + misses), 4) if hits + misses else None
+            for tier, (hits, misses) in _stats.items()
+        }
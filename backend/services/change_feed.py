@@ -0,0 +1,139 @@
+from typing import Any, Dict, List, Tuple
+from datetime import datetime, timedelta
+import time
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, tuple_
+from models import ChangeLog, Document, Annotation
+from core.config import settings
+
+class InvalidCursor(ValueError):
+    pass
+
+class CursorExpired(Exception):
+    """The log was pruned past the cursor, the client has to reload"""
+
+def encode_cursor(xid: int, change_id: int) -> str:
+    # stamped with the time it was handed out, see CursorExpired
+    return f"{xid}-{change_id}-{int(time.time())}"
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        xid, change_id, issued_at = (int(part) for part in cursor.split("-"))
+    except ValueError:
+        raise InvalidCursor(f"Invalid cursor {cursor!r}")
+    if time.time() - issued_at > settings.CHANGE_LOG_RETENTION_DAYS * 86400:
+        raise CursorExpired()
+    return xid, change_id
+
+class ChangeFeedService:
+    """Documents and annotations of a project changed since a cursor.
+
+    The cursor is a position in change_log ordered by (xid, id). On
+    PostgreSQL only entries of transactions older than every running one are
+    served: ids are handed out before commit, so a slow transaction can
+    commit an entry below one a client has already seen. Holding back
+    everything from the oldest open transaction on keeps the order safe.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _settled(self, query):
+        if self.db.get_bind().dialect.name == "postgresql":
+            xmin = select(func.txid_snapshot_xmin(func.txid_current_snapshot())).scalar_subquery()
+            query = query.where(ChangeLog.xid < xmin)
+        return query
+
+    async def head(self, project_id: Any) -> str:
+        """Cursor at the latest settled change, to start syncing from after a full load"""
+        last = (await self.db.execute(
+            self._settled(
+                select(ChangeLog.xid, ChangeLog.id)
+                .where(ChangeLog.project_id == project_id)
+                .order_by(ChangeLog.xid.desc(), ChangeLog.id.desc())
+                .limit(1)
+            )
+        )).first()
+        return encode_cursor(*(last or (0, 0)))
+
+    async def changes_since(
+        self,
+        project_id: Any,
+        cursor: str,
+        limit: int = settings.CHANGE_FEED_MAX_CHANGES,
+        include_content: bool = False
+    ) -> Dict[str, Any]:
+        position = decode_cursor(cursor)
+        entries = (await self.db.execute(
+            self._settled(
+                select(ChangeLog.xid, ChangeLog.id, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.op)
+                .where(
+                    ChangeLog.project_id == project_id,
+                    tuple_(ChangeLog.xid, ChangeLog.id) > tuple_(*position)
+                )
+                .order_by(ChangeLog.xid, ChangeLog.id)
+                .limit(limit + 1)
+            )
+        )).all()
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        if entries:
+            position = (entries[-1].xid, entries[-1].id)
+
+        # only the last change of each row matters, the current row is sent
+        latest = {(entry.entity, entry.entity_id): entry.op for entry in entries}
+        document_ids = [i for (entity, i), op in latest.items() if entity == "document" and op == "upsert"]
+        annotation_ids = [i for (entity, i), op in latest.items() if entity == "annotation" and op == "upsert"]
+        documents = await self._documents(project_id, document_ids, include_content)
+        annotations = await self._annotations(annotation_ids)
+
+        return {
+            "cursor": encode_cursor(*position),
+            "has_more": has_more,
+            "documents": self._merge(latest, "document", documents),
+            "annotations": self._merge(latest, "annotation", annotations),
+        }
+
+    @staticmethod
+    def _merge(latest: Dict[Tuple[str, Any], str], entity: str, rows: Dict[Any, dict]) -> List[dict]:
+        # a row deleted after its upsert entry goes out as a tombstone already,
+        # its delete entry follows and changes nothing on the client
+        return [
+            rows.get(i) or {"id": i, "deleted": True}
+            for (kind, i) in latest if kind == entity
+        ]
+
+    async def _documents(self, project_id: Any, ids: List[Any], include_content: bool) -> Dict[Any, dict]:
+        if not ids:
+            return {}
+        columns = [Document.id, Document.status, Document.created_at, Document.updated_at]
+        if include_content:
+            columns.append(Document.content)
+        rows = (await self.db.execute(
+            select(*columns).where(Document.id.in_(ids), Document.project_id == project_id)
+        )).mappings().all()
+        return {row["id"]: dict(row) for row in rows}
+
+    async def _annotations(self, ids: List[Any]) -> Dict[Any, dict]:
+        if not ids:
+            return {}
+        rows = (await self.db.execute(
+            select(
+                Annotation.id,
+                Annotation.document_id,
+                Annotation.content,
+                Annotation.confidence_score,
+                Annotation.verified,
+                Annotation.verified_by,
+                Annotation.version,
+                Annotation.updated_at
+            ).where(Annotation.id.in_(ids))
+        )).mappings().all()
+        return {row["id"]: dict(row) for row in rows}
+
+async def prune_change_log(db: AsyncSession, batch_size: int = 10000) -> int:
+    """Delete up to ``batch_size`` entries past the retention window, cursors that old are refused anyway"""
+    cutoff = datetime.utcnow() - timedelta(days=settings.CHANGE_LOG_RETENTION_DAYS)
+    expired = select(ChangeLog.id).where(ChangeLog.changed_at < cutoff).limit(batch_size)
+    result = await db.execute(delete(ChangeLog).where(ChangeLog.id.in_(expired)))
+    return result.rowcount
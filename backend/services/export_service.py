@@ -0,0 +1,136 @@
+from typing import Any, AsyncIterator, Dict, List
+import importlib.util
+import io
+import json
+from sqlalchemy import select, func, and_
+from database import AsyncSessionLocal
+from models import Document, Annotation
+
+# Parquet export is optional, pyarrow is only imported when one is written
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+EXPORT_FORMATS = ("jsonl", "parquet")
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+class ExportService:
+    """Streams a project's documents with their latest verified annotation.
+
+    Rows come from a server-side cursor (AsyncSession.stream with yield_per)
+    in chunks of ``chunk_size``, so memory stays flat regardless of project
+    size. Each export opens its own session because the response body is
+    produced after the request's dependencies have been torn down.
+    """
+
+    def __init__(self, project_id: str, use_replica: bool = False, chunk_size: int = 5000):
+        self.project_id = project_id
+        self.use_replica = use_replica
+        self.chunk_size = chunk_size
+
+    def _query(self):
+        latest = (
+            select(
+                Annotation.document_id,
+                Annotation.id,
+                Annotation.content,
+                Annotation.confidence_score,
+                Annotation.verified_by,
+                Annotation.updated_at,
+                func.row_number().over(
+                    partition_by=Annotation.document_id,
+                    order_by=(Annotation.updated_at.desc(), Annotation.created_at.desc())
+                ).label("rank")
+            )
+            .join(Document, Document.id == Annotation.document_id)
+            .where(Document.project_id == self.project_id, Annotation.verified == True)
+            .subquery()
+        )
+        return (
+            select(
+                Document.id.label("document_id"),
+                Document.content,
+                Document.status,
+                latest.c.id.label("annotation_id"),
+                latest.c.content.label("annotation"),
+                latest.c.confidence_score,
+                latest.c.verified_by,
+                latest.c.updated_at.label("annotated_at")
+            )
+            .join(latest, and_(latest.c.document_id == Document.id, latest.c.rank == 1))
+            .where(Document.project_id == self.project_id)
+            .order_by(Document.id)
+            .execution_options(yield_per=self.chunk_size)
+        )
+
+    async def _partitions(self) -> AsyncIterator[List[Dict[str, Any]]]:
+        async with AsyncSessionLocal(info={"use_replica": self.use_replica}) as session:
+            result = await session.stream(self._query())
+            async for partition in result.mappings().partitions(self.chunk_size):
+                yield partition
+
+    async def stream_jsonl(self) -> AsyncIterator[bytes]:
+        async for rows in self._partitions():
+            yield "".join(
+                json.dumps(dict(row), default=str, ensure_ascii=False) + "\n"
+                for row in rows
+            ).encode("utf-8")
+
+    async def stream_parquet(self) -> AsyncIterator[bytes]:
+        """One Parquet row group per chunk, flushed as soon as it is written"""
+        if not HAS_PYARROW:
+            raise RuntimeError("Parquet export requires the pyarrow package")
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ("document_id", pa.string()),
+            ("content", pa.string()),
+            ("status", pa.string()),
+            ("annotation_id", pa.string()),
+            ("annotation", pa.string()),  # JSON encoded
+            ("confidence_score", pa.float64()),
+            ("verified_by", pa.string()),
+            ("annotated_at", pa.timestamp("us")),
+        ])
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        try:
+            async for rows in self._partitions():
+                columns = {
+                    "document_id": [str(row["document_id"]) for row in rows],
+                    "content": [row["content"] for row in rows],
+                    "status": [row["status"] for row in rows],
+                    "annotation_id": [str(row["annotation_id"]) for row in rows],
+                    "annotation": [json.dumps(row["annotation"], default=str) for row in rows],
+                    "confidence_score": [row["confidence_score"] for row in rows],
+                    "verified_by": [str(row["verified_by"]) if row["verified_by"] else None for row in rows],
+                    "annotated_at": [row["annotated_at"] for row in rows],
+                }
+                writer.write_table(pa.table(columns, schema=schema))
+                yield sink.drain()
+        finally:
+            writer.close()
+        # footer
+        yield sink.drain()
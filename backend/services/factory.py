@@ -1,18 +1,33 @@
-from typing import Dict
-from .ai.annotation import AIAnnotationService
-from .ai.learning import ActiveLearningService
+from typing import Dict, Optional
+from core.config import settings
+from .ai_annotation_service import AIAnnotationService
+from .cache import CacheService
 
 class ServiceFactory:
+    """Process-wide service instances, built once and shared by every request"""
     _instances: Dict = {}
     
     @classmethod
-    def get_annotation_service(cls) -> AIAnnotationService:
-        if "annotation" not in cls._instances:
-            cls._instances["annotation"] = AIAnnotationService()
-        return cls._instances["annotation"]
+    def get_annotation_service(cls, model: Optional[str] = None) -> AIAnnotationService:
+        # one per model, each keeps its prompt cache and learned threshold.
+        # The allowlist bounds how many there can be
+        model = model or settings.OPENAI_MODEL
+        if model not in settings.OPENAI_ALLOWED_MODELS:
+            raise ValueError(f"Model {model!r} is not allowed")
+        key = f"annotation:{model}"
+        if key not in cls._instances:
+            cls._instances[key] = AIAnnotationService(model)
+        return cls._instances[key]
     
     @classmethod
-    def get_learning_service(cls) -> ActiveLearningService:
+    def get_learning_service(cls):
         if "learning" not in cls._instances:
+            from .ai.learning import ActiveLearningService
             cls._instances["learning"] = ActiveLearningService()
-        return cls._instances["learning"] 
\ No newline at end of file
+        return cls._instances["learning"]
+
+    @classmethod
+    def get_cache(cls) -> CacheService:
+        if "cache" not in cls._instances:
+            cls._instances["cache"] = CacheService()
+        return cls._instances["cache"]
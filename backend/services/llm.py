@@ -0,0 +1,39 @@
+from contextvars import ContextVar
+from core.config import settings
+
+# The OpenAI SDK (and the HTTP stack under it) is only imported when the
+# first completion is requested, so importing the app stays cheap.
+
+_openai = None
+
+def get_openai():
+    """The configured openai module, imported on first use"""
+    global _openai
+    if _openai is None:
+        import openai
+        openai.api_key = settings.OPENAI_API_KEY
+        _openai = openai
+    return _openai
+
+async def open_llm_session() -> None:
+    """One aiohttp session for every async completion instead of one per call.
+
+    openai reads its session from a contextvar; one set at startup would not
+    reach request tasks, so it is installed as the variable's default.
+    """
+    import aiohttp
+
+    openai = get_openai()
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=settings.OPENAI_MAX_CONNECTIONS, keepalive_timeout=30),
+        timeout=aiohttp.ClientTimeout(total=settings.OPENAI_TIMEOUT)
+    )
+    openai.aiosession = ContextVar("aiohttp-session", default=session)
+
+async def close_llm_session() -> None:
+    if _openai is None:
+        return
+    session = _openai.aiosession.get()
+    if session is not None:
+        await session.close()
+        _openai.aiosession = ContextVar("aiohttp-session", default=None)
@@ -0,0 +1,72 @@
+from typing import Any, Iterable, List
+from sqlalchemy import select
+import redis.asyncio as redis
+from database import AsyncSessionLocal
+from models import Annotation, Document, Project
+from core.config import settings
+from core.logging import logger
+from services.ai_annotation_service import AIAnnotationError
+from services.annotation_history import AnnotationHistoryService
+from services.cache import get_redis
+from services.factory import ServiceFactory
+from services.search_service import SearchService
+
+def _lock_key(document_id: Any) -> str:
+    return f"preannotate:{document_id}"
+
+async def claim_documents(document_ids: Iterable[Any]) -> List[Any]:
+    """Documents this worker may pre-annotate, each claimed by one worker only.
+
+    Several annotators prefetch the same documents, the claim keeps them from
+    paying for the same completion twice. Without Redis every caller wins.
+    """
+    claimed = []
+    client = get_redis()
+    for document_id in document_ids:
+        try:
+            if not await client.set(_lock_key(document_id), 1, nx=True, ex=settings.PREFETCH_PREANNOTATE_LOCK):
+                continue
+        except redis.RedisError as e:
+            logger.warning(f"Pre-annotation claim failed for {document_id}: {e}")
+        claimed.append(document_id)
+    return claimed
+
+async def preannotate_documents(project_id: Any, document_ids: List[Any], user_id: Any) -> None:
+    """AI annotations for documents that have none yet, run after the response is sent.
+
+    Opens its own session because the request's one is closed by then.
+    """
+    ai_service = ServiceFactory.get_annotation_service(settings.OPENAI_MODEL)
+    async with AsyncSessionLocal() as db:
+        project = await db.get(Project, project_id)
+        if not project:
+            return
+        annotated = select(Annotation.id).where(Annotation.document_id == Document.id).exists()
+        # an annotator may have been faster than the claim
+        documents = (await db.execute(
+            select(Document).where(Document.id.in_(document_ids), ~annotated)
+        )).scalars().all()
+
+        history = AnnotationHistoryService(db)
+        stored = []
+        for doc in documents:
+            try:
+                result = await ai_service.annotate_document(doc, project, db)
+            except AIAnnotationError as e:
+                logger.warning(f"Pre-annotation of document {doc.id} failed: {e}")
+                continue
+            annotation = Annotation(
+                document_id=doc.id,
+                content=result,
+                confidence_score=result.get("confidence", 0),
+                created_by=user_id
+            )
+            db.add(annotation)
+            history.record_created(annotation)
+            stored.append(doc.id)
+
+        if stored:
+            await db.flush()
+            await SearchService(db).index_documents(stored)
+            await db.commit()
+            logger.info(f"Pre-annotated {len(stored)} documents of project {project_id}")
@@ -0,0 +1,113 @@
+from typing import Any, Dict, Iterable, List, Optional
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func
+from database import AsyncSessionLocal
+from models import Project, Document, Annotation, AnnotationVersion
+from services.cache import CacheService, LocalCache, dumps, loads
+from services.read_cache import invalidate_project, invalidate_documents
+from core.config import settings
+from core.logging import logger
+
+PROGRESS_TTL = 24 * 60 * 60
+
+# progress of the purges this process ran, for when Redis is unavailable
+_local_progress = LocalCache(max_items=1000)
+
+async def delete_documents(db: AsyncSession, document_ids: Iterable[Any]) -> int:
+    """Delete documents and everything hanging off them with one statement per table"""
+    document_ids = list(document_ids)
+    if not document_ids:
+        return 0
+    annotation_ids = select(Annotation.id).where(Annotation.document_id.in_(document_ids))
+    await db.execute(
+        delete(AnnotationVersion).where(AnnotationVersion.annotation_id.in_(annotation_ids))
+    )
+    await db.execute(delete(Annotation).where(Annotation.document_id.in_(document_ids)))
+    result = await db.execute(delete(Document).where(Document.id.in_(document_ids)))
+    return result.rowcount
+
+class PurgeService:
+    """Deletes a project in short batches.
+
+    Each batch of ``PURGE_BATCH_SIZE`` documents (with their annotations and
+    versions) is deleted and committed in its own transaction, so row locks
+    are held for one batch at a time and other requests keep going. Progress
+    is kept in Redis under ``purge:<project_id>``, and in the process that
+    runs the purge so it can still report it without Redis.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None):
+        self.batch_size = batch_size or settings.PURGE_BATCH_SIZE
+        self.cache = CacheService()
+
+    @staticmethod
+    def _progress_key(project_id: str) -> str:
+        return f"purge:{project_id}"
+
+    async def get_progress(self, project_id: str) -> Optional[Dict[str, Any]]:
+        key = self._progress_key(project_id)
+        progress = await self.cache.get(key, local=False)
+        if progress is None:
+            data = _local_progress.get(key)
+            progress = loads(data) if isinstance(data, bytes) else None  # misses are a sentinel
+        return progress
+
+    async def _report(self, project_id: str, progress: Dict[str, Any]) -> None:
+        # encoded now, progress keeps changing
+        _local_progress.set(self._progress_key(project_id), dumps(progress), PROGRESS_TTL)
+        try:
+            await self.cache.set(self._progress_key(project_id), progress, expire=PROGRESS_TTL, local=False)
+        except Exception as e:
+            # progress is informational, never fail a purge over it
+            logger.warning(f"Could not store purge progress for {project_id}: {e}")
+
+    async def count_documents(self, db: AsyncSession, project_id: str) -> int:
+        return await db.scalar(
+            select(func.count()).select_from(Document).where(Document.project_id == project_id)
+        )
+
+    async def purge_project(self, project_id: str) -> None:
+        """Delete all of a project's documents batch by batch, then the project"""
+        async with AsyncSessionLocal() as session:
+            total = await self.count_documents(session, project_id)
+        progress = {
+            "project_id": project_id,
+            "status": "running",
+            "total_documents": total,
+            "deleted_documents": 0,
+            "started_at": datetime.utcnow(),
+            "finished_at": None,
+            "error": None,
+        }
+        await self._report(project_id, progress)
+
+        try:
+            while True:
+                async with AsyncSessionLocal() as session:
+                    batch = await self._next_batch(session, project_id)
+                    if not batch:
+                        await session.execute(delete(Project).where(Project.id == project_id))
+                        await session.commit()
+                        await invalidate_project(project_id)
+                        break
+                    progress["deleted_documents"] += await delete_documents(session, batch)
+                    await session.commit()
+                await invalidate_documents(*batch)
+                await self._report(project_id, progress)
+        except Exception as e:
+            logger.error(f"Purge of project {project_id} failed: {e}")
+            progress.update(status="failed", error=str(e), finished_at=datetime.utcnow())
+            await self._report(project_id, progress)
+            raise
+
+        progress.update(status="completed", finished_at=datetime.utcnow())
+        await self._report(project_id, progress)
+
+    async def _next_batch(self, db: AsyncSession, project_id: str) -> List[Any]:
+        result = await db.execute(
+            select(Document.id)
+            .where(Document.project_id == project_id)
+            .limit(self.batch_size)
+        )
+        return result.scalars().all()
@@ -0,0 +1,92 @@
+from typing import Any, Dict, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, true
+from models import Project, Document, Annotation
+from services.cache import CacheService
+
+PROJECT_TTL = 600
+DOCUMENT_TTL = 300
+
+def project_key(project_id: Any) -> str:
+    return f"project:{project_id}"
+
+def document_key(document_id: Any) -> str:
+    return f"document:{document_id}"
+
+async def get_project_payload(db: AsyncSession, project_id: Any) -> Optional[Dict[str, Any]]:
+    """Project columns (including its schema) through the cache, None if it doesn't exist"""
+    async def load():
+        project = (await db.execute(
+            select(Project).where(Project.id == project_id)
+        )).scalar_one_or_none()
+        if not project:
+            return None
+        return {
+            "id": project.id,
+            "name": project.name,
+            "description": project.description,
+            "schema": project.schema,
+            "created_by": project.created_by,
+            "created_at": project.created_at,
+            "updated_at": project.updated_at,
+        }
+    return await CacheService().get_or_set(project_key(project_id), load, expire=PROJECT_TTL)
+
+async def get_document_payload(db: AsyncSession, document_id: Any) -> Optional[Dict[str, Any]]:
+    """Document columns (including content) through the cache, None if it doesn't exist"""
+    async def load():
+        document = (await db.execute(
+            select(Document).where(Document.id == document_id)
+        )).scalar_one_or_none()
+        if not document:
+            return None
+        return {
+            "id": document.id,
+            "project_id": document.project_id,
+            "content": document.content,
+            "status": document.status,
+            "created_at": document.created_at,
+            "updated_at": document.updated_at,
+        }
+    return await CacheService().get_or_set(document_key(document_id), load, expire=DOCUMENT_TTL)
+
+async def invalidate_project(project_id: Any) -> None:
+    await CacheService().delete(project_key(project_id))
+
+async def invalidate_documents(*document_ids: Any) -> None:
+    if document_ids:
+        await CacheService().delete(*(document_key(i) for i in document_ids))
+
+async def document_annotations_version(db: AsyncSession, document_id: Any) -> tuple:
+    """Count, newest updated_at and version sum of a document's annotations, one indexed aggregate"""
+    result = await db.execute(
+        select(
+            func.count(Annotation.id),
+            func.max(Annotation.updated_at),
+            func.coalesce(func.sum(Annotation.version), 0)
+        ).where(Annotation.document_id == document_id)
+    )
+    return tuple(result.one())
+
+async def project_documents_version(db: AsyncSession, project_id: Any) -> tuple:
+    """What a project's document listing depends on: its documents and their annotations"""
+    documents = (
+        select(func.count(Document.id), func.max(Document.updated_at))
+        .where(Document.project_id == project_id)
+        .subquery()
+    )
+    annotations = (
+        select(func.count(Annotation.id), func.max(Annotation.updated_at))
+        .join(Document, Document.id == Annotation.document_id)
+        .where(Document.project_id == project_id)
+        .subquery()
+    )
+    # both aggregates in one round trip
+    result = await db.execute(
+        select(documents, annotations).select_from(documents.join(annotations, true()))
+    )
+    return tuple(result.one())
+
+async def projects_version(db: AsyncSession) -> tuple:
+    result = await db.execute(select(func.count(Project.id), func.max(Project.updated_at)))
+    return tuple(result.one())
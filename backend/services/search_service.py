@@ -0,0 +1,141 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, cast, bindparam, literal_column, Text
+from sqlalchemy.dialects.postgresql import ARRAY, TSQUERY
+from models import Document, Annotation
+
+# to_tsvector rejects vectors over 1MB, index the head of very long documents
+MAX_INDEXED_CHARS = 200_000
+MAX_PAGE_SIZE = 100
+
+def extract_labels(content: Any) -> Set[str]:
+    """Collect the labels an annotation assigns, whatever the task type"""
+    labels = set()
+    if not isinstance(content, dict):
+        return labels
+    for key in ("label", "sentiment"):
+        if isinstance(content.get(key), str):
+            labels.add(content[key])
+    for entity in content.get("entities") or []:
+        if isinstance(entity, dict) and isinstance(entity.get("label"), str):
+            labels.add(entity["label"])
+    for relation in content.get("relations") or []:
+        if isinstance(relation, dict) and isinstance(relation.get("relation_type"), str):
+            labels.add(relation["relation_type"])
+    return {label.strip().lower() for label in labels if label.strip()}
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+class SearchService:
+    """Full-text search over document content and annotation labels.
+
+    On PostgreSQL documents.search_vector is a tsvector (GIN indexed) with
+    content at weight A and labels at weight B, so label filters use the
+    same index. Other databases store lowercased text and fall back to LIKE.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @property
+    def is_postgres(self) -> bool:
+        return self.db.get_bind().dialect.name == "postgresql"
+
+    async def index_documents(self, document_ids: Iterable[Any]) -> None:
+        """Recompute the search vector of the given documents"""
+        document_ids = list(document_ids)
+        if not document_ids:
+            return
+
+        labels: Dict[Any, Set[str]] = {}
+        result = await self.db.execute(
+            select(Annotation.document_id, Annotation.content)
+            .where(Annotation.document_id.in_(document_ids))
+        )
+        for document_id, content in result:
+            labels.setdefault(document_id, set()).update(extract_labels(content))
+
+        result = await self.db.execute(
+            select(Document.id, Document.content).where(Document.id.in_(document_ids))
+        )
+        params = [
+            {
+                "doc_id": doc_id,
+                "body": (content or "")[:MAX_INDEXED_CHARS],
+                "labels": sorted(labels.get(doc_id, ())),
+            }
+            for doc_id, content in result
+        ]
+        if not params:
+            return
+
+        if self.is_postgres:
+            vector = func.setweight(
+                func.to_tsvector("english", bindparam("body", type_=Text)), literal_column("'A'")
+            ).op("||")(
+                func.setweight(
+                    func.array_to_tsvector(bindparam("labels", type_=ARRAY(Text))), literal_column("'B'")
+                )
+            )
+        else:
+            vector = bindparam("vector", type_=Text)
+            for row in params:
+                row["vector"] = self._fallback_vector(row["body"], row["labels"])
+
+        table = Document.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("doc_id"))
+            # reindexing isn't an edit, keep updated_at as it was
+            .values(search_vector=vector, updated_at=table.c.updated_at)
+        )
+        await self.db.execute(stmt, params)
+
+    @staticmethod
+    def _fallback_vector(body: str, labels: List[str]) -> str:
+        return body.lower() + "\n" + " ".join(f"[{label}]" for label in labels)
+
+    async def search(
+        self,
+        query: Optional[str] = None,
+        project_id: Optional[str] = None,
+        status: Optional[str] = None,
+        label: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """Ranked search, returns one page of hits and whether more exist"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        columns = [Document.id, Document.project_id, Document.status, Document.created_at]
+        filters = []
+        if project_id:
+            filters.append(Document.project_id == project_id)
+        if status:
+            filters.append(Document.status == status)
+
+        rank = literal_column("0.0")
+        if self.is_postgres:
+            if query:
+                tsquery = func.websearch_to_tsquery("english", query)
+                filters.append(Document.search_vector.op("@@")(tsquery))
+                rank = func.ts_rank_cd(Document.search_vector, tsquery)
+            if label:
+                # labels are indexed verbatim at weight B
+                lexeme = label.strip().lower().replace("\\", "\\\\").replace("'", "''")
+                filters.append(Document.search_vector.op("@@")(cast(f"'{lexeme}':B", TSQUERY)))
+        else:
+            if query:
+                filters.append(Document.search_vector.like(f"%{_escape_like(query.lower())}%", escape="\\"))
+            if label:
+                filters.append(Document.search_vector.like(f"%[{_escape_like(label.strip().lower())}]%", escape="\\"))
+
+        stmt = (
+            select(*columns, rank.label("rank"))
+            .where(*filters)
+            .order_by(rank.desc(), Document.created_at.desc(), Document.id)
+            .offset(offset)
+            .limit(limit + 1)
+        )
+        rows = (await self.db.execute(stmt)).mappings().all()
+        return [dict(row) for row in rows[:limit]], len(rows) > limit
@@ -0,0 +1,150 @@
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# settings are read on import, so the test environment goes in first
+_db_dir = tempfile.mkdtemp(prefix="tagflow-tests-")
+with socket.socket() as _sock:
+    _sock.bind(("127.0.0.1", 0))
+    _fake_openai_port = _sock.getsockname()[1]
+os.environ.update({
+    "SQLALCHEMY_DATABASE_URI": f"sqlite+aiosqlite:///{_db_dir}/tests.db",
+    "OPENAI_API_KEY": "sk-test",
+    # scripts/fake_openai.py, started by the fake_openai fixture
+    "OPENAI_API_BASE": f"http://127.0.0.1:{_fake_openai_port}/v1",
+    "POSTGRES_SERVER": "unused",
+    "POSTGRES_USER": "unused",
+    "POSTGRES_PASSWORD": "unused",
+    "POSTGRES_DB": "unused",
+    # nothing listens there, the cache degrades the same way on every machine
+    "REDIS_URL": "redis://127.0.0.1:1/0",
+    "LOG_FILE": "",
+    "LOG_LEVEL": "ERROR",
+    "TRACE_EXPORT_PATH": f"{_db_dir}/traces.jsonl",
+    "BCRYPT_ROUNDS": "4",
+    "WARMUP_TIMEOUT": "2",
+    # N+1 shapes and @query_budget overruns fail the request
+    "SQL_QUERY_BUDGET_ENFORCE": "true",
+    "SQL_PROFILE_HEADERS": "true",
+})
+
+import pytest
+from fastapi.testclient import TestClient
+
+@pytest.fixture(scope="session")
+def client():
+    """The whole app over HTTP, one event loop and SQLite file for the session"""
+    from main import app
+    from database import engine
+    from models import Base
+
+    async def create_schema():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    with TestClient(app) as client:
+        client.portal.call(create_schema)
+        yield client
+
+@pytest.fixture(scope="session")
+def fake_openai():
+    """The fake chat completions API, in a thread of its own"""
+    import uvicorn
+    from scripts.fake_openai import build_fake_openai
+
+    app = build_fake_openai(latency_ms=1, jitter_ms=0)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=_fake_openai_port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield app
+    server.should_exit = True
+    thread.join()
+
+@pytest.fixture(scope="session")
+def run(client):
+    """Run a coroutine function on the app's event loop"""
+    def run(func, *args):
+        return client.portal.call(func, *args)
+    return run
+
+def _make_user(run, role):
+    from database import AsyncSessionLocal
+    from models import User, UserRole
+    from core.security import create_access_token
+
+    email = f"{role}-{uuid.uuid4().hex[:8]}@tagflow.test"
+
+    async def create():
+        async with AsyncSessionLocal() as db:
+            user = User(email=email, name=role, role=UserRole(role), hashed_password="unused")
+            db.add(user)
+            await db.commit()
+            return user.id
+
+    user_id = run(create)
+    return {"id": user_id, "headers": {"Authorization": f"Bearer {create_access_token({'sub': email})}"}}
+
+@pytest.fixture
+def make_user(run):
+    """Create a user with the given role, returns its id and auth headers"""
+    return lambda role: _make_user(run, role)
+
+@pytest.fixture(scope="session")
+def admin(run):
+    return _make_user(run, "admin")
+
+@pytest.fixture(scope="session")
+def annotator(run):
+    return _make_user(run, "annotator")
+
+@pytest.fixture
+def project(client, admin):
+    """A fresh project, created through the API"""
+    response = client.post("/api/projects", json={"name": f"Test {uuid.uuid4().hex[:8]}"}, headers=admin["headers"])
+    assert response.status_code == 200, response.text
+    return response.json()
+
+@pytest.fixture
+def make_documents(run):
+    """Insert and index documents, optionally with one annotation each, and return their ids"""
+    from database import AsyncSessionLocal
+    from models import Document, Annotation
+    from services.search_service import SearchService
+
+    def make_documents(project_id, count, annotated_by=None, verified=False, label="positive"):
+        async def create():
+            async with AsyncSessionLocal() as db:
+                documents = [
+                    Document(project_id=uuid.UUID(project_id), content=f"document {i}", status="pending")
+                    for i in range(count)
+                ]
+                db.add_all(documents)
+                await db.flush()
+                if annotated_by:
+                    db.add_all(
+                        Annotation(
+                            document_id=doc.id,
+                            content={"label": label},
+                            confidence_score=0.9,
+                            created_by=annotated_by,
+                            verified=verified,
+                            verified_by=annotated_by if verified else None
+                        )
+                        for doc in documents
+                    )
+                    await db.flush()
+                await SearchService(db).index_documents(doc.id for doc in documents)
+                await db.commit()
+                return [str(doc.id) for doc in documents]
+        return run(create)
+    return make_documents
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import update
+
+class MemoryRedis:
+    """The few Redis commands CacheService uses, there is no Redis in the tests"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            del self.data[key]
+
+@pytest.fixture
+def user_cache(monkeypatch):
+    from services import cache
+    memory = MemoryRedis()
+    monkeypatch.setattr(cache, "get_redis", lambda: memory)
+    return memory
+
+def test_deactivated_user_is_rejected_once_invalidated(client, run, admin, make_user, user_cache):
+    from database import AsyncSessionLocal
+    from models import User
+
+    user = make_user("annotator")
+    # the first request puts the user in the cache
+    assert client.get("/api/projects", headers=user["headers"]).status_code == 200
+
+    async def deactivate_behind_the_cache():
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(User).where(User.id == user["id"]).values(is_active=False))
+            await db.commit()
+
+    # a write that skips AuthService is only seen after USER_CACHE_TTL
+    run(deactivate_behind_the_cache)
+    assert client.get("/api/projects", headers=user["headers"]).status_code == 200
+
+    response = client.patch(f"/api/admin/users/{user['id']}", json={"is_active": False}, headers=admin["headers"])
+    assert response.status_code == 200, response.text
+    assert response.json()["is_active"] is False
+    assert client.get("/api/projects", headers=user["headers"]).status_code == 401
+
+    client.patch(f"/api/admin/users/{user['id']}", json={"is_active": True}, headers=admin["headers"])
+    assert client.get("/api/projects", headers=user["headers"]).status_code == 200
+
+def test_role_change_applies_to_the_next_request(client, admin, project, make_user, user_cache):
+    user = make_user("annotator")
+    url = f"/api/documents/project/{project['id']}/next"
+    assert client.get(url, headers=user["headers"]).status_code == 200
+
+    response = client.patch(f"/api/admin/users/{user['id']}", json={"role": "viewer"}, headers=admin["headers"])
+    assert response.status_code == 200, response.text
+    assert response.json()["role"] == "viewer"
+    assert client.get(url, headers=user["headers"]).status_code == 403
+
+def test_updating_users_needs_an_admin(client, annotator, make_user):
+    user = make_user("viewer")
+    response = client.patch(f"/api/admin/users/{user['id']}", json={"role": "admin"}, headers=annotator["headers"])
+    assert response.status_code == 403
+
+def test_unknown_user_is_404(client, admin):
+    response = client.patch("/api/admin/users/00000000-0000-0000-0000-000000000000", json={"is_active": False}, headers=admin["headers"])
+    assert response.status_code == 404
@@ -0,0 +1,73 @@
+import uuid
+import pytest
+from services.factory import ServiceFactory
+
+def _annotate(client, headers, document_id, label):
+    response = client.post(f"/api/annotations/{document_id}", json={"content": {"label": label}}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+def test_bulk_correct_is_not_taken_for_an_annotation_id(client, admin, annotator, project, make_documents):
+    first, second = make_documents(project["id"], 2)
+    annotation_ids = [_annotate(client, annotator["headers"], first, "negative"), _annotate(client, annotator["headers"], second, "neutral")]
+    missing = str(uuid.uuid4())
+
+    response = client.post(
+        "/api/annotations/bulk/correct",
+        json={"corrections": [{"annotation_id": i, "content": {"label": "positive"}} for i in annotation_ids + [missing]]},
+        headers=annotator["headers"]
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == {"updated": annotation_ids, "not_found": [missing]}
+
+    for document_id in (first, second):
+        [annotation] = client.get(f"/api/annotations/document/{document_id}", headers=annotator["headers"]).json()
+        assert annotation["content"] == {"label": "positive"} and annotation["verified"] is True
+
+def test_bulk_correct_conflict_is_409(client, run, annotator, project, make_documents):
+    from database import AsyncSessionLocal
+    from models import AnnotationVersion
+
+    [document_id] = make_documents(project["id"], 1)
+    annotation_id = _annotate(client, annotator["headers"], document_id, "negative")
+
+    # another correction already wrote version 2 after this request read version 1
+    async def concurrent_correction():
+        async with AsyncSessionLocal() as db:
+            db.add(AnnotationVersion(annotation_id=uuid.UUID(annotation_id), version=2, is_snapshot=True, content={"label": "neutral"}))
+            await db.commit()
+
+    run(concurrent_correction)
+    response = client.post(
+        "/api/annotations/bulk/correct",
+        json={"corrections": [{"annotation_id": annotation_id, "content": {"label": "positive"}}]},
+        headers=annotator["headers"]
+    )
+    assert response.status_code == 409, response.text
+    [annotation] = client.get(f"/api/annotations/document/{document_id}", headers=annotator["headers"]).json()
+    assert annotation["content"] == {"label": "negative"}
+
+def test_bulk_verify(client, admin, project, make_documents):
+    [document_id] = make_documents(project["id"], 1)
+    annotation_id = _annotate(client, admin["headers"], document_id, "negative")
+
+    response = client.post("/api/annotations/bulk/verify", json={"annotation_ids": [annotation_id]}, headers=admin["headers"])
+    assert response.status_code == 200, response.text
+    assert response.json() == {"updated": [annotation_id], "not_found": []}
+
+def test_batch_refuses_models_outside_the_allowlist(client, annotator, project, make_documents):
+    cached = len(ServiceFactory._instances)
+    [document_id] = make_documents(project["id"], 1)
+
+    response = client.post(
+        f"/api/annotations/batch/{project['id']}",
+        params={"model": "no-such-model"},
+        json=[document_id],
+        headers=annotator["headers"]
+    )
+    assert response.status_code == 422
+    assert len(ServiceFactory._instances) == cached
+
+def test_factory_refuses_models_outside_the_allowlist():
+    with pytest.raises(ValueError):
+        ServiceFactory.get_annotation_service("no-such-model")
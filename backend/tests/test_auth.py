@@ -0,0 +1,79 @@
+import uuid
+import pytest
+from core.security import close_hash_pool, create_refresh_token, pwd_context, verify_password_async
+
+def _create_user(run, hashed_password):
+    from database import AsyncSessionLocal
+    from models import User, UserRole
+
+    email = f"login-{uuid.uuid4().hex[:8]}@tagflow.test"
+
+    async def create():
+        async with AsyncSessionLocal() as db:
+            db.add(User(email=email, name="login", role=UserRole("annotator"), hashed_password=hashed_password))
+            await db.commit()
+
+    run(create)
+    return email
+
+@pytest.fixture(scope="module")
+def login(client, run):
+    """Tokens of a fresh user, from /auth/token"""
+    email = _create_user(run, pwd_context.hash("secret"))
+    response = client.post("/auth/token", data={"username": email, "password": "secret"})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def _bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+def test_login_rejects_a_wrong_password(client, login):
+    assert client.post("/auth/token", data={"username": "nobody@tagflow.test", "password": "secret"}).status_code == 401
+
+def test_login_rehashes_passwords_made_with_other_rounds(client, run):
+    from database import AsyncSessionLocal
+    from services.auth_service import AuthService
+
+    email = _create_user(run, pwd_context.copy(bcrypt__rounds=5).hash("secret"))
+    assert client.post("/auth/token", data={"username": email, "password": "secret"}).status_code == 200
+
+    async def stored_hash():
+        async with AsyncSessionLocal() as db:
+            return (await AuthService(db).get_user_by_email(email)).hashed_password
+
+    assert pwd_context.needs_update(run(stored_hash)) is False
+
+def test_hash_pool_starts_again_after_shutdown(run):
+    # drain() closes it on every shutdown, the next lifespan must still hash
+    close_hash_pool()
+    assert run(verify_password_async, "secret", pwd_context.hash("secret")) is True
+
+def test_access_token_is_accepted(client, login):
+    assert client.get("/api/projects", headers=_bearer(login["access_token"])).status_code == 200
+
+def test_refresh_token_is_not_an_access_token(client, login):
+    assert client.get("/api/projects", headers=_bearer(login["refresh_token"])).status_code == 401
+
+def test_refresh_needs_a_refresh_token(client, login):
+    assert client.post("/auth/refresh", headers=_bearer(login["access_token"])).status_code == 401
+
+    response = client.post("/auth/refresh", headers=_bearer(login["refresh_token"]))
+    assert response.status_code == 200, response.text
+    assert client.get("/api/projects", headers=_bearer(response.json()["access_token"])).status_code == 200
+
+def test_refresh_token_of_an_unknown_user_is_rejected(client):
+    token = create_refresh_token({"sub": "ghost@tagflow.test"})
+    assert client.post("/auth/refresh", headers=_bearer(token)).status_code == 401
+
+@pytest.mark.parametrize("path", [
+    "/api/documents/not-a-uuid",
+    "/api/projects/not-a-uuid",
+    "/api/projects/not-a-uuid/export",
+    "/api/annotations/not-a-uuid/history",
+])
+def test_malformed_ids_are_422(client, admin, path):
+    assert client.get(path, headers=admin["headers"]).status_code == 422
+
+def test_malformed_ids_in_a_batch_are_422(client, annotator, project):
+    response = client.post(f"/api/annotations/batch/{project['id']}", json=["not-a-uuid"], headers=annotator["headers"])
+    assert response.status_code == 422
@@ -0,0 +1,24 @@
+import uuid
+from services.cache import CacheService
+
+def test_local_hits_are_copies(run):
+    cache = CacheService()
+
+    async def mutate_a_hit():
+        await cache.set("test:copies", {"labels": ["positive"]})
+        hit = await cache.get("test:copies")
+        hit["labels"].append("negative")
+        return await cache.get("test:copies")
+
+    assert run(mutate_a_hit) == {"labels": ["positive"]}
+
+def test_values_come_back_in_the_same_shape_from_either_tier(run):
+    cache = CacheService()
+    value = {"id": uuid.UUID(int=1)}
+
+    async def set_and_get():
+        await cache.set("test:shape", value)
+        return await cache.get("test:shape")
+
+    # as Redis would return it, not the object that was stored
+    assert run(set_and_get) == {"id": str(uuid.UUID(int=1))}
@@ -0,0 +1,56 @@
+import time
+
+def test_changes_start_from_the_head_cursor(client, admin, project, make_documents):
+    make_documents(project["id"], 2)
+    url = f"/api/projects/{project['id']}/changes"
+
+    head = client.get(url, headers=admin["headers"])
+    assert head.status_code == 200, head.text
+    assert head.json()["documents"] == []
+
+    # nothing happened since the head
+    response = client.get(url, params={"cursor": head.json()["cursor"]}, headers=admin["headers"])
+    assert response.status_code == 200
+    assert response.json()["documents"] == []
+
+def test_changes_return_new_rows_and_tombstones(client, admin, project, make_documents):
+    url = f"/api/projects/{project['id']}/changes"
+    cursor = client.get(url, headers=admin["headers"]).json()["cursor"]
+
+    kept, deleted = make_documents(project["id"], 2, annotated_by=admin["id"])
+    assert client.delete(f"/api/documents/{deleted}", headers=admin["headers"]).status_code == 200
+
+    response = client.get(url, params={"cursor": cursor, "include_content": True}, headers=admin["headers"])
+    assert response.status_code == 200, response.text
+    body = response.json()
+    documents = {d["id"]: d for d in body["documents"]}
+    assert documents[kept]["content"] == "document 0"
+    assert documents[deleted] == {"id": deleted, "deleted": True}
+    assert [a["document_id"] for a in body["annotations"] if not a.get("deleted")] == [kept]
+    assert body["has_more"] is False
+
+    # the returned cursor is past all of it
+    again = client.get(url, params={"cursor": body["cursor"]}, headers=admin["headers"])
+    assert again.json()["documents"] == [] and again.json()["annotations"] == []
+
+def test_changes_page_with_has_more(client, admin, project, make_documents):
+    url = f"/api/projects/{project['id']}/changes"
+    cursor = client.get(url, headers=admin["headers"]).json()["cursor"]
+    make_documents(project["id"], 3)
+
+    first = client.get(url, params={"cursor": cursor, "limit": 2}, headers=admin["headers"]).json()
+    assert first["has_more"] is True and len(first["documents"]) == 2
+    rest = client.get(url, params={"cursor": first["cursor"], "limit": 2}, headers=admin["headers"]).json()
+    assert rest["has_more"] is False and len(rest["documents"]) == 1
+
+def test_malformed_cursor_is_400(client, admin, project):
+    response = client.get(f"/api/projects/{project['id']}/changes", params={"cursor": "nope"}, headers=admin["headers"])
+    assert response.status_code == 400
+
+def test_expired_cursor_is_410(client, admin, project):
+    response = client.get(
+        f"/api/projects/{project['id']}/changes",
+        params={"cursor": f"0-0-{int(time.time()) - 365 * 86400}"},
+        headers=admin["headers"]
+    )
+    assert response.status_code == 410
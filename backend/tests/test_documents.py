@@ -0,0 +1,83 @@
+def test_document_answers_304_to_its_etag(client, admin, project, make_documents):
+    [document_id] = make_documents(project["id"], 1)
+
+    response = client.get(f"/api/documents/{document_id}", headers=admin["headers"])
+    assert response.status_code == 200, response.text
+    assert response.json()["id"] == document_id
+    assert response.json()["content"] == "document 0"
+
+    again = client.get(f"/api/documents/{document_id}", headers={**admin["headers"], "If-None-Match": response.headers["ETag"]})
+    assert again.status_code == 304
+
+def test_unknown_document_is_404(client, admin):
+    response = client.get("/api/documents/00000000-0000-0000-0000-000000000000", headers=admin["headers"])
+    assert response.status_code == 404
+
+def test_uploaded_documents_are_returned(client, admin, project):
+    response = client.post(
+        f"/api/documents/{project['id']}/upload",
+        files=[("files", ("a.txt", b"first text", "text/plain")), ("files", ("b.txt", b"second text", "text/plain"))],
+        headers=admin["headers"]
+    )
+    assert response.status_code == 200, response.text
+    assert [d["content"] for d in response.json()] == ["first text", "second text"]
+
+def test_prefetch_walks_pages_with_the_cursor(client, annotator, project, make_documents):
+    document_ids = make_documents(project["id"], 3)
+    url = f"/api/documents/project/{project['id']}/next"
+
+    first = client.get(url, params={"limit": 2}, headers=annotator["headers"])
+    assert first.status_code == 200, first.text
+    first_page = [d["id"] for d in first.json()["documents"]]
+    assert len(first_page) == 2
+    assert first.json()["next_cursor"] == first_page[-1]
+
+    second = client.get(url, params={"limit": 2, "after": first.json()["next_cursor"]}, headers=annotator["headers"])
+    assert second.status_code == 200, second.text
+    second_page = [d["id"] for d in second.json()["documents"]]
+    assert sorted(first_page + second_page) == sorted(document_ids)
+    assert "next_cursor" not in second.json()
+
+def test_prefetch_skips_verified_documents(client, admin, annotator, project, make_documents):
+    make_documents(project["id"], 1, annotated_by=admin["id"], verified=True)
+    [pending] = make_documents(project["id"], 1, annotated_by=admin["id"])
+
+    response = client.get(f"/api/documents/project/{project['id']}/next", headers=annotator["headers"])
+    [document] = response.json()["documents"]
+    assert document["id"] == pending
+    assert document["annotation"]["content"] == {"label": "positive"}
+
+def test_prefetch_rejects_a_malformed_cursor(client, annotator, project):
+    response = client.get(f"/api/documents/project/{project['id']}/next", params={"after": "nope"}, headers=annotator["headers"])
+    assert response.status_code == 422
+
+def test_search_matches_content_and_labels(client, admin, annotator, project, make_documents):
+    plain = make_documents(project["id"], 2)
+    praised = make_documents(project["id"], 1, annotated_by=annotator["id"], label="Praise")
+    url = "/api/documents/search"
+
+    by_text = client.get(url, params={"q": "DOCUMENT 1", "project_id": project["id"]}, headers=admin["headers"])
+    assert by_text.status_code == 200, by_text.text
+    assert [d["id"] for d in by_text.json()["items"]] == [plain[1]]
+
+    # labels are matched whole and case-insensitively, not as substrings
+    by_label = client.get(url, params={"label": "praise", "project_id": project["id"]}, headers=admin["headers"])
+    assert [d["id"] for d in by_label.json()["items"]] == praised
+    missing = client.get(url, params={"label": "prai", "project_id": project["id"]}, headers=admin["headers"])
+    assert missing.json()["items"] == []
+
+def test_search_pages_report_has_more(client, admin, project, make_documents):
+    document_ids = make_documents(project["id"], 3)
+    url = "/api/documents/search"
+    params = {"q": "document", "project_id": project["id"], "limit": 2}
+
+    first = client.get(url, params=params, headers=admin["headers"]).json()
+    assert first["has_more"] is True
+    second = client.get(url, params={**params, "offset": 2}, headers=admin["headers"]).json()
+    assert second["has_more"] is False
+    assert sorted(d["id"] for d in first["items"] + second["items"]) == sorted(document_ids)
+
+def test_search_escapes_like_wildcards(client, admin, project, make_documents):
+    make_documents(project["id"], 1)
+    response = client.get("/api/documents/search", params={"q": "doc%", "project_id": project["id"]}, headers=admin["headers"])
+    assert response.json()["items"] == []
@@ -0,0 +1,21 @@
+def test_health_reports_an_unreachable_cache(client):
+    response = client.get("/api/v1/health")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["checks"]["database"] is True
+    assert body["checks"]["cache"] is False
+    assert body["status"] == "unhealthy"
+
+def test_health_checks_are_not_logged(client, admin, monkeypatch):
+    from core.config import settings
+    from core.logging import logger
+    monkeypatch.setattr(settings, "LOG_SUCCESS_SAMPLE_RATE", 1.0)
+    lines = []
+    sink = logger.add(lines.append, level="INFO", format="{message}")
+    try:
+        assert client.get("/api/v1/health").status_code == 200
+        assert client.get("/api/projects", headers=admin["headers"]).status_code == 200
+    finally:
+        logger.remove(sink)
+    assert not [line for line in lines if "/api/v1/health" in line]
+    assert [line for line in lines if line.startswith("GET /api/projects 200")]
@@ -0,0 +1,67 @@
+import sqlite3
+import uuid
+from pathlib import Path
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import UUID, create_engine
+from models import Base
+from models.types import CompressedText, ZSTD_MAGIC
+
+BACKEND = Path(__file__).parent.parent
+
+@pytest.fixture
+def alembic_config(tmp_path):
+    """Migrations against a SQLite file of their own, without the ini's logging setup"""
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND / "migrations"))
+    config.set_main_option("sqlalchemy.url", f"sqlite+aiosqlite:///{tmp_path}/migrations.db")
+    config.attributes["path"] = tmp_path / "migrations.db"
+    return config
+
+def test_upgrade_keeps_existing_document_content(alembic_config):
+    db = alembic_config.attributes["path"]
+    command.upgrade(alembic_config, "54a7a356c379")
+    with sqlite3.connect(db) as conn:
+        conn.execute(
+            "INSERT INTO documents (id, content, status) VALUES (?, ?, 'pending')",
+            (uuid.uuid4().hex, "written before the upgrade"),
+        )
+    command.upgrade(alembic_config, "head")
+    with sqlite3.connect(db) as conn:
+        (content,), = conn.execute("SELECT content FROM documents").fetchall()
+    # plain UTF-8 bytes, which CompressedText reads back as they were
+    assert content == b"written before the upgrade"
+    assert CompressedText().process_result_value(content, None) == "written before the upgrade"
+
+def test_downgrade_to_base_and_back(alembic_config):
+    command.upgrade(alembic_config, "head")
+    command.downgrade(alembic_config, "base")
+    command.upgrade(alembic_config, "head")
+
+def test_downgrade_refuses_compressed_content(alembic_config):
+    command.upgrade(alembic_config, "14cdfd743118")
+    with sqlite3.connect(alembic_config.attributes["path"]) as conn:
+        conn.execute(
+            "INSERT INTO documents (id, content, status) VALUES (?, ?, 'pending')",
+            (uuid.uuid4().hex, ZSTD_MAGIC + b"frame"),
+        )
+    with pytest.raises(RuntimeError, match="compressed"):
+        command.downgrade(alembic_config, "54a7a356c379")
+
+def test_head_matches_the_models(alembic_config):
+    command.upgrade(alembic_config, "head")
+    engine = create_engine(f"sqlite:///{alembic_config.attributes['path']}")
+    # reflect UUID as UUID, as migrations/env.py does
+    engine.dialect.ischema_names = {**engine.dialect.ischema_names, "UUID": UUID}
+    with engine.connect() as conn:
+        diff = compare_metadata(MigrationContext.configure(conn, opts={"compare_type": True}), Base.metadata)
+        triggers = {row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    engine.dispose()
+    # the GIN index exists on PostgreSQL only, autogenerate ignores ddl_if
+    assert [(change[0], change[1].name) for change in diff] == [("add_index", "ix_documents_search_vector")]
+    assert triggers == {
+        f"{table}_change_log_{op}" for table in ("documents", "annotations") for op in ("insert", "update", "delete")
+    }
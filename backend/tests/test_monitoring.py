@@ -0,0 +1,39 @@
+from prometheus_client import REGISTRY
+from core.config import settings
+from core.monitoring import track_llm_call
+
+def _calls(model):
+    return REGISTRY.get_sample_value("llm_request_duration_seconds_count", {"model": model, "outcome": "success"}) or 0
+
+def test_unknown_models_are_counted_as_other():
+    before = _calls("other")
+    with track_llm_call("made-up-model-1"):
+        pass
+    with track_llm_call("made-up-model-2"):
+        pass
+    assert _calls("other") == before + 2
+    assert _calls("made-up-model-1") == 0
+
+def test_allowed_models_keep_their_name():
+    before = _calls(settings.OPENAI_MODEL)
+    with track_llm_call(settings.OPENAI_MODEL):
+        pass
+    assert _calls(settings.OPENAI_MODEL) == before + 1
+
+def test_default_model_is_always_allowed():
+    assert settings.OPENAI_MODEL in settings.OPENAI_ALLOWED_MODELS
+
+def _requests(route):
+    return REGISTRY.get_sample_value("http_requests_total", {"method": "GET", "route": route, "status": "200"}) or 0
+
+def test_routes_of_included_routers_keep_their_prefix(client, admin):
+    before = _requests("/api/v1/health")
+    assert client.get("/api/v1/health").status_code == 200
+    assert _requests("/api/v1/health") == before + 1
+    assert _requests("/health") == 0
+
+def test_route_label_is_the_template(client, admin, project):
+    route = "/api/projects/{project_id}"
+    before = _requests(route)
+    assert client.get(f"/api/projects/{project['id']}", headers=admin["headers"]).status_code == 200
+    assert _requests(route) == before + 1
@@ -0,0 +1,96 @@
+import json
+import time
+from datetime import datetime
+
+def test_project_list_is_served_by_the_router(client):
+    # the unauthenticated inline handler used to shadow it
+    assert client.get("/api/projects").status_code == 401
+
+def test_project_list_answers_304_to_its_etag(client, admin, project):
+    response = client.get("/api/projects", headers=admin["headers"])
+    assert response.status_code == 200
+    assert project["id"] in [p["id"] for p in response.json()]
+
+    again = client.get("/api/projects", headers={**admin["headers"], "If-None-Match": response.headers["ETag"]})
+    assert again.status_code == 304
+
+def test_project_gets_the_default_schema(project):
+    assert project["schema"]["type"] == "text_classification"
+
+def test_export_streams_verified_annotations_as_jsonl(client, admin, project, make_documents):
+    verified = make_documents(project["id"], 2, annotated_by=admin["id"], verified=True)
+    make_documents(project["id"], 1, annotated_by=admin["id"], verified=False)
+
+    response = client.get(f"/api/projects/{project['id']}/export", params={"format": "jsonl"}, headers=admin["headers"])
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(row["document_id"] for row in rows) == sorted(verified)
+    assert all(row["annotation"] == {"label": "positive"} for row in rows)
+
+def test_export_of_unknown_project_is_404(client, admin):
+    response = client.get("/api/projects/00000000-0000-0000-0000-000000000000/export", headers=admin["headers"])
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Project not found"
+
+def test_annotations_as_of_replay_the_history(client, admin, project, make_documents):
+    [document_id] = make_documents(project["id"], 1)
+    created = client.post(f"/api/annotations/{document_id}", json={"content": {"label": "negative"}}, headers=admin["headers"])
+    assert created.status_code == 200, created.text
+    annotation_id = created.json()["id"]
+
+    before_verify = datetime.utcnow()
+    time.sleep(0.01)
+    assert client.put(f"/api/annotations/{annotation_id}/verify", headers=admin["headers"]).status_code == 200
+
+    url = f"/api/projects/{project['id']}/annotations/as-of"
+    then = client.get(url, params={"at": before_verify.isoformat()}, headers=admin["headers"])
+    assert then.status_code == 200, then.text
+    [state] = then.json()["annotations"]
+    assert state["annotation_id"] == annotation_id
+    assert (state["version"], state["verified"], state["content"]) == (1, False, {"label": "negative"})
+
+    [state] = client.get(url, params={"at": datetime.utcnow().isoformat()}, headers=admin["headers"]).json()["annotations"]
+    assert (state["version"], state["verified"]) == (2, True)
+
+def test_annotations_as_of_unknown_project_is_404(client, admin):
+    response = client.get(
+        "/api/projects/00000000-0000-0000-0000-000000000000/annotations/as-of",
+        params={"at": datetime.utcnow().isoformat()},
+        headers=admin["headers"]
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Project not found"
+
+def test_small_project_is_deleted_inline(client, admin, project, make_documents):
+    make_documents(project["id"], 2, annotated_by=admin["id"])
+
+    response = client.delete(f"/api/projects/{project['id']}", headers=admin["headers"])
+    assert response.status_code == 200, response.text
+    assert client.get(f"/api/projects/{project['id']}", headers=admin["headers"]).status_code == 404
+
+def test_large_project_is_purged_in_the_background(client, admin, project, make_documents, monkeypatch):
+    from core.config import settings
+    monkeypatch.setattr(settings, "PURGE_INLINE_MAX_DOCUMENTS", 2)
+    monkeypatch.setattr(settings, "PURGE_BATCH_SIZE", 2)
+    make_documents(project["id"], 5, annotated_by=admin["id"])
+
+    response = client.delete(f"/api/projects/{project['id']}", headers=admin["headers"])
+    assert response.status_code == 202, response.text
+    status_url = response.json()["status_url"]
+    assert status_url == f"/api/projects/{project['id']}/purge"
+
+    # the test client runs background tasks before returning
+    assert client.get(f"/api/projects/{project['id']}", headers=admin["headers"]).status_code == 404
+    # there is no Redis in the tests, the purging process still reports its progress
+    progress = client.get(status_url, headers=admin["headers"])
+    assert progress.status_code == 200, progress.text
+    payload = progress.json()
+    assert payload["project_id"] == project["id"]
+    assert payload["status"] == "completed"
+    assert (payload["total_documents"], payload["deleted_documents"]) == (5, 5)
+    assert payload["error"] is None
+    assert payload["finished_at"] >= payload["started_at"]
+
+def test_deleting_a_project_needs_an_admin(client, annotator, project):
+    assert client.delete(f"/api/projects/{project['id']}", headers=annotator["headers"]).status_code == 403
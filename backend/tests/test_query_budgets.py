@@ -0,0 +1,110 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from core.sql_profiler import QueryBudgetExceeded, assert_max_queries, query_budget
+
+# conftest turns on SQL_QUERY_BUDGET_ENFORCE, so an overrun or an N+1 shape
+# fails the request; these also check the counts the profiler reports
+
+def _queries(response):
+    return int(response.headers["X-Query-Count"])
+
+def test_project_documents_listing(client, admin, project, make_documents):
+    make_documents(project["id"], 12, annotated_by=admin["id"])
+    response = client.get(f"/api/projects/{project['id']}/documents", params={"include_content": True})
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == 12
+    assert _queries(response) <= 2
+
+def test_prefetch(client, annotator, project, make_documents):
+    make_documents(project["id"], 8, annotated_by=annotator["id"])
+    response = client.get(f"/api/documents/project/{project['id']}/next", params={"limit": 8}, headers=annotator["headers"])
+    assert response.status_code == 200, response.text
+    assert len(response.json()["documents"]) == 8
+
+def test_change_feed(client, admin, project, make_documents):
+    url = f"/api/projects/{project['id']}/changes"
+    cursor = client.get(url, headers=admin["headers"]).json()["cursor"]
+    make_documents(project["id"], 10, annotated_by=admin["id"])
+    response = client.get(url, params={"cursor": cursor}, headers=admin["headers"])
+    assert response.status_code == 200, response.text
+    assert len(response.json()["documents"]) == 10
+
+def test_batch_annotation(client, annotator, project, make_documents, fake_openai):
+    document_ids = make_documents(project["id"], 8)
+    response = client.post(f"/api/annotations/batch/{project['id']}", json=document_ids, headers=annotator["headers"])
+    assert response.status_code == 200, response.text
+    assert len(response.json()["annotations"]) == 8
+    assert _queries(response) <= 10
+
+@pytest.fixture
+def profiled_app(tmp_path):
+    """A bare app with the query profiling middleware and its own engine"""
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    from core.middleware import count_queries
+    from core.sql_profiler import profile_engine
+    from models import Base, User
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/profiled.db")
+    profile_engine(engine)
+    sessions = async_sessionmaker(engine)
+    app = FastAPI()
+    app.middleware("http")(count_queries)
+
+    @app.on_event("startup")
+    async def create_schema():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    @app.get("/per-row")
+    async def per_row():
+        # one lookup per id, the shape the profiler is there to catch
+        async with sessions() as db:
+            for i in range(10):
+                await db.execute(select(User.id).where(User.email == f"user{i}@tagflow.test"))
+        return {}
+
+    @app.get("/over-budget")
+    @query_budget(1)
+    async def over_budget():
+        async with sessions() as db:
+            await db.execute(select(User.id))
+            await db.execute(select(User.email))
+        return {}
+
+    @app.get("/within-budget")
+    @query_budget(1)
+    async def within_budget():
+        async with sessions() as db:
+            await db.execute(select(User.id))
+        return {}
+
+    with TestClient(app) as client:
+        yield client
+
+def test_n_plus_one_shape_fails_the_request(profiled_app):
+    with pytest.raises(QueryBudgetExceeded, match="repeated"):
+        profiled_app.get("/per-row")
+
+def test_budget_overrun_fails_the_request(profiled_app):
+    with pytest.raises(QueryBudgetExceeded, match="budget 1"):
+        profiled_app.get("/over-budget")
+    assert profiled_app.get("/within-budget").status_code == 200
+
+def test_assert_max_queries(run):
+    from database import AsyncSessionLocal
+    from models import User
+
+    async def two_queries():
+        async with AsyncSessionLocal() as db:
+            await db.execute(select(User.id))
+            await db.execute(select(User.email))
+
+    async def within(limit):
+        with assert_max_queries(limit):
+            await two_queries()
+
+    run(within, 2)
+    with pytest.raises(QueryBudgetExceeded):
+        run(within, 1)
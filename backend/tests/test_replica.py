@@ -0,0 +1,80 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import select
+import database
+from database import AsyncSessionLocal, PRIMARY_STICKY_COOKIE, build_engine
+from models import Base, Project
+
+# the replica is a second SQLite file that is never replicated to, so where
+# a row is found tells which engine served the read
+
+@pytest.fixture
+def replica(client, run, tmp_path, monkeypatch):
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path}/replica.db", name="replica")
+
+    async def create_schema():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    run(create_schema)
+    monkeypatch.setattr(database, "replica_engine", engine)
+    client.cookies.clear()
+    yield engine
+    client.cookies.clear()
+    run(engine.dispose)
+
+def _project_ids(run, engine):
+    async def load():
+        async with engine.connect() as conn:
+            return {str(i) for i in (await conn.execute(select(Project.id))).scalars()}
+    return run(load)
+
+def _as_of(client, headers, project_id):
+    return client.get(
+        f"/api/projects/{project_id}/annotations/as-of",
+        params={"at": datetime.utcnow().isoformat()},
+        headers=headers
+    )
+
+def test_gets_read_from_the_replica(client, admin, project, replica):
+    # the project only exists on the primary
+    response = _as_of(client, admin["headers"], project["id"])
+    assert response.status_code == 404
+
+def test_writes_go_to_the_primary(client, run, admin, replica):
+    response = client.post("/api/projects", json={"name": "Written"}, headers=admin["headers"])
+    assert response.status_code == 200, response.text
+    project_id = response.json()["id"]
+    assert project_id in _project_ids(run, database.engine)
+    assert project_id not in _project_ids(run, replica)
+
+def test_flushes_of_a_read_session_go_to_the_primary(run, admin, replica):
+    async def write_in_read_session():
+        async with AsyncSessionLocal(info={"use_replica": True}) as db:
+            # a plain read still goes to the replica
+            assert (await db.execute(select(Project.id))).first() is None
+            project = Project(name="Flushed", schema={}, created_by=admin["id"])
+            db.add(project)
+            await db.commit()
+            return str(project.id)
+
+    project_id = run(write_in_read_session)
+    assert project_id in _project_ids(run, database.engine)
+    assert project_id not in _project_ids(run, replica)
+
+def test_sticky_cookie_pins_reads_to_the_primary(client, admin, replica):
+    response = client.post("/api/projects", json={"name": "Sticky"}, headers=admin["headers"])
+    assert response.status_code == 200, response.text
+    assert PRIMARY_STICKY_COOKIE in response.cookies
+    project_id = response.json()["id"]
+
+    # the client sends the cookie back, its own write is visible
+    assert _as_of(client, admin["headers"], project_id).status_code == 200
+
+    # without it the read goes to the replica, which never saw the project
+    client.cookies.clear()
+    assert _as_of(client, admin["headers"], project_id).status_code == 404
+
+def test_expired_cookie_reads_from_the_replica(client, admin, project, replica):
+    client.cookies.set(PRIMARY_STICKY_COOKIE, "0")
+    assert _as_of(client, admin["headers"], project["id"]).status_code == 404
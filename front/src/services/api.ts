@@ -6,6 +6,8 @@ export class ApiClient {
   constructor() {
     this.api = axios.create({
       baseURL: process.env.REACT_APP_API_URL || 'http://localhost:8000/api/v1',
+      // send the read-your-writes cookie so reads after a write hit the primary
+      withCredentials: true,
       headers: {
         'Content-Type': 'application/json',
       },
@@ -78,6 +80,17 @@ export class ApiClient {
     return this.api.post(`/projects/${projectId}/documents`, { content }).then(res => res.data);
   }
 
+  async searchDocuments(params: {
+    q?: string;
+    project_id?: string;
+    status?: string;
+    label?: string;
+    limit?: number;
+    offset?: number;
+  }) {
+    return this.api.get('/documents/search', { params }).then(res => res.data);
+  }
+
   // Annotation endpoints
   async createAnnotation(documentId: string) {
     return this.api.post(`/documents/${documentId}/annotate`).then(res => res.data);